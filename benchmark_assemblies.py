@@ -0,0 +1,86 @@
+# Assembly benchmark: time parsing biological assemblies of large virus capsids
+#
+# Usage:
+#   python benchmark_assemblies.py [--blender /path/to/blender] [--codes 1M4X ...] [--runs 5]
+#
+# Starts a headless Blender, downloads each entry as .bcif into the
+# MolecularNodes cache (once), then times building its assemblies: parsing the
+# operator expressions, composing the operators and converting them into the
+# per-chain transformation array used for instancing.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+# PBCV-1 capsid: 1680 operators of (1-60)(61-88) applied to every chain
+DEFAULT_CODES = ["1M4X"]
+
+MARKER = "PB_ASSEMBLY_RESULT:"
+
+ADDON_ROOT = os.path.abspath(os.path.dirname(__file__))
+
+PROBE = """
+import json, statistics, sys, time
+sys.path.insert(0, {root!r})
+import proteinblender
+proteinblender.register()
+from biotite.structure.io import pdbx
+from proteinblender.utils.molecularnodes.download import download
+from proteinblender.utils.molecularnodes.entities.molecule.pdbx import CIFAssemblyParser
+from proteinblender.utils.molecularnodes.utils import array_quaternions_from_dict
+
+results = {{}}
+for code in {codes!r}:
+    file = pdbx.BinaryCIFFile.read(download(code, format="bcif"))
+    parse, convert = [], []
+    for _ in range({runs}):
+        start = time.perf_counter()
+        assemblies = CIFAssemblyParser(file).get_assemblies()
+        middle = time.perf_counter()
+        array = array_quaternions_from_dict(json.dumps(assemblies))
+        parse.append(middle - start)
+        convert.append(time.perf_counter() - middle)
+    results[code] = {{
+        "operators": sum(len(a) for a in assemblies.values()),
+        "instances": len(array),
+        "parse": statistics.median(parse),
+        "convert": statistics.median(convert),
+    }}
+print({marker!r} + json.dumps(results))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure assembly parsing time")
+    parser.add_argument("--blender", default=shutil.which("blender") or "blender")
+    parser.add_argument("--codes", nargs="+", default=DEFAULT_CODES)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    probe = PROBE.format(root=ADDON_ROOT, codes=args.codes, runs=args.runs, marker=MARKER)
+    result = subprocess.run(
+        [args.blender, "--background", "--factory-startup", "--python-expr", probe],
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            results = json.loads(line[len(MARKER):])
+            break
+    else:
+        print(result.stdout)
+        print(result.stderr, file=sys.stderr)
+        raise RuntimeError("Blender did not report assembly timings")
+
+    for code, timing in results.items():
+        print(
+            f"{code}: {timing['operators']} operators, {timing['instances']} instances, "
+            f"parse {timing['parse'] * 1000:.1f} ms, convert {timing['convert'] * 1000:.1f} ms "
+            f"(median of {args.runs} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
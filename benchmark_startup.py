@@ -0,0 +1,73 @@
+# Startup benchmark: measure how long Blender takes to enable the addon
+#
+# Usage:
+#   python benchmark_startup.py [--blender /path/to/blender] [--runs 5]
+#
+# Every run starts a fresh headless Blender so module caches are cold, imports
+# and registers proteinblender from this checkout and reports the time spent
+# together with the heavy optional modules that were imported on the way.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+# Modules that should only be imported once the user opens a matching file
+HEAVY_MODULES = ["MDAnalysis", "scipy", "pandas", "mrcfile", "starfile", "PIL", "biotite"]
+
+MARKER = "PB_STARTUP_RESULT:"
+
+ADDON_ROOT = os.path.abspath(os.path.dirname(__file__))
+
+PROBE = f"""
+import json, sys, time
+sys.path.insert(0, {ADDON_ROOT!r})
+start = time.perf_counter()
+import proteinblender
+proteinblender.register()
+elapsed = time.perf_counter() - start
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print({MARKER!r} + json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_once(blender):
+    """Start Blender once and return the measured enable time and modules."""
+    result = subprocess.run(
+        [blender, "--background", "--factory-startup", "--python-expr", PROBE],
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    print(result.stdout)
+    print(result.stderr, file=sys.stderr)
+    raise RuntimeError("Blender did not report a startup time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ProteinBlender startup time")
+    parser.add_argument("--blender", default=shutil.which("blender") or "blender")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    heavy = set()
+    for i in range(args.runs):
+        result = run_once(args.blender)
+        timings.append(result["seconds"])
+        heavy.update(result["heavy"])
+        print(f"Run {i + 1}: {result['seconds'] * 1000:.1f} ms")
+
+    print(f"Median startup time: {statistics.median(timings) * 1000:.1f} ms over {args.runs} runs")
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(sorted(heavy))}")
+    else:
+        print("No heavy modules imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -75,6 +75,22 @@ def _unload_modules() -> None:
         time.sleep(0.5)
 
 
+def _version_satisfies(version: str, required_version: str) -> bool:
+    """Check an installed version against a specifier such as ">=1.2,<2.0".
+
+    Uses ``packaging`` (or the copy vendored by pip). If neither is available
+    the version is assumed to be fine, the import test still runs.
+    """
+    try:
+        from packaging.specifiers import SpecifierSet
+    except ImportError:
+        try:
+            from pip._vendor.packaging.specifiers import SpecifierSet
+        except ImportError:
+            return True
+    return SpecifierSet(required_version).contains(version, prereleases=True)
+
+
 def _needs_reinstall(package_name: str, required_version: str) -> bool:
     """Check if a package needs to be reinstalled.
 
@@ -85,22 +101,19 @@ def _needs_reinstall(package_name: str, required_version: str) -> bool:
     Returns:
         bool: True if the package needs to be reinstalled, False otherwise.
     """
+    from importlib import metadata
+
     try:
-        import pkg_resources
-        dist = pkg_resources.get_distribution(package_name)
-
-        if not required_version:
-            # No specific version required, package exists, so it's fine
-            # But still check if it can be imported
-            pass
-        else:
-            from pkg_resources import Requirement
-            req = Requirement.parse(f"{package_name}{required_version}")
-
-            # Check if current version meets requirement
-            if dist.version not in req:
-                logger.info(f"{package_name} version {dist.version} does not meet requirement {required_version}")
-                return True
+        # Reads only this distribution's metadata instead of scanning every
+        # installed distribution
+        installed_version = metadata.version(package_name)
+    except metadata.PackageNotFoundError:
+        return True  # Package not found, needs install
+
+    try:
+        if required_version and not _version_satisfies(installed_version, required_version):
+            logger.info(f"{package_name} version {installed_version} does not meet requirement {required_version}")
+            return True
 
         # Try to import the package to verify it's not corrupted
         # Map package names to their import names and test imports
@@ -128,8 +141,8 @@ def _needs_reinstall(package_name: str, required_version: str) -> bool:
 
         return False  # Package is installed and working
 
-    except (pkg_resources.DistributionNotFound, Exception):
-        return True  # Package not found or error checking, needs install
+    except Exception:
+        return True  # Error checking, needs install
 
 
 def _can_import_core_packages():
@@ -222,29 +235,14 @@ def ensure_packages(packages: Dict[str, str]) -> bool:
         logger.info("Preparing for package installation on Windows...")
         _unload_modules()
 
-    try:
-        import pkg_resources
-    except ImportError:
-        logger.error("pkg_resources not found. Attempting to install setuptools...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "setuptools"])
-            import pkg_resources
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to install setuptools: {e}")
-            _show_error_popup("Failed to install setuptools. Please install manually.")
-            return False
-
     import importlib.util
     import glob
 
     # Find the wheels directory relative to this file
     wheels_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "wheels"))
 
-    # Reload pkg_resources to ensure it picks up newly installed packages
-    try:
-        importlib.reload(pkg_resources)
-    except Exception as e:
-        logger.warning(f"Could not reload pkg_resources: {e}")
+    # Make sure metadata and import lookups see newly installed packages
+    importlib.invalidate_caches()
 
     packages_installed_or_updated = False
     restart_required = False
@@ -400,8 +398,7 @@ def _show_error_popup(message: str) -> None:
 def _reload_modules(packages: Dict[str, str]) -> None:
     """Reload modules after package installation."""
     try:
-        import pkg_resources
-        importlib.reload(pkg_resources)
+        importlib.invalidate_caches()
 
         # Reload specific modules if they were updated
         modules_to_reload = {
@@ -461,31 +458,84 @@ import json
 from pathlib import Path
 
 _cache_file = Path(__file__).parent / ".dependency_cache.json"
-_cache_validity_hours = 24  # Check dependencies once per day
-
-def _should_check_dependencies():
-    """Check if we need to verify dependencies based on cache"""
-    if not _cache_file.exists():
-        return True
+_cache_validity_hours = 24  # Retry failed installs at most once per day
 
+def _load_dependency_cache() -> dict:
+    """Read the dependency cache file, or an empty dict"""
     try:
         with open(_cache_file, 'r') as f:
-            cache_data = json.load(f)
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _dependency_fingerprint(hash_wheels=False):
+    """Fingerprint of the installed dependencies, without importing them.
+
+    Combines the version and a hash of the RECORD file (which lists the hash
+    of every installed file) of each required distribution with the name and
+    size of each bundled wheel. Only package metadata is read, unless
+    hash_wheels is set, which also hashes the contents of the wheels.
+
+    Args:
+        hash_wheels: Add the SHA-256 of each wheel, for recording a fingerprint
+
+    Returns:
+        dict or None: The fingerprint, or None if a distribution is missing
+    """
+    import hashlib
+    from importlib import metadata
+
+    fingerprint = {}
+    for package_name in REQUIRED_PACKAGES:
+        try:
+            dist = metadata.distribution(package_name)
+        except metadata.PackageNotFoundError:
+            return None
+        record = dist.read_text('RECORD') or ''
+        fingerprint[package_name] = f"{dist.version}:{hashlib.sha256(record.encode()).hexdigest()[:16]}"
+
+    wheels_dir = Path(__file__).parent / "wheels"
+    if wheels_dir.is_dir():
+        wheels = {}
+        for wheel in sorted(wheels_dir.glob("*.whl")):
+            wheels[wheel.name] = {'size': wheel.stat().st_size}
+            if hash_wheels:
+                with open(wheel, 'rb') as f:
+                    wheels[wheel.name]['sha256'] = hashlib.file_digest(f, 'sha256').hexdigest()
+        fingerprint['wheels'] = wheels
+
+    return fingerprint
+
+def _fingerprint_matches(fingerprint, recorded) -> bool:
+    """Compare a startup fingerprint with a recorded one.
+
+    Wheels are compared by name and size only, so startup never reads them.
+    """
+    if fingerprint is None or not isinstance(recorded, dict):
+        return False
 
-        last_check = cache_data.get('last_check', 0)
-        import time
-        hours_since_check = (time.time() - last_check) / 3600
+    def wheel_sizes(fp):
+        wheels = fp.get('wheels', {})
+        if not isinstance(wheels, dict):
+            return None
+        return {name: entry.get('size') for name, entry in wheels.items()}
 
-        return hours_since_check > _cache_validity_hours
-    except:
-        return True
+    def packages(fp):
+        return {name: value for name, value in fp.items() if name != 'wheels'}
 
-def _update_dependency_cache():
-    """Update the cache file with current timestamp"""
+    return packages(fingerprint) == packages(recorded) and wheel_sizes(fingerprint) == wheel_sizes(recorded)
+
+def _should_check_dependencies():
+    """Check if we need to verify dependencies based on cache"""
+    last_check = _load_dependency_cache().get('last_check', 0)
+    hours_since_check = (time.time() - last_check) / 3600
+    return hours_since_check > _cache_validity_hours
+
+def _update_dependency_cache(fingerprint=None):
+    """Record the current timestamp and the verified dependency fingerprint"""
     try:
-        import time
         with open(_cache_file, 'w') as f:
-            json.dump({'last_check': time.time()}, f)
+            json.dump({'last_check': time.time(), 'fingerprint': fingerprint}, f)
     except Exception as e:
         logger.debug(f"Could not update dependency cache: {e}")
 
@@ -495,19 +545,25 @@ if DEV_MODE:
     dependencies_installed = True
 else:
     # Normal mode: Smart dependency checking to avoid permission errors during updates
-    # Step 1: Quick check if all packages are importable (no pip operations)
-    if _can_import_core_packages():
+    # Step 1: Compare metadata against the last verified fingerprint (no imports)
+    fingerprint = _dependency_fingerprint()
+    if _fingerprint_matches(fingerprint, _load_dependency_cache().get('fingerprint')):
+        logger.info("Dependencies unchanged since last verification, skipping checks")
+        dependencies_installed = True
+    # Step 2: Check that all packages are importable (no pip operations)
+    elif _can_import_core_packages():
         logger.info("All core packages importable, skipping installation")
         dependencies_installed = True
-        # Update cache to prevent check on next startup
-        _update_dependency_cache()
-    # Step 2: Only run full pip install if imports fail AND cache expired
+        # Record the fingerprint so the next startup skips the imports
+        _update_dependency_cache(_dependency_fingerprint(hash_wheels=True))
+    # Step 3: Only run full pip install if imports fail AND cache expired
     elif _should_check_dependencies():
         logger.info("Core packages missing or cache expired, verifying dependencies...")
         dependencies_installed = ensure_packages(REQUIRED_PACKAGES)
         if dependencies_installed:
-            _update_dependency_cache()
-    # Step 3: Trust the cache if it's still valid
+            importlib.invalidate_caches()
+            _update_dependency_cache(_dependency_fingerprint(hash_wheels=True))
+    # Step 4: Trust the cache if it's still valid
     else:
         logger.info("Dependencies checked recently, skipping verification")
         dependencies_installed = True
@@ -7,6 +7,7 @@ including operators, panels, properties, and handlers.
 import bpy
 from bpy.props import PointerProperty, BoolProperty
 import logging
+import sys
 from typing import List, Type
 
 from .core import CLASSES as core_classes
@@ -177,6 +178,16 @@ def unregister() -> None:
     except Exception as e:
         logger.debug(f"Failed to unregister frame change handler: {e}")
 
+    # Unregister STAR micrograph handlers and stop texture conversions. The
+    # handlers only exist once a STAR file was loaded, and importing the
+    # module here would load biotite and friends on every register()
+    try:
+        star = sys.modules.get(f"{__package__}.utils.molecularnodes.entities.ensemble.star")
+        if star is not None:
+            star.unregister_handlers()
+    except Exception as e:
+        logger.debug(f"Failed to unregister micrograph handlers: {e}")
+
     # Unregister properties
     try:
         unregister_protein_props()
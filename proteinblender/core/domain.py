@@ -4,6 +4,7 @@ from bpy.types import PropertyGroup
 from bpy.props import (BoolProperty, StringProperty, IntProperty, PointerProperty, 
                       FloatVectorProperty, EnumProperty)
 from ..utils.molecularnodes.style import STYLE_ITEMS
+from ..utils.node_templates import DOMAIN_MODIFIER, domain_tree_name, find_style_node, is_domain_tree
 
 class DomainProperties(PropertyGroup):
     """Complete domain properties class to encapsulate all domain data"""
@@ -200,7 +201,11 @@ class DomainDefinition:
             return False
 
     def _setup_node_group(self):
-        """Set up the geometry nodes network for the domain by copying parent network"""
+        """Set up the geometry nodes network for the domain.
+
+        Domains of a molecule with the same style share one tree, so the
+        parent network is only copied for the first domain of a style.
+        """
         if not self.object:
             return False
 
@@ -214,10 +219,21 @@ class DomainDefinition:
                 print("Parent has no valid node group (neither MolecularNodes nor DomainNodes)")
                 return False
 
-            # Copy the parent node group
             parent_node_group = parent_modifier.node_group
-            self.node_group = parent_node_group.copy()
-            self.node_group.name = f"{self.name}_nodes"
+            style_node = find_style_node(parent_node_group)
+            shared = None
+            if style_node is not None:
+                shared = bpy.data.node_groups.get(
+                    domain_tree_name(self.parent_molecule_id, style_node.node_tree.name)
+                )
+
+            if is_domain_tree(shared):
+                self.node_group = shared
+            else:
+                # Copy the parent node group, MoleculeWrapper._setup_domain_network
+                # turns it into the shared tree for this style
+                self.node_group = parent_node_group.copy()
+                self.node_group.name = f"{self.name}_nodes"
             self.node_group_name = self.node_group.name
 
             # Remove the old modifier (either MolecularNodes or DomainNodes) and create our new one
@@ -233,27 +249,30 @@ class DomainDefinition:
 
         except Exception as e:
             print(f"Error setting up node group: {str(e)}")
-            # Clean up if setup failed
-            if self.node_group:
+            # Clean up if setup failed, shared trees belong to other domains too
+            if self.node_group and self.node_group.users == 0:
                 bpy.data.node_groups.remove(self.node_group)
             return False
 
+    def sync_node_group(self):
+        """Re-read the node group from the domain modifier, e.g. after a style switch"""
+        modifier = self.object.modifiers.get(DOMAIN_MODIFIER) if self.object else None
+        if modifier is not None and modifier.node_group is not None:
+            self.node_group = modifier.node_group
+            self.node_group_name = self.node_group.name
+
     def cleanup(self):
         """Remove domain object and node group"""
         try:
+            # Node groups are removed after the object, once nothing uses them
+            node_groups = [self.node_group] if self.node_group else []
+
             # Clean up object
             if self.object:
-                # Clean up node groups first
                 if self.object.modifiers:
                     for modifier in self.object.modifiers:
                         if modifier.type == 'NODES' and modifier.node_group:
-                            try:
-                                node_group = modifier.node_group
-                                if node_group and node_group.name in bpy.data.node_groups:
-                                    bpy.data.node_groups.remove(node_group, do_unlink=True)
-                            except ReferenceError:
-                                # Node group already removed, skip
-                                pass
+                            node_groups.append(modifier.node_group)
                 
                 # Store object data
                 obj_data = self.object.data
@@ -270,16 +289,16 @@ class DomainDefinition:
                 # Clear reference
                 self.object = None
             
-            # Clean up node group
-            if self.node_group:
+            # Clean up node groups, other domains may still share them
+            for node_group in node_groups:
                 try:
-                    if self.node_group.name in bpy.data.node_groups:
-                        bpy.data.node_groups.remove(self.node_group, do_unlink=True)
+                    if node_group.name in bpy.data.node_groups and node_group.users == 0:
+                        bpy.data.node_groups.remove(node_group, do_unlink=True)
                 except ReferenceError:
                     # Node group already removed, skip
                     pass
-                self.node_group = None
-                self.node_group_name = ""
+            self.node_group = None
+            self.node_group_name = ""
             
             # Clean up any custom node trees
             for node_group in list(bpy.data.node_groups):  # Create a copy of the list to avoid modification during iteration
@@ -7,7 +7,6 @@ from typing import Optional, Dict
 from pathlib import Path
 import bpy
 
-from ..utils.molecularnodes.entities import fetch, load_local
 from .molecule_wrapper import MoleculeWrapper
 
 
@@ -31,6 +30,9 @@ class MoleculeManager:
         
     def import_from_pdb(self, pdb_id: str, molecule_id: str, style: str = "surface", **kwargs) -> MoleculeWrapper:
         """Import a molecule from PDB"""
+        # Imported here so registering the addon does not load biotite
+        from ..utils.molecularnodes.entities import fetch
+
         try:
             # Use MolecularNodes fetch functionality
             mol = fetch(
@@ -53,6 +55,8 @@ class MoleculeManager:
             
     def import_from_file(self, filepath: str, name: Optional[str] = None) -> MoleculeWrapper:
         """Import a molecule from a local file"""
+        from ..utils.molecularnodes.entities import load_local
+
         try:
             mol = load_local(
                 file_path=filepath,
@@ -1,20 +1,71 @@
-from typing import Optional, Dict, List, Tuple
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Optional, Dict, List, Tuple
 import bpy
 import numpy as np
 import colorsys
 from mathutils import Vector
 
-from ..utils.molecularnodes.entities.molecule.molecule import Molecule
 from ..utils.molecularnodes.blender import nodes
+from ..utils.node_templates import (
+    CHAIN_INPUT,
+    COLOR_INPUT,
+    MATERIAL_INPUT,
+    RESIDUE_MAX_INPUT,
+    RESIDUE_MIN_INPUT,
+    chain_selection_group,
+    domain_tree_name,
+    expose_domain_inputs,
+    find_style_node,
+    get_style_material,
+    is_domain_tree,
+    set_domain_color,
+    set_modifier_inputs,
+    use_domain_tree,
+)
 from .domain import DomainDefinition
 from ..core.domain import ensure_domain_properties_registered
 
+if TYPE_CHECKING:
+    from ..utils.molecularnodes.entities.molecule.molecule import Molecule
+
+# Object properties recording the assembly instancing of a molecule
+ASSEMBLY_INSTANCING_PROP = "pb_assembly_instancing"
+ASSEMBLY_ID_PROP = "pb_assembly_id"
+
+# Name of the assembly node inserted before the group output
+ASSEMBLY_NODE_NAME = "Assembly Instances"
+
+# Nodes around the assembly node that undo the pivot shift of the mesh
+ASSEMBLY_PIVOT_IN_NAME = "Assembly Pivot In"
+ASSEMBLY_PIVOT_OUT_NAME = "Assembly Pivot Out"
+ASSEMBLY_OFFSET_NAME = "Assembly Pivot Offset"
+ASSEMBLY_NEGATE_NAME = "Assembly Pivot Negate"
+ASSEMBLY_FIRST_ATOM_NAME = "Assembly First Atom"
+ASSEMBLY_POSITION_NAME = "Assembly Position"
+ASSEMBLY_NODE_NAMES = (
+    ASSEMBLY_NODE_NAME,
+    ASSEMBLY_PIVOT_IN_NAME,
+    ASSEMBLY_PIVOT_OUT_NAME,
+    ASSEMBLY_OFFSET_NAME,
+    ASSEMBLY_NEGATE_NAME,
+    ASSEMBLY_FIRST_ATOM_NAME,
+    ASSEMBLY_POSITION_NAME,
+)
+
+# Mesh property with the first atom position before any pivot was set
+ASSEMBLY_ORIGIN_PROP = "pb_assembly_origin"
+
+
 class MoleculeWrapper:
     """
     Wraps a MolecularNodes molecule and provides additional functionality
     and metadata specific to ProteinBlender
     """
-    def __init__(self, molecule: Molecule, identifier: str):
+
+    # Nesting depth of batch() blocks; edits are queued while it is non-zero
+    _batch_depth = 0
+
+    def __init__(self, molecule: 'Molecule', identifier: str):
         self.molecule = molecule
         self.identifier = identifier
         self.style = "surface"  # Default style
@@ -164,6 +215,114 @@ class MoleculeWrapper:
                 parent_node_group.links.remove(link)
         '''
         
+    @contextmanager
+    def batch(self):
+        """Group domain edits into a single transaction.
+
+        Inside the block, mask node changes in the parent molecule's node
+        tree, domain name normalization and callbacks registered with
+        ``defer`` (such as the outliner refresh) are queued. The molecule
+        state is captured for undo only once. Everything is applied when the
+        outermost block exits, so segmenting a protein into many domains
+        costs one refresh instead of one per edit.
+
+        Example::
+
+            with wrapper.batch():
+                for start, end in ranges:
+                    bpy.ops.proteinblender.split_domain(...)
+        """
+        if self._batch_depth == 0:
+            self._pending_mask_removals = []
+            self._pending_masks = {}
+            self._pending_normalize = {}
+            self._deferred = {}
+            self._state_captured = False
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit_batch()
+
+    @property
+    def in_batch(self) -> bool:
+        """Whether domain edits are currently being queued by batch()"""
+        return self._batch_depth > 0
+
+    def defer(self, key: str, callback: Callable[[], None]) -> None:
+        """Run callback now, or once when the current batch commits.
+
+        Callbacks sharing a key are coalesced and only the last one runs.
+        """
+        if self.in_batch:
+            self._deferred.pop(key, None)
+            self._deferred[key] = callback
+        else:
+            callback()
+
+    def claim_state_capture(self) -> bool:
+        """Return True if the molecule state should be captured for undo now.
+
+        Inside a batch only the first edit captures, which records the state
+        from before the whole transaction.
+        """
+        if not self.in_batch:
+            return True
+        if self._state_captured:
+            return False
+        self._state_captured = True
+        return True
+
+    def _request_normalize(self, domain_id: str) -> None:
+        """Normalize a domain name now, or when the current batch commits."""
+        if self.in_batch:
+            self._pending_normalize[domain_id] = None
+        else:
+            self._normalize_domain_name(domain_id)
+
+    def _commit_batch(self) -> None:
+        """Apply the mask nodes, names and callbacks queued by batch()."""
+        removals = self._pending_mask_removals
+        masks = self._pending_masks
+        normalize = self._pending_normalize
+        deferred = self._deferred
+        self._pending_mask_removals = []
+        self._pending_masks = {}
+        self._pending_normalize = {}
+        self._deferred = {}
+
+        # Node tree: drop all stale masks first so their join slots are free
+        parent_node_group = self._get_parent_node_group()
+        if parent_node_group is not None:
+            self._remove_mask_nodes(parent_node_group, removals)
+            for domain_id, (chain_id, start, end) in masks.items():
+                if domain_id in self.domains:
+                    self._create_domain_mask_nodes(domain_id, chain_id, start, end)
+
+        for domain_id in normalize:
+            if domain_id in self.domains:
+                self._normalize_domain_name(domain_id)
+
+        for callback in deferred.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error running deferred domain update: {e}")
+
+    def _get_parent_node_group(self):
+        """Return the node group of the parent molecule's MolecularNodes modifier."""
+        try:
+            if not self.molecule.object:
+                return None
+            parent_modifier = self.molecule.object.modifiers.get("MolecularNodes")
+        except ReferenceError:
+            return None
+        if not parent_modifier or not parent_modifier.node_group:
+            return None
+        return parent_modifier.node_group
+
     @property
     def object(self) -> bpy.types.Object:
         """Get the Blender object"""
@@ -661,7 +820,7 @@ class MoleculeWrapper:
         # Normalize names for ALL newly created domains from this operation
         for new_id in all_newly_created_domain_ids:
             if new_id in self.domains: # Ensure it exists before normalizing
-                self._normalize_domain_name(new_id)
+                self._request_normalize(new_id)
             else:
                 print(f"Warning: Domain ID {new_id} from split operation not found in self.domains for normalization.")
 
@@ -992,6 +1151,10 @@ class MoleculeWrapper:
         try:
             obj = self.molecule.object
 
+            # Assembly operators are in the frame of the file, keep a
+            # reference to it before the vertices are moved
+            self._record_assembly_origin()
+
             # Calculate center of mass for entire protein
             center_of_mass = self._calculate_center_of_mass(context, obj)
 
@@ -1288,6 +1451,271 @@ class MoleculeWrapper:
         # No suitable gap found
         return None
         
+    def _chain_alpha_carbons(self, chain_id: str):
+        """Return (coords, res_ids, sec_struct) of the alpha carbons of a chain.
+
+        Args:
+            chain_id: Numeric chain index as string, or a label/author chain ID
+
+        Returns:
+            Tuple of numpy arrays in sequence order; sec_struct is None when
+            the structure has no secondary structure annotation
+        """
+        array = self.working_array
+        if str(chain_id).isdigit():
+            chain_index = int(chain_id)
+        else:
+            chain_index = self.get_int_chain_index(str(chain_id))
+        if chain_index is None:
+            return np.empty((0, 3)), np.empty(0, dtype=int), None
+
+        mask = (array.chain_id_int == chain_index) & (array.atom_name == "CA")
+        if "hetero" in array.get_annotation_categories():
+            mask &= ~array.hetero
+        order = np.argsort(array.res_id[mask], kind='stable')
+        coords = array.coord[mask][order]
+        res_ids = array.res_id[mask][order]
+        sec_struct = None
+        if "sec_struct" in array.get_annotation_categories():
+            sec_struct = array.sec_struct[mask][order]
+        return coords, res_ids, sec_struct
+
+    def propose_domains(self, chain_id: str, **options) -> List[Tuple[int, int]]:
+        """Propose structural domains for a chain from its alpha carbons.
+
+        Args:
+            chain_id: Numeric chain index as string, or a label/author chain ID
+            **options: cutoff, min_domain_size, max_ncut and max_domains, see
+                ``utils.domain_segmentation.segment``
+
+        Returns:
+            List of (start, end) residue ranges tiling the chain
+        """
+        from ..utils.domain_segmentation import propose_domains
+
+        coords, res_ids, sec_struct = self._chain_alpha_carbons(chain_id)
+        if len(coords) == 0:
+            return []
+
+        chain_id_int = int(chain_id) if str(chain_id).isdigit() else chain_id
+        mapped_chain = self.chain_mapping.get(chain_id_int, str(chain_id))
+        chain_range = self.chain_residue_ranges.get(mapped_chain)
+        return propose_domains(coords, res_ids, sec_struct, chain_range=chain_range, **options)
+
+    def auto_segment_chain(self, chain_id: str, **options) -> List[str]:
+        """Replace the domains of a chain with automatically proposed ones.
+
+        All domains are created in one batch, so node tree updates and name
+        normalization happen once for the whole chain.
+
+        Args:
+            chain_id: Numeric chain index as string, as used by
+                _create_domain_with_params
+            **options: Passed on to ``propose_domains``
+
+        Returns:
+            IDs of the created domains, or an empty list if the chain does
+            not split into more than one domain
+        """
+        ranges = self.propose_domains(chain_id, **options)
+        if len(ranges) < 2:
+            return []
+
+        chain_id_int = int(chain_id) if str(chain_id).isdigit() else chain_id
+        mapped_chain = self.chain_mapping.get(chain_id_int, str(chain_id))
+
+        created_ids = []
+        with self.batch():
+            for domain_id in [d_id for d_id, d in self.domains.items() if d.chain_id == mapped_chain]:
+                self._delete_domain_direct(domain_id)
+            for start, end in ranges:
+                created_ids.extend(self._create_domain_with_params(
+                    chain_id, start, end,
+                    auto_fill_chain=False,
+                    parent_domain_id="NO_AUTO_PARENT",
+                ) or [])
+            for domain_id in created_ids:
+                self._request_normalize(domain_id)
+        return created_ids
+
+    @property
+    def assembly_instancing(self) -> bool:
+        """True if the biological assembly is instanced from the asymmetric unit"""
+        try:
+            return bool(self.object and self.object.get(ASSEMBLY_INSTANCING_PROP))
+        except ReferenceError:
+            return False
+
+    def has_assemblies(self) -> bool:
+        """True if the imported file described any biological assembly"""
+        try:
+            assemblies = self.object.mn.biological_assemblies if self.object else ""
+        except (AttributeError, ReferenceError):
+            return False
+        # Stored as JSON, "{}" when the file has none
+        return assemblies.strip() not in ("", "{}", "null")
+
+    def enable_assembly_instancing(self, assembly_id: int = 1) -> bool:
+        """Show the biological assembly by instancing the asymmetric unit.
+
+        Every chain keeps a single copy of its atoms. The parent and domain
+        node trees end in the molecule's MolecularNodes assembly node, which
+        instances each chain with its symmetry operators, so domains, colors
+        and styles apply to all copies of a chain. Domain transforms move all
+        copies together, in the frame of the asymmetric unit.
+
+        Args:
+            assembly_id: Assembly to build, 1 is the first one in the file
+
+        Returns:
+            bool: False if the file has no assembly information
+        """
+        if not self.has_assemblies():
+            return False
+
+        self._record_assembly_origin()
+        self.object[ASSEMBLY_INSTANCING_PROP] = True
+        self.object[ASSEMBLY_ID_PROP] = assembly_id
+        for tree in self._assembly_node_trees():
+            self._insert_assembly_node(tree)
+        return True
+
+    def disable_assembly_instancing(self):
+        """Remove the assembly instancing added by enable_assembly_instancing"""
+        for tree in self._assembly_node_trees():
+            node = tree.nodes.get(ASSEMBLY_NODE_NAME)
+            if node is None:
+                continue
+            # Files from before the pivot nodes feed the assembly node directly
+            first = tree.nodes.get(ASSEMBLY_PIVOT_IN_NAME) or node
+            output = nodes.get_output(tree)
+            for link in list(first.inputs[0].links):
+                tree.links.new(link.from_socket, output.inputs[0])
+            for name in ASSEMBLY_NODE_NAMES:
+                if name in tree.nodes:
+                    tree.nodes.remove(tree.nodes[name])
+
+        if self.object:
+            for prop in (ASSEMBLY_INSTANCING_PROP, ASSEMBLY_ID_PROP):
+                if prop in self.object:
+                    del self.object[prop]
+
+    def _assembly_node_trees(self):
+        """Node trees of the parent molecule and all of its domains"""
+        trees = [self._get_parent_node_group()]
+        trees.extend(domain.node_group for domain in self.domains.values())
+        # Domains with the same style share a tree, visit it once
+        return list({tree.name: tree for tree in trees if tree is not None}.values())
+
+    def _record_assembly_origin(self):
+        """Store the first atom position of the molecule mesh once.
+
+        Pivots are set with origin_set, which moves the mesh vertices. The
+        offset of the first atom from this position is how far a mesh, or
+        a domain mesh copied from it, was moved away from the file frame.
+        """
+        mesh = self.object.data if self.object else None
+        if mesh is None or ASSEMBLY_ORIGIN_PROP in mesh or not len(mesh.vertices):
+            return
+        mesh[ASSEMBLY_ORIGIN_PROP] = list(mesh.vertices[0].co)
+
+    def _assembly_pivot_nodes(self, tree, node):
+        """Find or create the transforms that wrap the assembly node.
+
+        The offset of the object's mesh from the file frame is measured in
+        the tree, from the first atom of the input geometry, so it follows
+        every later change of the object's pivot.
+
+        Returns:
+            Tuple of (pivot_in, pivot_out) Transform Geometry nodes
+        """
+        input_node = nodes.get_input(tree)
+        x, y = node.location
+
+        first_atom = tree.nodes.get(ASSEMBLY_FIRST_ATOM_NAME)
+        if first_atom is None:
+            first_atom = tree.nodes.new("GeometryNodeSampleIndex")
+            first_atom.name = ASSEMBLY_FIRST_ATOM_NAME
+            first_atom.data_type = 'FLOAT_VECTOR'
+            first_atom.domain = 'POINT'
+            first_atom.location = (x - 400, y - 250)
+            position = tree.nodes.new("GeometryNodeInputPosition")
+            position.name = ASSEMBLY_POSITION_NAME
+            position.location = (x - 600, y - 350)
+            tree.links.new(position.outputs[0], first_atom.inputs["Value"])
+        tree.links.new(input_node.outputs[0], first_atom.inputs["Geometry"])
+
+        # The pivot offset is the recorded first atom minus its current position
+        offset = tree.nodes.get(ASSEMBLY_OFFSET_NAME)
+        if offset is None:
+            offset = tree.nodes.new("ShaderNodeVectorMath")
+            offset.name = ASSEMBLY_OFFSET_NAME
+            offset.operation = 'SUBTRACT'
+            offset.location = (x - 200, y - 250)
+            tree.links.new(first_atom.outputs[0], offset.inputs[1])
+        origin = self.object.data.get(ASSEMBLY_ORIGIN_PROP)
+        if origin is not None:
+            offset.inputs[0].default_value = tuple(origin)
+
+        pivot_in = tree.nodes.get(ASSEMBLY_PIVOT_IN_NAME)
+        if pivot_in is None:
+            pivot_in = tree.nodes.new("GeometryNodeTransform")
+            pivot_in.name = ASSEMBLY_PIVOT_IN_NAME
+            pivot_in.location = (x - 200, y)
+            tree.links.new(offset.outputs[0], pivot_in.inputs["Translation"])
+
+        pivot_out = tree.nodes.get(ASSEMBLY_PIVOT_OUT_NAME)
+        if pivot_out is None:
+            pivot_out = tree.nodes.new("GeometryNodeTransform")
+            pivot_out.name = ASSEMBLY_PIVOT_OUT_NAME
+            pivot_out.location = (x + 200, y)
+            negate = tree.nodes.new("ShaderNodeVectorMath")
+            negate.name = ASSEMBLY_NEGATE_NAME
+            negate.operation = 'SCALE'
+            negate.inputs["Scale"].default_value = -1.0
+            negate.location = (x, y - 250)
+            tree.links.new(offset.outputs[0], negate.inputs[0])
+            tree.links.new(negate.outputs[0], pivot_out.inputs["Translation"])
+
+        return pivot_in, pivot_out
+
+    def _insert_assembly_node(self, tree):
+        """Route the output geometry of tree through the assembly node.
+
+        The assembly node tree and its transform data object are created
+        once per molecule by MolecularNodes and shared by all its trees.
+        The symmetry operators apply to atoms in the frame of the file, so
+        the geometry is moved back by the pivot offset of the mesh before
+        instancing and forward again afterwards. Each copy then lands at
+        R x + t in the file frame instead of R (x - pivot) + t.
+        """
+        assembly_tree = nodes.assembly_initialise(self.object)
+        output = nodes.get_output(tree)
+        geometry_input = output.inputs[0]
+
+        node = tree.nodes.get(ASSEMBLY_NODE_NAME)
+        if node is None:
+            node = tree.nodes.new("GeometryNodeGroup")
+            node.node_tree = assembly_tree
+            node.name = ASSEMBLY_NODE_NAME
+            node.location = (output.location.x, output.location.y - 200)
+        node.inputs["assembly_id"].default_value = self.object.get(ASSEMBLY_ID_PROP, 1)
+        pivot_in, pivot_out = self._assembly_pivot_nodes(tree, node)
+
+        for link in list(geometry_input.links):
+            source = link.from_socket
+            if link.from_node == pivot_out:
+                continue
+            if link.from_node == node:
+                # Files from before the pivot nodes feed the assembly node directly
+                if not node.inputs[0].links:
+                    continue
+                source = node.inputs[0].links[0].from_socket
+            tree.links.new(source, pivot_in.inputs["Geometry"])
+        tree.links.new(pivot_in.outputs[0], node.inputs[0])
+        tree.links.new(node.outputs[0], pivot_out.inputs["Geometry"])
+        tree.links.new(pivot_out.outputs[0], geometry_input)
+
     def _get_available_chains(self) -> List[str]:
         """Get list of all available chains in the molecule"""
         available_chains = []
@@ -1334,6 +1762,8 @@ class MoleculeWrapper:
             if self._check_domain_overlap(chain_id, start, end, exclude_domain_id=domain_id):
                 return domain_id
                 
+            same_chain = str(domain.chain_id) == str(chain_id)
+            
             # Update domain definition
             domain.chain_id = chain_id
             domain.start = start
@@ -1347,8 +1777,12 @@ class MoleculeWrapper:
                 domain.object.name = f"{domain.name}_{chain_id}_{start}_{end}"
                 domain.object["domain_id"] = new_domain_id
             
-            # Update domain node network
-            self._setup_domain_network(domain, chain_id, start, end)
+            # A new range on the same chain only needs the modifier inputs;
+            # domains from older files without them get their network rebuilt
+            if not (same_chain and set_modifier_inputs(
+                domain.object, {RESIDUE_MIN_INPUT: start, RESIDUE_MAX_INPUT: end}
+            )):
+                self._setup_domain_network(domain, chain_id, start, end)
             
             # Update domain mask nodes
             self._delete_domain_mask_nodes(domain_id) # Delete old mask
@@ -1365,11 +1799,11 @@ class MoleculeWrapper:
                 # Normalization called by the caller of update_domain, or if ID does not change, see below.
                 # For now, let's assume caller handles normalization for the *returned* ID.
                 # However, if the ID changes, the *new* domain should be normalized.
-                self._normalize_domain_name(new_domain_id) 
+                self._request_normalize(new_domain_id)
                 return new_domain_id
             
             # If domain ID didn't change, still normalize its name as its range or context might have.
-            self._normalize_domain_name(domain_id)
+            self._request_normalize(domain_id)
             return domain_id
             
         except Exception:
@@ -1379,44 +1813,46 @@ class MoleculeWrapper:
 
     def _delete_domain_mask_nodes(self, domain_id: str):
         """Delete mask nodes for a domain in the parent molecule's node group"""
+        if self.in_batch:
+            # A mask queued in this batch was never built
+            self._pending_masks.pop(domain_id, None)
+            if domain_id in self.domain_mask_nodes:
+                self._pending_mask_removals.extend(self.domain_mask_nodes.pop(domain_id))
+            return
+
         if domain_id not in self.domain_mask_nodes:
             return
 
-        nodes_to_remove = self.domain_mask_nodes[domain_id]
-        
-        # Get the parent molecule's node group
-        parent_modifier = self.molecule.object.modifiers.get("MolecularNodes")
-        if not parent_modifier or not parent_modifier.node_group:
+        parent_node_group = self._get_parent_node_group()
+        if parent_node_group is None:
             return
+
+        self._remove_mask_nodes(parent_node_group, self.domain_mask_nodes[domain_id])
             
-        parent_node_group = parent_modifier.node_group
+        # Remove from tracking dictionary
+        del self.domain_mask_nodes[domain_id]
         
-        # Remove only the links connected to these specific nodes
-        for link in list(parent_node_group.links):
-            for node in nodes_to_remove:
-                try:
-                    if node and (link.from_node == node or link.to_node == node):
-                        parent_node_group.links.remove(link)
-                        break
-                except ReferenceError:
-                    continue
+        # Note: We're no longer removing the domain infrastructure nodes (join node and NOT node)
+        # when all domains are deleted. They will persist for future domain creations.
 
-        # Remove the nodes safely
+    @staticmethod
+    def _remove_mask_nodes(parent_node_group, nodes_to_remove):
+        """Remove mask nodes from the parent node group.
+
+        Removing a node also removes its links, which frees its slot on the
+        join node, so the links of the whole tree are never scanned.
+        """
+        tree_nodes = parent_node_group.nodes
         for node in nodes_to_remove:
             try:
                 if node:
                     # membership check on name avoids TypeError when node is invalid
-                    if node.name in parent_node_group.nodes:
-                        parent_node_group.nodes.remove(parent_node_group.nodes[node.name])
+                    existing = tree_nodes.get(node.name)
+                    if existing is not None:
+                        tree_nodes.remove(existing)
             except ReferenceError:
                 # Node might already be freed; ignore
                 pass
-            
-        # Remove from tracking dictionary
-        del self.domain_mask_nodes[domain_id]
-        
-        # Note: We're no longer removing the domain infrastructure nodes (join node and NOT node)
-        # when all domains are deleted. They will persist for future domain creations.
 
     def delete_domain(self, domain_id: str, is_cleanup_call: bool = False) -> Optional[str]:
         """Delete a domain and its object.
@@ -1761,231 +2197,191 @@ class MoleculeWrapper:
         
         return None
 
+    def _domain_chain_index(self, chain_id) -> Optional[int]:
+        """Value of the chain_id attribute of a chain, as set on the Chain input"""
+        index = self.get_int_chain_index(self.get_blender_chain_id(str(chain_id)))
+        if index is None and str(chain_id).isdigit():
+            index = int(chain_id)
+        return index
+
     def _setup_domain_network(self, domain: DomainDefinition, chain_id: str, start: int, end: int):
-        """Set up the domain's node network using the same structure as the preview domain"""
+        """Set up the domain's node network and write its modifier inputs.
+
+        Domains of this molecule with the same style share one network,
+        which reads the chain, residue range, color and material from the
+        domain modifier. It is built from the parent network the first time
+        a style is used. Domains from older files that still have a tree of
+        their own are moved to the shared one, unless keyframes live on it.
+        """
         if not domain.object or not domain.node_group:
             return False
             
         try:
-            # Get references to key nodes
-            input_node = nodes.get_input(domain.node_group)
-            output_node = nodes.get_output(domain.node_group)
-            
-            if not (input_node and output_node):
-                return False
-                
-            # Find or create nodes - reuse existing when possible
-            # First check existing nodes before creating new ones
-            
-            # Look for chain selection node
-            chain_select = None
-            for node in domain.node_group.nodes:
-                if (node.bl_idname == 'GeometryNodeGroup' and 
-                    node.node_tree and 
-                    node.node_tree.name == "Select Chain"):
-                    chain_select = node
-                    break
-                    
-            if not chain_select:
-                # Create chain selection node if not found - but don't use nodes.add_selection
-                # as it automatically connects to the style node
-                
-                # Use the label_asym_id values which are the source of truth for node socket names
-                available_chains = list(self.idx_to_label_asym_id_map.values()) or [str(chain_id)]
-                
-                chain_select_group = nodes.custom_iswitch(
-                    name=f"selection_{self.identifier}", 
-                    iter_list=available_chains, 
-                    field="chain_id", 
-                    dtype="BOOLEAN"
-                )
-                
-                chain_select = nodes.add_custom(
-                    domain.node_group,
-                    chain_select_group.name
-                )
-                chain_select.name = "Select Chain"
-                chain_select.location = (input_node.location.x + 200, input_node.location.y + 100)
-            
-            # Set the selected chain using the robust resolver
-            blender_chain_id = self.get_blender_chain_id(chain_id)
-            for input_socket in chain_select.inputs:
-                if input_socket.type == 'BOOLEAN':
-                    input_socket.default_value = (input_socket.name == blender_chain_id)
-            
-            # Look for residue range selection node
-            select_res_id_range = None
-            for node in domain.node_group.nodes:
-                if (node.bl_idname == 'GeometryNodeGroup' and 
-                    node.node_tree and 
-                    node.node_tree.name == "Select Res ID Range"):
-                    select_res_id_range = node
-                    break
-                    
-            if not select_res_id_range:
-                # Create residue range selection node if not found
-                select_res_id_range = nodes.add_custom(domain.node_group, "Select Res ID Range")
-                select_res_id_range.location = (chain_select.location.x + 200, chain_select.location.y)
-            
-            # Update the residue range
-            select_res_id_range.inputs["Min"].default_value = start
-            select_res_id_range.inputs["Max"].default_value = end
-            
-            # Look for color nodes
-            color_emit = None
-            set_color = None
-            
-            for node in domain.node_group.nodes:
-                if (node.bl_idname == 'GeometryNodeGroup' and 
-                    node.node_tree and 
-                    node.node_tree.name == "Color Common"):
-                    color_emit = node
-                elif (node.bl_idname == 'GeometryNodeGroup' and 
-                      node.node_tree and 
-                      node.node_tree.name == "Set Color"):
-                    set_color = node
-            
-            # Create color nodes if not found
-            if not color_emit:
-                # Generate a unique color based on the domain index
-                # This helps visually distinguish domains from each other
-                
-                # Get domain index based on current number of domains
-                domain_index = len(self.domains)
-                
-                # Generate a color using HSV for better distribution
-                # Start with golden ratio for good distribution
-                golden_ratio = 0.618033988749895
-                hue = (domain_index * golden_ratio) % 1.0
-                saturation = 0.8
-                value = 0.9
-                
-                # Convert to RGB and add alpha
-                rgb = colorsys.hsv_to_rgb(hue, saturation, value)
-                domain_color = (rgb[0], rgb[1], rgb[2], 1.0)
-                
-                # Store the generated color in the domain object for UI synchronization
-                domain.color = domain_color
-                
-                # Also set the domain_color property on the Blender object for UI
-                if domain.object:
-                    domain.object.domain_color = domain_color
-                
-                color_emit = nodes.add_custom(domain.node_group, "Color Common")
-                color_emit.location = (select_res_id_range.location.x - 400, select_res_id_range.location.y)
-                
-                # Create a unique node tree for this domain to ensure independent color control
-                original_node_tree = color_emit.node_tree
-                new_node_tree_name = f"Color Common_{domain.domain_id}"
-
-                # Create a copy of the node tree with a unique name
-                new_node_tree = original_node_tree.copy()
-                new_node_tree.name = new_node_tree_name
-                color_emit.node_tree = new_node_tree
-                
-                # Set the domain color using our generated color
-                if "Carbon" in color_emit.inputs:
-                    color_emit.inputs["Carbon"].default_value = domain_color
-                elif len(color_emit.inputs) > 0 and hasattr(color_emit.inputs[0], "default_value"):
-                    color_emit.inputs[0].default_value = domain_color
-            else:
-                # Found existing Color Common node - need to make it unique for this domain
-                # Check if this node's tree is already unique to this domain
-                if color_emit.node_tree and not color_emit.node_tree.name.endswith(f"_{domain.domain_id}"):
-                    # This node tree is shared - create a unique copy
-                    original_node_tree = color_emit.node_tree
-                    new_node_tree_name = f"Color Common_{domain.domain_id}"
-
-                    # Create a copy of the node tree with a unique name
-                    new_node_tree = original_node_tree.copy()
-                    new_node_tree.name = new_node_tree_name
-                    color_emit.node_tree = new_node_tree
-                    print(f"Created unique Color Common node tree for domain {domain.domain_id}")
-
-                # Now update the color on our unique node tree
-                try:
-                    if "Carbon" in color_emit.inputs:
-                        color_emit.inputs["Carbon"].default_value = domain.color
-                    elif len(color_emit.inputs) > 0 and hasattr(color_emit.inputs[0], "default_value"):
-                        color_emit.inputs[0].default_value = domain.color
-                except Exception as e:
-                    print(f"Warning: failed to override Color Common for domain {domain.domain_id}: {e}")
-            
-            if not set_color:
-                set_color = nodes.add_custom(domain.node_group, "Set Color")
-                set_color.location = (color_emit.location.x + 200, color_emit.location.y)
-            
-            # Find or create style node
-            style_node = None
-            for node in domain.node_group.nodes:
-                if (node.bl_idname == 'GeometryNodeGroup' and 
-                    node.node_tree and 
-                    "Style" in node.node_tree.name):
-                    style_node = node
-                    break
-                    
-            if not style_node:
-                # Create style node if not found, using the domain's style property
-                style_node_name = "Style Ribbon"  # Default fallback
-                
-                # Get the style node name from the domain's style property
-                from ..utils.molecularnodes.blender.nodes import styles_mapping
-                if domain.style in styles_mapping:
-                    style_node_name = styles_mapping[domain.style]
-                
-                # Create the style node
-                style_node = nodes.add_custom(domain.node_group, style_node_name)
-                style_node.location = (select_res_id_range.location.x + 200, select_res_id_range.location.y)
-            
-            # Find or create join geometry node
-            join_node = None
-            for node in domain.node_group.nodes:
-                if node.bl_idname == "GeometryNodeJoinGeometry":
-                    join_node = node
-                    break
-                    
-            if not join_node:
-                join_node = domain.node_group.nodes.new("GeometryNodeJoinGeometry")
-                join_node.location = (style_node.location.x + 200, style_node.location.y)
-            
-            # Clear existing links and create new ones
-            domain.node_group.links.clear()
-            
-            # Connect nodes
-            domain.node_group.links.new(input_node.outputs["Atoms"], set_color.inputs["Atoms"])
-            domain.node_group.links.new(color_emit.outputs["Color"], set_color.inputs["Color"])
-            domain.node_group.links.new(set_color.outputs["Atoms"], style_node.inputs["Atoms"])
-            domain.node_group.links.new(chain_select.outputs["Selection"], select_res_id_range.inputs["And"])
-            
-            # Connect the residue selection to the style node's Selection input
-            domain.node_group.links.new(select_res_id_range.outputs["Selection"], style_node.inputs["Selection"])
-            
-            domain.node_group.links.new(style_node.outputs[0], join_node.inputs[0])
-            domain.node_group.links.new(join_node.outputs[0], output_node.inputs["Geometry"])
-            
-            # Remove any orphaned or duplicate nodes
-            self._clean_unused_nodes(domain.node_group)
+            material = get_style_material(domain.object, domain.node_group)
+            if not is_domain_tree(domain.node_group):
+                style_node = find_style_node(domain.node_group)
+                style_name = (style_node.node_tree.name if style_node
+                              else nodes.styles_mapping.get(domain.style, "Style Ribbon"))
+                shared_name = domain_tree_name(self.identifier, style_name)
+                shared = bpy.data.node_groups.get(shared_name)
+                animation = domain.node_group.animation_data
+                keyed = bool(animation and animation.action)
+
+                if is_domain_tree(shared) and not keyed:
+                    use_domain_tree(domain.object, shared)
+                elif not self._build_domain_tree(domain):
+                    return False
+                elif shared is None and not keyed:
+                    domain.node_group.name = shared_name
+                domain.sync_node_group()
+
+            values = {RESIDUE_MIN_INPUT: start, RESIDUE_MAX_INPUT: end}
+            chain_index = self._domain_chain_index(chain_id)
+            if chain_index is not None:
+                values[CHAIN_INPUT] = chain_index
+            if material is not None:
+                values[MATERIAL_INPUT] = material
+            set_modifier_inputs(domain.object, values)
+            set_domain_color(domain.object, domain.color)
             
             # Check for and remove any unwanted connections in the parent molecule's node group
-            # Get the parent molecule's node group
-            parent_modifier = self.molecule.object.modifiers.get("MolecularNodes")
-            if parent_modifier and parent_modifier.node_group:
-                parent_node_group = parent_modifier.node_group
-                main_style_node = self.get_main_style_node()
-                
-                if main_style_node:
-                    # Remove any direct connections between domain's chain selection and parent's style node
-                    for link in list(parent_node_group.links):
-                        if (link.from_node.name == chain_select.name and 
-                            link.to_node == main_style_node and 
-                            link.to_socket.name == "Selection"):
-                            parent_node_group.links.remove(link)
+            parent_node_group = self._get_parent_node_group()
+            main_style_node = self.get_main_style_node() if parent_node_group else None
+            if main_style_node:
+                # Remove any direct connections between a chain selection and parent's style node
+                for link in list(parent_node_group.links):
+                    if (link.from_node.name == "Select Chain" and 
+                        link.to_node == main_style_node and 
+                        link.to_socket.name == "Selection"):
+                        parent_node_group.links.remove(link)
             
             return True
             
         except Exception:
             return False
 
+    def _build_domain_tree(self, domain: DomainDefinition) -> bool:
+        """Build the shared domain network in domain.node_group.
+
+        Nothing in the network is specific to one domain: the chain, range,
+        color and style material sockets are linked to tree inputs.
+        """
+        tree = domain.node_group
+        input_node = nodes.get_input(tree)
+        output_node = nodes.get_output(tree)
+        
+        if not (input_node and output_node):
+            return False
+
+        # The chain is selected by comparing the chain_id attribute with the
+        # Chain input; copies of older trees hold a boolean switch instead
+        old_chain_select = tree.nodes.get("Select Chain")
+        if old_chain_select is not None:
+            tree.nodes.remove(old_chain_select)
+
+        chain_attribute = tree.nodes.new("GeometryNodeInputNamedAttribute")
+        chain_attribute.data_type = 'INT'
+        chain_attribute.inputs["Name"].default_value = "chain_id"
+        chain_attribute.location = (input_node.location.x + 200, input_node.location.y + 250)
+
+        chain_select = tree.nodes.new("FunctionNodeCompare")
+        chain_select.name = "Select Chain"
+        chain_select.data_type = 'INT'
+        chain_select.operation = 'EQUAL'
+        chain_select.location = (input_node.location.x + 400, input_node.location.y + 100)
+        # Inputs 2 and 3 are A and B of the integer comparison
+        chain_a, chain_b = chain_select.inputs[2], chain_select.inputs[3]
+        
+        # Look for residue range selection node
+        select_res_id_range = None
+        for node in tree.nodes:
+            if (node.bl_idname == 'GeometryNodeGroup' and 
+                node.node_tree and 
+                node.node_tree.name == "Select Res ID Range"):
+                select_res_id_range = node
+                break
+                
+        if not select_res_id_range:
+            select_res_id_range = nodes.add_custom(tree, "Select Res ID Range")
+            select_res_id_range.location = (chain_select.location.x + 200, chain_select.location.y)
+        
+        # Look for color nodes
+        color_emit = None
+        set_color = None
+        
+        for node in tree.nodes:
+            if (node.bl_idname == 'GeometryNodeGroup' and 
+                node.node_tree and 
+                node.node_tree.name == "Color Common"):
+                color_emit = node
+            elif (node.bl_idname == 'GeometryNodeGroup' and 
+                  node.node_tree and 
+                  node.node_tree.name == "Set Color"):
+                set_color = node
+        
+        # All domains share the Color Common tree, the color is a modifier input
+        if not color_emit:
+            color_emit = nodes.add_custom(tree, "Color Common")
+            color_emit.location = (select_res_id_range.location.x - 400, select_res_id_range.location.y)
+        
+        if not set_color:
+            set_color = nodes.add_custom(tree, "Set Color")
+            set_color.location = (color_emit.location.x + 200, color_emit.location.y)
+        
+        # Find or create style node
+        style_node = find_style_node(tree)
+        if not style_node:
+            # Create style node if not found, using the domain's style property
+            style_node = nodes.add_custom(tree, nodes.styles_mapping.get(domain.style, "Style Ribbon"))
+            style_node.location = (select_res_id_range.location.x + 200, select_res_id_range.location.y)
+        
+        # Find or create join geometry node
+        join_node = None
+        for node in tree.nodes:
+            if node.bl_idname == "GeometryNodeJoinGeometry":
+                join_node = node
+                break
+                
+        if not join_node:
+            join_node = tree.nodes.new("GeometryNodeJoinGeometry")
+            join_node.location = (style_node.location.x + 200, style_node.location.y)
+        
+        # Clear existing links and create new ones
+        tree.links.clear()
+        
+        # Connect nodes
+        tree.links.new(input_node.outputs["Atoms"], set_color.inputs["Atoms"])
+        tree.links.new(color_emit.outputs["Color"], set_color.inputs["Color"])
+        tree.links.new(set_color.outputs["Atoms"], style_node.inputs["Atoms"])
+        tree.links.new(chain_attribute.outputs["Attribute"], chain_a)
+        tree.links.new(chain_select.outputs["Result"], select_res_id_range.inputs["And"])
+        
+        # Connect the residue selection to the style node's Selection input
+        tree.links.new(select_res_id_range.outputs["Selection"], style_node.inputs["Selection"])
+        
+        tree.links.new(style_node.outputs[0], join_node.inputs[0])
+        tree.links.new(join_node.outputs[0], output_node.inputs["Geometry"])
+        if self.assembly_instancing:
+            self._insert_assembly_node(tree)
+        
+        # Everything that differs between domains is a modifier input, so
+        # later changes are property writes on the object instead of node
+        # tree edits, and the tree can be shared
+        targets = {
+            CHAIN_INPUT: chain_b,
+            RESIDUE_MIN_INPUT: select_res_id_range.inputs["Min"],
+            RESIDUE_MAX_INPUT: select_res_id_range.inputs["Max"],
+        }
+        if "Carbon" in color_emit.inputs:
+            targets[COLOR_INPUT] = color_emit.inputs["Carbon"]
+        if "Material" in style_node.inputs:
+            targets[MATERIAL_INPUT] = style_node.inputs["Material"]
+        expose_domain_inputs(tree, targets)
+        
+        # Remove any orphaned or duplicate nodes
+        self._clean_unused_nodes(tree)
+        return True
+
     def _clean_unused_nodes(self, node_group):
         """Remove any unused or orphaned nodes from the node group"""
         # Get all linked nodes starting from the output
@@ -2017,15 +2413,14 @@ class MoleculeWrapper:
     def _create_domain_mask_nodes(self, domain_id: str, chain_id: str, start: int, end: int):
         """Create nodes in the parent molecule to mask out the domain region"""
 
-        if not self.molecule.object:
+        if self.in_batch:
+            # Built together with the other masks when the batch commits
+            self._pending_masks[domain_id] = (chain_id, start, end)
             return
-        
-        # Get the parent molecule's node group
-        parent_modifier = self.molecule.object.modifiers.get("MolecularNodes")
-        if not parent_modifier or not parent_modifier.node_group:
+
+        parent_node_group = self._get_parent_node_group()
+        if parent_node_group is None:
             return
-            
-        parent_node_group = parent_modifier.node_group
         
         try:
             # Find main style node
@@ -2039,11 +2434,7 @@ class MoleculeWrapper:
                 
             # Step 1: Create and configure chain selection node
             chain_select_name = f"Domain_Chain_Select_{domain_id}"
-            chain_select = None
-            for node in parent_node_group.nodes:
-                if node.name == chain_select_name:
-                    chain_select = node
-                    break
+            chain_select = parent_node_group.nodes.get(chain_select_name)
                     
             if not chain_select:
                 # Create chain selection node - but don't use nodes.add_selection directly
@@ -2051,12 +2442,7 @@ class MoleculeWrapper:
                 # Use the label_asym_id values for the geometry node chain selection
                 available_chains = list(self.idx_to_label_asym_id_map.values()) or [str(chain_id)]
                 
-                chain_select_group = nodes.custom_iswitch(
-                    name=f"selection_{self.identifier}", 
-                    iter_list=available_chains, 
-                    field="chain_id", 
-                    dtype="BOOLEAN"
-                )
+                chain_select_group = chain_selection_group(available_chains)
                 
                 chain_select = nodes.add_custom(
                     parent_node_group,
@@ -2082,11 +2468,7 @@ class MoleculeWrapper:
             
             # Step 3: Create residue range selection node
             res_select_name = f"Domain_Res_Select_{domain_id}"
-            res_select = None
-            for node in parent_node_group.nodes:
-                if node.name == res_select_name:
-                    res_select = node
-                    break
+            res_select = parent_node_group.nodes.get(res_select_name)
                     
             if not res_select:
                 # Create residue range selection node
@@ -2152,10 +2534,8 @@ class MoleculeWrapper:
             self.domain_mask_nodes[domain_id] = (chain_select, res_select)
             
             # Remove any direct connections between chain selection and style node
-            for link in list(parent_node_group.links):
-                if (link.from_node == chain_select and 
-                    link.to_node == main_style_node and 
-                    link.to_socket.name == "Selection"):
+            for link in list(chain_select.outputs["Selection"].links):
+                if link.to_node == main_style_node and link.to_socket.name == "Selection":
                     parent_node_group.links.remove(link)
             
         except Exception:
@@ -2198,22 +2578,14 @@ class MoleculeWrapper:
             # Update the stored color in the domain object for consistency
             domain.color = color
 
+            if set_domain_color(domain.object, color):
+                return True
+
+            # Domains from older files keep their color on the Color Common node
             for node in domain.node_group.nodes:
                 if node.name == "Color Common":
-                    # Check if this Color Common node has a unique node tree for this domain
-                    if (node.bl_idname == 'GeometryNodeGroup' and node.node_tree and
-                        not node.node_tree.name.endswith(f"_{domain_id}")):
-                        # The node tree is shared - create a unique copy
-                        original_node_tree = node.node_tree
-                        new_node_tree_name = f"Color Common_{domain_id}"
-
-                        # Create a copy of the node tree with a unique name
-                        new_node_tree = original_node_tree.copy()
-                        new_node_tree.name = new_node_tree_name
-                        node.node_tree = new_node_tree
-                        print(f"Created unique Color Common node tree for domain {domain_id} during color update")
-
-                    # Set the default_value directly with the color tuple
+                    # Group node inputs belong to this node, so the shared
+                    # Color Common tree does not need a per-domain copy
                     node.inputs["Carbon"].default_value = color
                     return True
         except Exception as e:
@@ -0,0 +1,193 @@
+"""Puppet membership index for ProteinBlender.
+
+Puppet memberships are stored on the outliner items as comma-separated
+member IDs. Resolving them used to mean splitting the string, guessing the
+molecule and domain from the member ID and scanning the whole outliner for
+every member, in every operator and panel that needed puppet objects.
+
+``PuppetRegistry`` resolves all puppets in one pass over the outliner and
+keeps a puppet -> (molecule, domain, object) index until the memberships
+change, an undo/redo runs or a file is loaded.
+"""
+
+import bpy
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Outliner item used as a visual separator above the puppets
+PUPPET_SEPARATOR_ID = "puppets_separator"
+
+
+class PuppetMember(NamedTuple):
+    """A resolved puppet member"""
+    member_id: str
+    molecule_id: Optional[str]
+    domain_id: Optional[str]
+    object_names: Tuple[str, ...]
+
+
+class PuppetEntry(NamedTuple):
+    """A puppet with its controller and resolved members"""
+    puppet_id: str
+    name: str
+    controller_object_name: str
+    members: Tuple[PuppetMember, ...]
+
+
+class PuppetRegistry:
+    """Maintains the puppet -> member index for the active scene"""
+
+    _index: Optional[Dict[str, PuppetEntry]] = None
+    _scene_key: Optional[Tuple[int, int]] = None
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop the index so it is rebuilt on next access."""
+        cls._index = None
+        cls._scene_key = None
+
+    @classmethod
+    def _get_index(cls, scene) -> Dict[str, PuppetEntry]:
+        """Return the index for scene, rebuilding it when stale."""
+        if not hasattr(scene, 'outliner_items'):
+            return {}
+
+        # The outliner is rebuilt wholesale on most edits, so a size change
+        # catches edits that bypassed the explicit invalidation.
+        scene_key = (scene.as_pointer(), len(scene.outliner_items))
+        if cls._index is None or cls._scene_key != scene_key:
+            cls._index = cls._build_index(scene)
+            cls._scene_key = scene_key
+        return cls._index
+
+    @staticmethod
+    def _build_index(scene) -> Dict[str, PuppetEntry]:
+        """Resolve every puppet in a single pass over the outliner."""
+        from ..utils.scene_manager import ProteinBlenderScene
+
+        scene_manager = ProteinBlenderScene.get_instance()
+        molecules = scene_manager.molecules
+        # Longest IDs first so '3b75_001' is preferred over a '3b75' prefix
+        molecule_ids = sorted(molecules.keys(), key=len, reverse=True)
+        chain_domains: Dict[str, Dict[str, str]] = {}
+
+        item_objects: Dict[str, str] = {}
+        puppet_items = []
+        for item in scene.outliner_items:
+            if item.item_type == 'PUPPET':
+                if item.item_id != PUPPET_SEPARATOR_ID:
+                    puppet_items.append(item)
+            elif item.item_id not in item_objects:
+                item_objects[item.item_id] = item.object_name
+
+        def first_domain_per_chain(molecule_id):
+            """Map chain index -> first domain ID of that chain."""
+            if molecule_id not in chain_domains:
+                mapping = {}
+                prefix = f"{molecule_id}_"
+                for domain_id in molecules[molecule_id].domains.keys():
+                    if domain_id.startswith(prefix):
+                        chain = domain_id[len(prefix):].split('_', 1)[0]
+                        mapping.setdefault(chain, domain_id)
+                chain_domains[molecule_id] = mapping
+            return chain_domains[molecule_id]
+
+        resolved: Dict[str, PuppetMember] = {}
+
+        def resolve(member_id):
+            if member_id in resolved:
+                return resolved[member_id]
+
+            object_names = []
+            molecule_id = next(
+                (mol_id for mol_id in molecule_ids if member_id.startswith(f"{mol_id}_")), None
+            )
+            domain_id = None
+            if molecule_id is not None:
+                molecule = molecules[molecule_id]
+                remainder = member_id[len(molecule_id) + 1:]
+                if member_id in molecule.domains:
+                    domain_id = member_id
+                elif remainder in molecule.domains:
+                    domain_id = remainder
+                elif remainder.startswith('chain_'):
+                    # Chains are represented by their first domain
+                    domain_id = first_domain_per_chain(molecule_id).get(remainder[len('chain_'):])
+
+                if domain_id is not None:
+                    try:
+                        domain_object = molecule.domains[domain_id].object
+                        if domain_object:
+                            object_names.append(domain_object.name)
+                    except ReferenceError:
+                        pass
+
+            # Outliner items may reference objects directly
+            outliner_object = item_objects.get(member_id)
+            if outliner_object and outliner_object not in object_names:
+                object_names.append(outliner_object)
+
+            member = PuppetMember(member_id, molecule_id, domain_id, tuple(object_names))
+            resolved[member_id] = member
+            return member
+
+        index = {}
+        for item in puppet_items:
+            member_ids = [m for m in item.puppet_memberships.split(',') if m] if item.puppet_memberships else []
+            index[item.item_id] = PuppetEntry(
+                puppet_id=item.item_id,
+                name=item.name,
+                controller_object_name=item.controller_object_name,
+                members=tuple(resolve(member_id) for member_id in member_ids),
+            )
+        return index
+
+    @classmethod
+    def get_puppets(cls, scene) -> List[PuppetEntry]:
+        """Return all puppets in outliner order."""
+        return list(cls._get_index(scene).values())
+
+    @classmethod
+    def get_puppet(cls, scene, puppet_id: str) -> Optional[PuppetEntry]:
+        """Return the puppet with the given ID, or None."""
+        return cls._get_index(scene).get(puppet_id)
+
+    @classmethod
+    def get_member_ids(cls, scene, puppet_id: str) -> List[str]:
+        """Return the member IDs of a puppet."""
+        puppet = cls.get_puppet(scene, puppet_id)
+        return [member.member_id for member in puppet.members] if puppet else []
+
+    @classmethod
+    def get_controller(cls, scene, puppet_id: str) -> Optional[bpy.types.Object]:
+        """Return the controller Empty of a puppet, or None."""
+        puppet = cls.get_puppet(scene, puppet_id)
+        if not puppet or not puppet.controller_object_name:
+            return None
+        return bpy.data.objects.get(puppet.controller_object_name)
+
+    @classmethod
+    def get_objects(cls, scene, puppet_id: str) -> List[bpy.types.Object]:
+        """Return the Blender objects of a puppet's members, without duplicates.
+
+        Args:
+            scene: Blender scene holding the outliner items
+            puppet_id: ID of the puppet
+
+        Returns:
+            List of member objects in membership order
+        """
+        puppet = cls.get_puppet(scene, puppet_id)
+        if not puppet:
+            return []
+
+        objects = []
+        seen = set()
+        for member in puppet.members:
+            for object_name in member.object_names:
+                if object_name in seen:
+                    continue
+                obj = bpy.data.objects.get(object_name)
+                if obj:
+                    objects.append(obj)
+                    seen.add(object_name)
+        return objects
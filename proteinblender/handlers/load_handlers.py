@@ -37,6 +37,31 @@ def create_workspace_on_load(dummy):
             import traceback
             traceback.print_exc()
 
+@persistent
+def reset_puppet_registry(*args):
+    """Invalidate the puppet membership index after load, undo and redo.
+
+    Undo and file loads replace the outliner items and objects wholesale, so
+    any cached puppet -> object resolution is stale. Cached alpha carbon
+    centroids are keyed by mesh pointer and are dropped for the same reason.
+    """
+    from ..core.puppet_registry import PuppetRegistry
+    from ..utils.pose_manager import PoseManager
+    PuppetRegistry.invalidate()
+    PoseManager.clear_alpha_carbon_cache()
+
+@persistent
+def refresh_pose_thumbnails(*args):
+    """Drop queued thumbnails of the previous file and relink cached ones.
+
+    Thumbnails are cached by pose hash, so a reloaded pose library finds its
+    images without rendering anything.
+    """
+    from ..utils.pose_thumbnails import PoseThumbnails
+    PoseThumbnails.shutdown()
+    for scene in bpy.data.scenes:
+        PoseThumbnails.refresh_library(scene)
+
 @persistent
 def sync_outliner_visibility(scene, depsgraph):
     """
@@ -115,6 +140,14 @@ def register_load_handlers():
     if create_workspace_on_load not in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.append(create_workspace_on_load)
 
+    # Register puppet index invalidation (survives across new sessions)
+    for handler_list in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if reset_puppet_registry not in handler_list:
+            handler_list.append(reset_puppet_registry)
+
+    if refresh_pose_thumbnails not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(refresh_pose_thumbnails)
+
     # Register visibility sync handler for 2-way binding
     register_visibility_sync_handler()
 
@@ -133,6 +166,17 @@ def unregister_load_handlers():
     if create_workspace_on_load in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(create_workspace_on_load)
 
+    for handler_list in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if reset_puppet_registry in handler_list:
+            handler_list.remove(reset_puppet_registry)
+
+    if refresh_pose_thumbnails in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(refresh_pose_thumbnails)
+
+    # Stop the thumbnail queue timer and worker thread
+    from ..utils.pose_thumbnails import PoseThumbnails
+    PoseThumbnails.shutdown()
+
     # Unregister visibility sync handler
     unregister_visibility_sync_handler()
 
@@ -55,7 +55,9 @@ from .domain_ops import (
     PROTEINBLENDER_OT_split_domain_popup,
     PROTEINBLENDER_OT_split_domain,
     PROTEINBLENDER_OT_merge_domains,
+    PROTEINBLENDER_OT_auto_segment_chain,
     PROTEINBLENDER_OT_rename_domain,
+    PROTEINBLENDER_OT_deduplicate_node_groups,
 )
 from .keyframe_operators import (
     PuppetKeyframeSettings,  # Must be imported and registered before operators that use it
@@ -124,7 +126,9 @@ CLASSES = (
     PROTEINBLENDER_OT_split_domain_popup,
     PROTEINBLENDER_OT_split_domain,
     PROTEINBLENDER_OT_merge_domains,
+    PROTEINBLENDER_OT_auto_segment_chain,
     PROTEINBLENDER_OT_rename_domain,
+    PROTEINBLENDER_OT_deduplicate_node_groups,
     PROTEINBLENDER_OT_create_keyframe,
     PROTEINBLENDER_OT_keyframe_select_all_puppets,
     PROTEINBLENDER_OT_keyframe_select_none_puppets,
@@ -4,6 +4,7 @@ from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty, F
 from ..utils.scene_manager import ProteinBlenderScene
 from mathutils import Vector
 import random
+from ..utils.node_templates import switch_domain_style
 
 # Ensure domain properties are registered
 from ..core.domain import ensure_domain_properties_registered
@@ -284,7 +285,7 @@ class MOLECULE_PB_OT_copy_domain(Operator):
             self.report({'INFO'}, f"Domain copied successfully")
             # Rebuild outliner to show the new copy
             from ..utils.scene_manager import build_outliner_hierarchy
-            build_outliner_hierarchy(context)
+            molecule.defer("outliner", lambda: build_outliner_hierarchy(bpy.context))
             return {'FINISHED'}
         else:
             self.report({'ERROR'}, "Failed to copy domain")
@@ -350,7 +351,7 @@ class MOLECULE_PB_OT_delete_domain(Operator):
 
         # Rebuild outliner to reflect the deletion
         from ..utils.scene_manager import build_outliner_hierarchy
-        build_outliner_hierarchy(context)
+        molecule.defer("outliner", lambda: build_outliner_hierarchy(bpy.context))
 
         return {'FINISHED'}
 
@@ -1108,6 +1109,17 @@ class MOLECULE_PB_OT_update_domain_style(Operator):
         try:
             print(f"Operator: Changing domain style for {self.domain_id} to {self.style}")
             
+            from ..utils.molecularnodes.blender.nodes import styles_mapping
+            # Domains sharing a tree per style move to the tree of the new style
+            if self.style in styles_mapping and switch_domain_style(domain.object, styles_mapping[self.style]):
+                domain.sync_node_group()
+                domain.style = self.style
+                try:
+                    domain.object.domain_style = self.style
+                except (AttributeError, TypeError):
+                    domain.object["domain_style"] = self.style
+                return {'FINISHED'}
+
             # Update the style in the node network
             if domain.node_group:
                 # Find style node
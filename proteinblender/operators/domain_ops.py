@@ -2,8 +2,122 @@
 
 import bpy
 from bpy.types import Operator
-from bpy.props import StringProperty, IntProperty, EnumProperty
+from bpy.props import StringProperty, IntProperty, EnumProperty, FloatProperty
 from ..utils.scene_manager import ProteinBlenderScene, build_outliner_hierarchy
+from ..utils.node_templates import (
+    RESIDUE_MAX_INPUT,
+    RESIDUE_MIN_INPUT,
+    get_modifier_input,
+    modifier_input_path,
+    set_modifier_inputs,
+)
+
+# Seconds to wait before writing a range change, so a slider drag results in
+# at most one node update per redraw
+PREVIEW_INTERVAL = 1.0 / 60.0
+
+
+def _flush_split_preview():
+    # Timers are identified by the function object, a new bound method is
+    # created on every access to SplitRangePreview._flush
+    return SplitRangePreview._flush()
+
+
+class SplitRangePreview:
+    """Live preview of the range chosen in the split popup.
+
+    The Min/Max sockets of the Select Res ID Range node are looked up once
+    when the popup opens. Slider changes only record the requested range;
+    a timer writes the latest one to the sockets and tags the previewed
+    object, instead of evaluating the whole view layer on every tick.
+    Domains that take their range from modifier inputs get those written
+    instead, which leaves the node tree untouched.
+    """
+
+    _object_name = None
+    _min_socket = None
+    _max_socket = None
+    _use_inputs = False
+    _pending = None
+
+    @classmethod
+    def start(cls, obj, node, start, end):
+        """Cache the sockets of node on obj and show the initial range."""
+        cls.stop()
+        cls._object_name = obj.name
+        cls._min_socket = node.inputs.get("Min")
+        cls._max_socket = node.inputs.get("Max")
+        cls._use_inputs = modifier_input_path(obj, RESIDUE_MIN_INPUT) is not None
+        cls._write(start, end)
+
+    @classmethod
+    def is_active(cls):
+        return cls._object_name is not None
+
+    @classmethod
+    def request(cls, start, end):
+        """Queue a range change; only the latest one per interval is written."""
+        if not cls.is_active():
+            return
+        cls._pending = (start, end)
+        if not bpy.app.timers.is_registered(_flush_split_preview):
+            bpy.app.timers.register(_flush_split_preview, first_interval=PREVIEW_INTERVAL)
+
+    @classmethod
+    def stop(cls, reset_range=None):
+        """Stop previewing, optionally writing reset_range (start, end) back first."""
+        if bpy.app.timers.is_registered(_flush_split_preview):
+            bpy.app.timers.unregister(_flush_split_preview)
+        if cls.is_active() and reset_range is not None:
+            cls._write(*reset_range)
+        cls._object_name = None
+        cls._min_socket = None
+        cls._max_socket = None
+        cls._use_inputs = False
+        cls._pending = None
+
+    @classmethod
+    def _flush(cls):
+        """Timer callback writing the latest requested range."""
+        if cls._pending is not None and cls.is_active():
+            start, end = cls._pending
+            cls._pending = None
+            cls._write(start, end)
+        return None
+
+    @classmethod
+    def _write(cls, start, end):
+        obj = bpy.data.objects.get(cls._object_name)
+        if obj is None:
+            cls.stop()
+            return
+
+        if cls._use_inputs:
+            current = (get_modifier_input(obj, RESIDUE_MIN_INPUT), get_modifier_input(obj, RESIDUE_MAX_INPUT))
+            changed = current != (start, end)
+            set_modifier_inputs(obj, {RESIDUE_MIN_INPUT: start, RESIDUE_MAX_INPUT: end})
+            sockets = ()
+        else:
+            changed = False
+            sockets = ((cls._min_socket, start), (cls._max_socket, end))
+
+        try:
+            for socket, value in sockets:
+                if socket is not None and socket.default_value != value:
+                    socket.default_value = value
+                    changed = True
+        except ReferenceError:
+            # The node tree was rebuilt while the popup was open
+            cls.stop()
+            return
+
+        if changed:
+            # Re-evaluate just the previewed object
+            obj.update_tag(refresh={'DATA'})
+            for window in bpy.context.window_manager.windows:
+                for area in window.screen.areas:
+                    if area.type in {'VIEW_3D', 'NODE_EDITOR'}:
+                        area.tag_redraw()
 
 
 class PROTEINBLENDER_OT_split_domain_popup(Operator):
@@ -26,70 +140,8 @@ class PROTEINBLENDER_OT_split_domain_popup(Operator):
     )
     
     def update_preview_range(self, context):
-        """Update the geometry node range in real-time"""
-        # Try to get the node from scene properties (persistent across operator instances)
-        if "pb_preview_object" not in context.scene:
-            print("No preview object stored in scene")
-            return
-            
-        # Retrieve the stored references
-        obj_name = context.scene.get("pb_preview_object")
-        mod_name = context.scene.get("pb_preview_modifier")
-        node_name = context.scene.get("pb_preview_node")
-        
-        if not all([obj_name, mod_name, node_name]):
-            print("Missing stored references")
-            return
-        
-        # Find the object
-        obj = bpy.data.objects.get(obj_name)
-        if not obj:
-            print(f"Could not find object '{obj_name}'")
-            return
-        
-        # Find the modifier
-        modifier = obj.modifiers.get(mod_name)
-        if not modifier or modifier.type != 'NODES' or not modifier.node_group:
-            print(f"Could not find geometry nodes modifier '{mod_name}'")
-            return
-        
-        # Find the node
-        node = modifier.node_group.nodes.get(node_name)
-        if not node:
-            print(f"Could not find node '{node_name}'")
-            return
-        
-        print(f"Updating preview range: Start={self.split_start}, End={self.split_end}")
-        
-        # Update the Min/Max inputs of the Select Res ID Range node
-        try:
-            # Update Min
-            if "Min" in node.inputs:
-                old_min = node.inputs["Min"].default_value
-                node.inputs["Min"].default_value = self.split_start
-                print(f"  Updated Min: {old_min} -> {self.split_start}")
-            else:
-                print(f"  Warning: Could not find Min input in node")
-            
-            # Update Max
-            if "Max" in node.inputs:
-                old_max = node.inputs["Max"].default_value  
-                node.inputs["Max"].default_value = self.split_end
-                print(f"  Updated Max: {old_max} -> {self.split_end}")
-            else:
-                print(f"  Warning: Could not find Max input in node")
-            
-            # Force depsgraph update
-            if context.view_layer:
-                context.view_layer.update()
-                
-        except Exception as e:
-            print(f"  Error updating node values: {e}")
-        
-        # Force viewport and node editor update
-        for area in context.screen.areas:
-            if area.type in {'VIEW_3D', 'NODE_EDITOR'}:
-                area.tag_redraw()
+        """Preview the range on the isolated domain while the sliders move"""
+        SplitRangePreview.request(self.split_start, self.split_end)
     
     split_start: IntProperty(
         name="Start",
@@ -116,8 +168,6 @@ class PROTEINBLENDER_OT_split_domain_popup(Operator):
         # Initialize instance attributes
         self.original_visibility = {}
         self.preview_active = False
-        self.target_node_tree = None
-        self.target_res_node = None
         
         # Find the selected item
         selected_item = None
@@ -183,7 +233,7 @@ class PROTEINBLENDER_OT_split_domain_popup(Operator):
             layout.label(text=f"Valid range: {min_val}-{max_val}")
             
             # Add preview mode indicator
-            if hasattr(self, 'preview_active') and self.preview_active:
+            if SplitRangePreview.is_active():
                 box = layout.box()
                 box.label(text="Preview Mode Active", icon='VIEW3D')
                 box.label(text="Adjust sliders to see real-time changes")
@@ -280,105 +330,42 @@ class PROTEINBLENDER_OT_split_domain_popup(Operator):
         
         # Find the geometry node tree and Select Res ID Range node
         # Since we have isolated a single object, just find ANY Select Res ID Range node in it
-        if target_object and target_object.modifiers:
-            print(f"Looking for Select Res ID Range node in object: {target_object.name}")
-            
-            for modifier in target_object.modifiers:
-                if modifier.type == 'NODES' and modifier.node_group:
-                    self.target_node_tree = modifier.node_group
-                    print(f"  Found geometry nodes modifier: {modifier.name}")
-                    
-                    # Simply find ANY Select Res ID Range node in this tree
-                    # Since this is the isolated object, it should be the right one
-                    for node in self.target_node_tree.nodes:
-                        if node.type == 'GROUP' and node.node_tree:
-                            # Check if this is a Select Res ID Range node
-                            if "Select Res ID Range" in node.node_tree.name:
-                                print(f"    Found Select Res ID Range node: {node.name}")
-                                self.target_res_node = node
-                                self.preview_active = True
-                                
-                                # Store node reference in scene properties for persistence
-                                context.scene["pb_preview_object"] = target_object.name
-                                context.scene["pb_preview_modifier"] = modifier.name
-                                context.scene["pb_preview_node"] = node.name
-                                print(f"    Stored references: object='{target_object.name}', modifier='{modifier.name}', node='{node.name}'")
-                                
-                                # Debug: List all inputs
-                                print(f"      Node inputs: {[inp.name for inp in node.inputs if inp.type in ('VALUE', 'INT')]}")
-                                
-                                # Set initial values
-                                if "Min" in node.inputs:
-                                    print(f"      Setting Min from {node.inputs['Min'].default_value} to {self.split_start}")
-                                    node.inputs["Min"].default_value = self.split_start
-                                
-                                if "Max" in node.inputs:
-                                    print(f"      Setting Max from {node.inputs['Max'].default_value} to {self.split_end}")
-                                    node.inputs["Max"].default_value = self.split_end
-                                
-                                # Force update
-                                if context.view_layer:
-                                    context.view_layer.update()
-                                
-                                print(f"    Preview mode activated!")
-                                return  # We found it, done!
-                    
-                    # If we get here, we didn't find the node
-                    if not self.target_res_node:
-                        print("  Warning: No Select Res ID Range node found in this object's node tree")
-                    break  # Only check the first geometry nodes modifier
+        for modifier in target_object.modifiers:
+            if modifier.type != 'NODES' or not modifier.node_group:
+                continue
+            for node in modifier.node_group.nodes:
+                if node.type == 'GROUP' and node.node_tree and "Select Res ID Range" in node.node_tree.name:
+                    SplitRangePreview.start(target_object, node, self.split_start, self.split_end)
+                    self.preview_active = True
+                    return
+            # Only check the first geometry nodes modifier
+            print(f"Warning: No Select Res ID Range node found in {target_object.name}")
+            break
     
     def cleanup_preview_mode(self, context):
         """Restore original visibility states and reset node values"""
         scene = context.scene
         
-        # Try to reset node values using stored references
-        if all(k in scene for k in ["pb_preview_object", "pb_preview_modifier", "pb_preview_node"]):
-            obj = bpy.data.objects.get(scene.get("pb_preview_object"))
-            if obj and obj.modifiers:
-                modifier = obj.modifiers.get(scene.get("pb_preview_modifier"))
-                if modifier and modifier.node_group:
-                    node = modifier.node_group.nodes.get(scene.get("pb_preview_node"))
-                    if node:
-                        # Find the original item to get its actual range
-                        for item in scene.outliner_items:
-                            if item.item_id == self.item_id:
-                                if item.item_type == 'CHAIN':
-                                    original_start = item.chain_start
-                                    original_end = item.chain_end
-                                else:  # DOMAIN
-                                    original_start = item.domain_start
-                                    original_end = item.domain_end
-                                
-                                # Reset the node values
-                                if "Min" in node.inputs:
-                                    node.inputs["Min"].default_value = original_start
-                                if "Max" in node.inputs:
-                                    node.inputs["Max"].default_value = original_end
-                                break
-        
-        # Clean up scene properties
-        for prop in ["pb_preview_object", "pb_preview_modifier", "pb_preview_node"]:
-            if prop in scene:
-                del scene[prop]
-                print(f"Cleaned up scene property: {prop}")
+        # Reset the node to the original range of the item
+        original_range = None
+        for item in scene.outliner_items:
+            if item.item_id == self.item_id:
+                if item.item_type == 'CHAIN':
+                    original_range = (item.chain_start, item.chain_end)
+                else:  # DOMAIN
+                    original_range = (item.domain_start, item.domain_end)
+                break
+        SplitRangePreview.stop(reset_range=original_range)
         
         # Restore original visibility
         if hasattr(self, 'original_visibility'):
             for obj_name, visibility in self.original_visibility.items():
                 if obj_name in bpy.data.objects:
                     bpy.data.objects[obj_name].hide_viewport = visibility
-        
-        # Reset preview state if attributes exist
-        if hasattr(self, 'preview_active'):
-            self.preview_active = False
-        if hasattr(self, 'target_node_tree'):
-            self.target_node_tree = None
-        if hasattr(self, 'target_res_node'):
-            self.target_res_node = None
-        if hasattr(self, 'original_visibility'):
             self.original_visibility = {}
         
+        self.preview_active = False
+        
         # Force viewport update
         for area in context.screen.areas:
             if area.type == 'VIEW_3D':
@@ -711,6 +698,7 @@ class PROTEINBLENDER_OT_split_domain(Operator):
                             if domain.object:
                                 from ..panels.visual_setup_panel import apply_style_to_object
                                 apply_style_to_object(domain.object, parent_domain_style)
+                                domain.sync_node_group()
 
                     self.report({'INFO'}, f"Created {domain_name}")
                 else:
@@ -733,7 +721,7 @@ class PROTEINBLENDER_OT_split_domain(Operator):
             # 2. The domains will be shown as children of the chain in the group view
         
         # Rebuild outliner to show new domains and updated groups
-        build_outliner_hierarchy(context)
+        molecule.defer("outliner", lambda: build_outliner_hierarchy(bpy.context))
         
         # No need to update domain group memberships individually
         # They will be shown under their parent chain in the group view
@@ -991,10 +979,8 @@ class PROTEINBLENDER_OT_merge_domains(Operator):
         else:
             self.report({'ERROR'}, "Failed to create merged domain")
         
-        # Rebuild outliner
-        build_outliner_hierarchy(context)
-        
         # Update chain's group membership if needed
+        # (the chain item survives the rebuild, which keeps its memberships)
         if affected_groups and covers_entire_chain:
             for item in context.scene.outliner_items:
                 if item.item_id == f"{molecule_id}_chain_{parent_chain.chain_id}":
@@ -1005,6 +991,101 @@ class PROTEINBLENDER_OT_merge_domains(Operator):
                     self.report({'INFO'}, f"Updated chain group memberships")
                     break
         
+        # Rebuild outliner
+        molecule.defer("outliner", lambda: build_outliner_hierarchy(bpy.context))
+        
+        return {'FINISHED'}
+
+
+class PROTEINBLENDER_OT_auto_segment_chain(Operator):
+    """Split a chain into structural domains found from its alpha carbon contacts"""
+    bl_idname = "proteinblender.auto_segment_chain"
+    bl_label = "Auto Segment Chain"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    chain_id: StringProperty(
+        name="Chain ID",
+        description="ID of the chain to segment"
+    )
+    
+    molecule_id: StringProperty(
+        name="Molecule ID",
+        description="ID of the molecule"
+    )
+    
+    cutoff: FloatProperty(
+        name="Contact Distance",
+        description="Alpha carbons closer than this are in contact",
+        min=4.0,
+        max=20.0,
+        default=8.0
+    )
+    
+    min_domain_size: IntProperty(
+        name="Minimum Size",
+        description="Minimum number of residues per domain",
+        min=5,
+        max=1000,
+        default=40
+    )
+    
+    max_ncut: FloatProperty(
+        name="Split Threshold",
+        description="Only split where the normalized contact cut is below this value. "
+                    "Higher values produce more domains",
+        min=0.01,
+        max=2.0,
+        default=0.35
+    )
+    
+    def invoke(self, context, event):
+        scene = context.scene
+        
+        # Use the selected chain when called without a chain
+        if not self.chain_id:
+            for item in scene.outliner_items:
+                if item.is_selected and item.item_type == 'CHAIN':
+                    self.chain_id = item.chain_id
+                    self.molecule_id = item.parent_id
+                    break
+        
+        if not self.chain_id or not self.molecule_id:
+            self.report({'WARNING'}, "Please select a chain to segment")
+            return {'CANCELLED'}
+        
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column()
+        col.prop(self, "cutoff")
+        col.prop(self, "min_domain_size")
+        col.prop(self, "max_ncut")
+        col.label(text="Replaces the current domains of the chain", icon='INFO')
+    
+    def execute(self, context):
+        scene_manager = ProteinBlenderScene.get_instance()
+        molecule = scene_manager.molecules.get(self.molecule_id)
+        
+        if not molecule:
+            self.report({'ERROR'}, "Molecule not found")
+            return {'CANCELLED'}
+        
+        # Capture molecule state before making changes (for undo/redo support)
+        scene_manager._capture_molecule_state(self.molecule_id)
+        
+        created_ids = molecule.auto_segment_chain(
+            self.chain_id,
+            cutoff=self.cutoff,
+            min_domain_size=self.min_domain_size,
+            max_ncut=self.max_ncut,
+        )
+        if not created_ids:
+            self.report({'INFO'}, "No domain boundaries found for this chain")
+            return {'CANCELLED'}
+        
+        molecule.defer("outliner", lambda: build_outliner_hierarchy(bpy.context))
+        self.report({'INFO'}, f"Segmented chain into {len(created_ids)} domains")
         return {'FINISHED'}
 
 
@@ -1057,12 +1138,29 @@ class PROTEINBLENDER_OT_rename_domain(Operator):
         return {'FINISHED'}
 
 
+class PROTEINBLENDER_OT_deduplicate_node_groups(Operator):
+    """Merge identical copies of node groups into one shared tree"""
+    bl_idname = "proteinblender.deduplicate_node_groups"
+    bl_label = "Clean Up Node Groups"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        from ..utils.node_templates import deduplicate_node_groups
+
+        before = len(bpy.data.node_groups)
+        removed = deduplicate_node_groups()
+        self.report({'INFO'}, f"Removed {removed} duplicate node groups ({before} -> {len(bpy.data.node_groups)})")
+        return {'FINISHED'}
+
+
 # Operator classes to register
 CLASSES = [
     PROTEINBLENDER_OT_split_domain_popup,
     PROTEINBLENDER_OT_split_domain,
     PROTEINBLENDER_OT_merge_domains,
+    PROTEINBLENDER_OT_auto_segment_chain,
     PROTEINBLENDER_OT_rename_domain,
+    PROTEINBLENDER_OT_deduplicate_node_groups,
 ]
 
 
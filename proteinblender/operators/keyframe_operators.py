@@ -2,9 +2,12 @@
 
 import bpy
 import json
+import numpy as np
 from bpy.types import Operator, PropertyGroup
 from bpy.props import BoolProperty, IntProperty, CollectionProperty, StringProperty
-from ..utils.scene_manager import ProteinBlenderScene
+from ..core.puppet_registry import PuppetRegistry
+from ..utils.keyframe_batch import KeyframeBatch, channel_values, path_values, transform_values
+from ..utils.node_templates import COLOR_INPUT, get_style_material, modifier_input_path
 
 
 # ============================================================================
@@ -110,6 +113,9 @@ def check_existing_keyframes(controller_obj, domain_objects, frame):
         if domain_obj.animation_data and domain_obj.animation_data.action:
             action = domain_obj.animation_data.action
             for fcurve in action.fcurves:
+                # Color inputs of the domain modifier are checked below
+                if fcurve.data_path.startswith("modifiers["):
+                    continue
                 for kf in fcurve.keyframe_points:
                     if abs(kf.co.x - frame) < 0.01:
                         # Any keyframe on domain objects indicates pose keyframing
@@ -139,6 +145,15 @@ def has_color_keyframe(obj, frame):
     Returns:
         True if color keyframe found, False otherwise
     """
+    # Domain colors are keyframed on the object's modifier input
+    color_path = modifier_input_path(obj, COLOR_INPUT)
+    if color_path and obj.animation_data and obj.animation_data.action:
+        for fcurve in obj.animation_data.action.fcurves:
+            if fcurve.data_path == color_path:
+                for kf in fcurve.keyframe_points:
+                    if abs(kf.co.x - frame) < 0.01:
+                        return True
+
     # Find the MolecularNodes modifier
     mod = None
     for modifier in obj.modifiers:
@@ -171,27 +186,18 @@ def has_color_keyframe(obj, frame):
             break
 
     # Also check material alpha keyframes
-    style_node = None
-    for node in node_tree.nodes:
-        if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-            style_node = node
-            break
-
-    if style_node:
-        material_input = style_node.inputs.get("Material")
-        if material_input and material_input.default_value:
-            mat = material_input.default_value
-            if mat.use_nodes and mat.node_tree:
-                for mat_node in mat.node_tree.nodes:
-                    if mat_node.type == 'BSDF_PRINCIPLED':
-                        # Check for alpha keyframes
-                        if mat.node_tree.animation_data and mat.node_tree.animation_data.action:
-                            for fcurve in mat.node_tree.animation_data.action.fcurves:
-                                if 'Alpha' in fcurve.data_path:
-                                    for kf in fcurve.keyframe_points:
-                                        if abs(kf.co.x - frame) < 0.01:
-                                            return True
-                        break
+    mat = get_style_material(obj, node_tree)
+    if mat and mat.use_nodes and mat.node_tree:
+        for mat_node in mat.node_tree.nodes:
+            if mat_node.type == 'BSDF_PRINCIPLED':
+                # Check for alpha keyframes
+                if mat.node_tree.animation_data and mat.node_tree.animation_data.action:
+                    for fcurve in mat.node_tree.animation_data.action.fcurves:
+                        if 'Alpha' in fcurve.data_path:
+                            for kf in fcurve.keyframe_points:
+                                if abs(kf.co.x - frame) < 0.01:
+                                    return True
+                break
 
     return False
 
@@ -227,6 +233,44 @@ def validate_keyframe_metadata(controller_obj, domain_objects, frame, stored_set
     return discrepancies
 
 
+def get_active_pose_transforms(scene):
+    """Collect the active pose transform of every molecule, keyed by domain ID.
+
+    Args:
+        scene: The Blender scene
+
+    Returns:
+        Dictionary mapping domain_id to its DomainTransformData
+    """
+    transforms = {}
+    for item in scene.molecule_list_items:
+        if hasattr(item, 'active_pose_index') and hasattr(item, 'poses'):
+            if 0 <= item.active_pose_index < len(item.poses):
+                active_pose = item.poses[item.active_pose_index]
+                for transform in active_pose.domain_transforms:
+                    transforms[transform.domain_id] = transform
+    return transforms
+
+
+def find_pose_transform(pose_transforms, object_name):
+    """Find the pose transform for an object named after its domain.
+
+    The object matches when its name equals the domain ID or ends with
+    ``_<domain_id>``.
+    """
+    transform = pose_transforms.get(object_name)
+    if transform is not None:
+        return transform
+
+    start = object_name.find('_')
+    while start != -1:
+        transform = pose_transforms.get(object_name[start + 1:])
+        if transform is not None:
+            return transform
+        start = object_name.find('_', start + 1)
+    return None
+
+
 # ============================================================================
 # Property Groups and Operators
 # ============================================================================
@@ -291,65 +335,12 @@ class PROTEINBLENDER_OT_create_keyframe(Operator):
         description="Collection of puppets to keyframe"
     )
     
-    def remove_geometry_node_color_keyframes(self, obj, frame):
-        """Remove color keyframes from the geometry nodes modifier and alpha from material"""
-        # Find the MolecularNodes modifier
-        mod = None
-        for modifier in obj.modifiers:
-            if modifier.type == 'NODES':
-                mod = modifier
-                break
-
-        if not mod or not mod.node_group:
-            return False
-
-        node_tree = mod.node_group
-        removed_rgb = False
-        removed_alpha = False
-
-        # Look for the Custom Combine Color node
-        for node in node_tree.nodes:
-            if node.name == "Custom Combine Color" and node.type == 'COMBINE_COLOR':
-                # Remove keyframes from the RGB input values
-                try:
-                    node.inputs['Red'].keyframe_delete("default_value", frame=frame)
-                    node.inputs['Green'].keyframe_delete("default_value", frame=frame)
-                    node.inputs['Blue'].keyframe_delete("default_value", frame=frame)
-                    removed_rgb = True
-                except:
-                    pass  # No keyframes to remove
-                break
-
-        # Remove alpha keyframe from the Style node's material
-        style_node = None
-        for node in node_tree.nodes:
-            if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-                style_node = node
-                break
-
-        if style_node:
-            material_input = style_node.inputs.get("Material")
-            if material_input and material_input.default_value:
-                mat = material_input.default_value
-                if mat.use_nodes and mat.node_tree:
-                    for mat_node in mat.node_tree.nodes:
-                        if mat_node.type == 'BSDF_PRINCIPLED':
-                            try:
-                                # Remove keyframe from alpha value
-                                mat_node.inputs['Alpha'].keyframe_delete("default_value", frame=frame)
-                                removed_alpha = True
-                            except:
-                                pass  # No keyframe to remove
-                            break
-
-        if removed_rgb or removed_alpha:
-            print(f"  ✗ Removed domain '{obj.name}' color keyframes")
-            return True
-
-        return False
+    def _find_color_sockets(self, obj):
+        """Return the color node tree, RGB sockets and alpha socket of a domain.
 
-    def keyframe_geometry_node_color(self, obj, frame):
-        """Keyframe the color inputs in the geometry nodes modifier and alpha in material"""
+        Returns:
+            Tuple of (rgb_sockets, alpha_socket); either may be empty/None
+        """
         # Find the MolecularNodes modifier
         mod = None
         for modifier in obj.modifiers:
@@ -358,171 +349,82 @@ class PROTEINBLENDER_OT_create_keyframe(Operator):
                 break
 
         if not mod or not mod.node_group:
-            print(f"  Warning: No geometry nodes modifier found on {obj.name}")
-            return False
+            return [], None
 
         node_tree = mod.node_group
-        keyframed_rgb = False
-        keyframed_alpha = False
+        rgb_sockets = []
 
         # Look for the Custom Combine Color node that holds our color values
         for node in node_tree.nodes:
             if node.name == "Custom Combine Color" and node.type == 'COMBINE_COLOR':
-                # Keyframe the RGB input values
-                try:
-                    # These are the actual properties that need to be keyframed
-                    node.inputs['Red'].keyframe_insert("default_value", frame=frame)
-                    node.inputs['Green'].keyframe_insert("default_value", frame=frame)
-                    node.inputs['Blue'].keyframe_insert("default_value", frame=frame)
-                    keyframed_rgb = True
-                except Exception as e:
-                    print(f"  Error keyframing RGB nodes for {obj.name}: {e}")
+                rgb_sockets = [node.inputs['Red'], node.inputs['Green'], node.inputs['Blue']]
                 break
 
+        # Alpha lives on the style material
+        alpha_socket = None
+        mat = get_style_material(obj, node_tree)
+        if mat and mat.use_nodes and mat.node_tree:
+            for mat_node in mat.node_tree.nodes:
+                if mat_node.type == 'BSDF_PRINCIPLED':
+                    alpha_socket = mat_node.inputs['Alpha']
+                    break
+
+        return rgb_sockets, alpha_socket
+
+    def remove_geometry_node_color_keyframes(self, batch, obj, frame):
+        """Queue removal of color keyframes from the geometry nodes modifier and alpha from material"""
+        rgb_sockets, alpha_socket = self._find_color_sockets(obj)
+        color_path = modifier_input_path(obj, COLOR_INPUT)
+        if color_path:
+            for index in range(3):
+                batch.remove(obj, color_path, index, frame)
+        for socket in rgb_sockets:
+            batch.remove_property(socket, "default_value", frame)
+        if alpha_socket:
+            batch.remove_property(alpha_socket, "default_value", frame)
+        return bool(color_path or rgb_sockets or alpha_socket)
+
+    def keyframe_geometry_node_color(self, batch, obj, frame, evaluate_frame=None):
+        """Queue keyframes for the color inputs in the geometry nodes modifier and alpha in material"""
+        rgb_sockets, alpha_socket = self._find_color_sockets(obj)
+
+        # Domains keep their color in a modifier input, keyed on the object
+        color_path = modifier_input_path(obj, COLOR_INPUT)
+        if color_path:
+            try:
+                values = path_values(obj, color_path, evaluate_frame)
+            except ValueError:
+                # The input has no value stored on the modifier yet
+                color_path = None
+            else:
+                for index in range(3):
+                    batch.insert(obj, color_path, index, frame, values[index])
+                rgb_sockets = []
+
         # If no Custom Combine Color node exists, try to get and store the color
-        if not keyframed_rgb:
+        elif not rgb_sockets:
             from ..panels.visual_setup_panel import get_object_color, apply_color_to_object
             color = get_object_color(obj)
             if color:
                 # Apply the color (this creates the Custom Combine Color node)
                 apply_color_to_object(obj, color)
-                # Now try to keyframe again
-                for node in node_tree.nodes:
-                    if node.name == "Custom Combine Color" and node.type == 'COMBINE_COLOR':
-                        try:
-                            node.inputs['Red'].keyframe_insert("default_value", frame=frame)
-                            node.inputs['Green'].keyframe_insert("default_value", frame=frame)
-                            node.inputs['Blue'].keyframe_insert("default_value", frame=frame)
-                            keyframed_rgb = True
-                        except Exception as e:
-                            print(f"  Error keyframing RGB nodes for {obj.name}: {e}")
-                        break
+                rgb_sockets, alpha_socket = self._find_color_sockets(obj)
 
-        # Now keyframe the alpha value in the Style node's material
-        style_node = None
-        for node in node_tree.nodes:
-            if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-                style_node = node
-                break
-
-        if style_node:
-            material_input = style_node.inputs.get("Material")
-            if material_input and material_input.default_value:
-                mat = material_input.default_value
-                if mat.use_nodes and mat.node_tree:
-                    for mat_node in mat.node_tree.nodes:
-                        if mat_node.type == 'BSDF_PRINCIPLED':
-                            try:
-                                # Keyframe the alpha value
-                                mat_node.inputs['Alpha'].keyframe_insert("default_value", frame=frame)
-                                keyframed_alpha = True
-                            except Exception as e:
-                                print(f"  Error keyframing alpha for {obj.name}: {e}")
-                            break
-
-        if keyframed_rgb and keyframed_alpha:
-            print(f"  ✓ Keyframed domain '{obj.name}' color (RGBA)")
-        elif keyframed_rgb:
-            print(f"  ✓ Keyframed domain '{obj.name}' color (RGB only)")
-        elif keyframed_alpha:
-            print(f"  ✓ Keyframed domain '{obj.name}' alpha only")
-        else:
-            print(f"  Warning: Could not keyframe color for {obj.name}")
-            return False
+        for socket in rgb_sockets:
+            batch.insert_property(
+                socket, "default_value", frame, channel_values(socket, "default_value", evaluate_frame)
+            )
+        if alpha_socket:
+            batch.insert_property(
+                alpha_socket, "default_value", frame,
+                channel_values(alpha_socket, "default_value", evaluate_frame)
+            )
 
-        return True
+        return bool(color_path or rgb_sockets or alpha_socket)
 
     def get_puppet_objects(self, context, puppet_id):
         """Get all Blender objects that belong to a puppet group"""
-        objects = []
-        
-        # Find puppet item
-        puppet_item = None
-        if hasattr(context.scene, 'outliner_items'):
-            for item in context.scene.outliner_items:
-                if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                    puppet_item = item
-                    break
-        
-        if not puppet_item or not hasattr(puppet_item, 'puppet_memberships'):
-            print(f"Debug: No puppet found or no memberships for puppet {puppet_id}")
-            return objects
-        
-        if not puppet_item.puppet_memberships:
-            print(f"Debug: Empty memberships for puppet {puppet_id}")
-            return objects
-        
-        # Parse member IDs and find corresponding objects
-        member_ids = puppet_item.puppet_memberships.split(',')
-        print(f"Debug: Puppet '{puppet_item.name}' has members: {member_ids}")
-        
-        # Import scene manager to access molecules
-        from ..utils.scene_manager import ProteinBlenderScene
-        scene_manager = ProteinBlenderScene.get_instance()
-        
-        for member_id in member_ids:
-            # Member IDs are in format: molecule_id_domain_id
-            if '_' in member_id:
-                # Try to intelligently parse the member_id
-                # First, check if it contains '_chain_'
-                if '_chain_' in member_id:
-                    # Split at '_chain_' to separate molecule_id from chain identifier
-                    parts = member_id.rsplit('_chain_', 1)
-                    mol_id = parts[0]
-                    domain_id = 'chain_' + parts[1]
-                else:
-                    # For custom domains, find where molecule_id ends
-                    import re
-                    match = re.match(r'^(.+?_\d+)_(.+)$', member_id)
-                    if match:
-                        mol_id = match.group(1)
-                        domain_id = match.group(2)
-                    else:
-                        # Fallback to splitting on last underscore
-                        parts = member_id.rsplit('_', 1)
-                        if len(parts) == 2:
-                            mol_id = parts[0]
-                            domain_id = parts[1]
-                        else:
-                            print(f"Debug: Could not parse member_id '{member_id}'")
-                            continue
-                
-                print(f"Debug: Looking for mol_id='{mol_id}', domain_id='{domain_id}'")
-                
-                # Try to find the domain object
-                if mol_id in scene_manager.molecules:
-                    molecule = scene_manager.molecules[mol_id]
-                    
-                    # First try direct lookup
-                    if domain_id in molecule.domains:
-                        domain = molecule.domains[domain_id]
-                        if domain.object:
-                            objects.append(domain.object)
-                            print(f"Debug: Found domain object '{domain.object.name}' for {member_id}")
-                    else:
-                        # If domain_id is like 'chain_4', try to find the matching domain
-                        if domain_id.startswith('chain_'):
-                            chain_index = domain_id.replace('chain_', '')
-                            # Find domain that starts with mol_id_chainindex_
-                            for dom_id, dom in molecule.domains.items():
-                                if dom_id.startswith(f"{mol_id}_{chain_index}_"):
-                                    if dom.object:
-                                        objects.append(dom.object)
-                                        print(f"Debug: Found chain object '{dom.object.name}' for {member_id}")
-                                    break
-            
-            # Always check outliner items as fallback
-            for item in context.scene.outliner_items:
-                if item.item_id == member_id:
-                    if item.object_name:
-                        obj = bpy.data.objects.get(item.object_name)
-                        if obj and obj not in objects:
-                            objects.append(obj)
-                            print(f"Debug: Found object via outliner '{obj.name}' for {member_id}")
-                    break
-        
-        print(f"Debug: Total objects found for puppet: {len(objects)}")
-        return objects
+        return PuppetRegistry.get_objects(context.scene, puppet_id)
     
     def invoke(self, context, event):
         scene = context.scene
@@ -534,48 +436,45 @@ class PROTEINBLENDER_OT_create_keyframe(Operator):
         self.frame_number = scene.frame_current
 
         # Add all puppets from the outliner
-        if hasattr(scene, 'outliner_items'):
-            for item in scene.outliner_items:
-                # Only include actual puppets (not separator)
-                if item.item_type == 'PUPPET' and item.item_id != "puppets_separator":
-                    # Only include puppets with a controller object
-                    if item.controller_object_name:
-                        puppet_item = self.puppet_items.add()
-                        puppet_item.puppet_id = item.item_id
-                        puppet_item.puppet_name = item.name
-                        puppet_item.controller_object_name = item.controller_object_name
-
-                        # Try to load existing keyframe metadata for this frame
-                        controller_obj = bpy.data.objects.get(item.controller_object_name)
-                        existing_settings = get_keyframe_metadata(controller_obj, self.frame_number)
-
-                        if existing_settings:
-                            # Restore previous settings from metadata
-                            puppet_item.use_puppet = existing_settings.get('use_puppet', False)
-                            puppet_item.keyframe_location = existing_settings.get('location', True)
-                            puppet_item.keyframe_rotation = existing_settings.get('rotation', True)
-                            puppet_item.keyframe_scale = existing_settings.get('scale', True)
-                            puppet_item.keyframe_color = existing_settings.get('color', True)
-                            puppet_item.keyframe_pose = existing_settings.get('pose', True)
-
-                            # Validate metadata against actual F-Curves
-                            domain_objects = self.get_puppet_objects(context, item.item_id)
-                            discrepancies = validate_keyframe_metadata(
-                                controller_obj, domain_objects, self.frame_number, existing_settings
-                            )
-
-                            if discrepancies:
-                                print(f"⚠ Keyframe metadata validation warnings for '{item.name}' at frame {self.frame_number}:")
-                                for msg in discrepancies:
-                                    print(f"  - {msg}")
-                        else:
-                            # No metadata found - use defaults
-                            puppet_item.use_puppet = False  # Unchecked by default
-                            puppet_item.keyframe_location = True
-                            puppet_item.keyframe_rotation = True
-                            puppet_item.keyframe_scale = True
-                            puppet_item.keyframe_color = True
-                            puppet_item.keyframe_pose = True
+        for puppet in PuppetRegistry.get_puppets(scene):
+            # Only include puppets with a controller object
+            if puppet.controller_object_name:
+                puppet_item = self.puppet_items.add()
+                puppet_item.puppet_id = puppet.puppet_id
+                puppet_item.puppet_name = puppet.name
+                puppet_item.controller_object_name = puppet.controller_object_name
+
+                # Try to load existing keyframe metadata for this frame
+                controller_obj = bpy.data.objects.get(puppet.controller_object_name)
+                existing_settings = get_keyframe_metadata(controller_obj, self.frame_number)
+
+                if existing_settings:
+                    # Restore previous settings from metadata
+                    puppet_item.use_puppet = existing_settings.get('use_puppet', False)
+                    puppet_item.keyframe_location = existing_settings.get('location', True)
+                    puppet_item.keyframe_rotation = existing_settings.get('rotation', True)
+                    puppet_item.keyframe_scale = existing_settings.get('scale', True)
+                    puppet_item.keyframe_color = existing_settings.get('color', True)
+                    puppet_item.keyframe_pose = existing_settings.get('pose', True)
+
+                    # Validate metadata against actual F-Curves
+                    domain_objects = self.get_puppet_objects(context, puppet.puppet_id)
+                    discrepancies = validate_keyframe_metadata(
+                        controller_obj, domain_objects, self.frame_number, existing_settings
+                    )
+
+                    if discrepancies:
+                        print(f"⚠ Keyframe metadata validation warnings for '{puppet.name}' at frame {self.frame_number}:")
+                        for msg in discrepancies:
+                            print(f"  - {msg}")
+                else:
+                    # No metadata found - use defaults
+                    puppet_item.use_puppet = False  # Unchecked by default
+                    puppet_item.keyframe_location = True
+                    puppet_item.keyframe_rotation = True
+                    puppet_item.keyframe_scale = True
+                    puppet_item.keyframe_color = True
+                    puppet_item.keyframe_pose = True
 
         # Show popup dialog
         return context.window_manager.invoke_props_dialog(self, width=500)
@@ -669,154 +568,102 @@ class PROTEINBLENDER_OT_create_keyframe(Operator):
     
     def execute(self, context):
         scene = context.scene
-        scene_manager = ProteinBlenderScene.get_instance()
-        
+
         # Get selected puppets
         selected_puppets = [item for item in self.puppet_items if item.use_puppet]
-        
+
         if not selected_puppets:
             self.report({'WARNING'}, "No puppets selected")
             return {'CANCELLED'}
-        
-        # Store current frame
-        original_frame = scene.frame_current
-        
-        # Only change frame if necessary
-        if original_frame != self.frame_number:
-            scene.frame_set(self.frame_number)
-        
+
+        frame = self.frame_number
+        # Keyframing another frame stores the animated values at that frame,
+        # which are read from the F-Curves instead of stepping the scene there.
+        evaluate_frame = None if frame == scene.frame_current else frame
+
+        # Active pose transforms of every molecule, gathered once for all puppets
+        pose_transforms = get_active_pose_transforms(scene)
+
+        batch = KeyframeBatch()
         keyframed_puppets = []
         total_keyframed = 0
-        
+
         for puppet_item in selected_puppets:
-            puppet_name = puppet_item.puppet_name
-            puppet_id = puppet_item.puppet_id
-            
-            print(f"\nProcessing puppet: {puppet_name}")
-            
             # Get the Empty controller object
             controller_obj = None
             if puppet_item.controller_object_name:
                 controller_obj = bpy.data.objects.get(puppet_item.controller_object_name)
-                if not controller_obj:
-                    print(f"  Warning: Controller object '{puppet_item.controller_object_name}' not found")
-            
+
             # Get all domain objects belonging to this puppet
-            domain_objects = self.get_puppet_objects(context, puppet_id)
-            
+            domain_objects = self.get_puppet_objects(context, puppet_item.puppet_id)
+
             if not domain_objects and not controller_obj:
-                print(f"  Warning: No objects found for puppet '{puppet_name}'")
                 continue
-            
-            # Apply any active poses for the puppet's domains
-            # This preserves domain arrangements
-            for item in scene.molecule_list_items:
-                if hasattr(item, 'active_pose_index') and hasattr(item, 'poses'):
-                    if item.active_pose_index >= 0 and item.active_pose_index < len(item.poses):
-                        active_pose = item.poses[item.active_pose_index]
-                        
-                        # Apply pose transforms to matching domains
-                        for transform in active_pose.domain_transforms:
-                            for domain_obj in domain_objects:
-                                if domain_obj.name == transform.domain_id or \
-                                   domain_obj.name.endswith(f"_{transform.domain_id}"):
-                                    print(f"  Applying pose transform to {domain_obj.name}")
-                                    domain_obj.location = transform.location
-                                    domain_obj.rotation_euler = transform.rotation
-                                    domain_obj.scale = transform.scale
-            
+
             # Keyframe the Empty controller based on checkboxes
-            # Only process if puppet is selected
-            if controller_obj and puppet_item.use_puppet:
-                keyframed_properties = []
-
-                # Location
-                if puppet_item.keyframe_location:
-                    controller_obj.keyframe_insert(data_path="location", frame=self.frame_number)
-                    keyframed_properties.append("location")
-                    print(f"  ✓ Keyframed controller location at frame {self.frame_number}")
-                else:
-                    # Remove existing keyframe if checkbox is unchecked
-                    try:
-                        controller_obj.keyframe_delete(data_path="location", frame=self.frame_number)
-                        print(f"  ✗ Removed controller location keyframe at frame {self.frame_number}")
-                    except:
-                        pass  # No keyframe exists to remove
-
-                # Rotation
-                if puppet_item.keyframe_rotation:
-                    controller_obj.keyframe_insert(data_path="rotation_euler", frame=self.frame_number)
-                    keyframed_properties.append("rotation")
-                    print(f"  ✓ Keyframed controller rotation at frame {self.frame_number}")
-                else:
-                    # Remove existing keyframe if checkbox is unchecked
-                    try:
-                        controller_obj.keyframe_delete(data_path="rotation_euler", frame=self.frame_number)
-                        print(f"  ✗ Removed controller rotation keyframe at frame {self.frame_number}")
-                    except:
-                        pass  # No keyframe exists to remove
-
-                # Scale
-                if puppet_item.keyframe_scale:
-                    controller_obj.keyframe_insert(data_path="scale", frame=self.frame_number)
-                    keyframed_properties.append("scale")
-                    print(f"  ✓ Keyframed controller scale at frame {self.frame_number}")
-                else:
-                    # Remove existing keyframe if checkbox is unchecked
-                    try:
-                        controller_obj.keyframe_delete(data_path="scale", frame=self.frame_number)
-                        print(f"  ✗ Removed controller scale keyframe at frame {self.frame_number}")
-                    except:
-                        pass  # No keyframe exists to remove
-
-                if keyframed_properties:
-                    print(f"  Controller: Keyframed {', '.join(keyframed_properties)}")
+            if controller_obj:
+                keyframed_any = False
+                for enabled, channel in (
+                    (puppet_item.keyframe_location, ("location", 3)),
+                    (puppet_item.keyframe_rotation, ("rotation_euler", 3)),
+                    (puppet_item.keyframe_scale, ("scale", 3)),
+                ):
+                    if enabled:
+                        batch.insert_transforms(
+                            controller_obj, frame,
+                            transform_values(controller_obj, evaluate_frame, (channel,)),
+                            channels=(channel,)
+                        )
+                        keyframed_any = True
+                    else:
+                        # Remove existing keyframe if checkbox is unchecked
+                        batch.remove_transforms(controller_obj, frame, channels=(channel,))
+                if keyframed_any:
                     total_keyframed += 1
-            
+
             # Keyframe domain relative transforms (local space) based on pose checkbox
             for domain_obj in domain_objects:
+                # Apply any active pose for the domain to preserve its arrangement
+                transform = find_pose_transform(pose_transforms, domain_obj.name)
+                if transform is not None and evaluate_frame is None:
+                    domain_obj.location = transform.location
+                    domain_obj.rotation_euler = transform.rotation
+                    domain_obj.scale = transform.scale
+
                 if puppet_item.keyframe_pose:
-                    # Keyframe local transforms when pose checkbox is checked
-                    domain_obj.keyframe_insert(data_path="location", frame=self.frame_number)
-                    domain_obj.keyframe_insert(data_path="rotation_euler", frame=self.frame_number)
-                    domain_obj.keyframe_insert(data_path="scale", frame=self.frame_number)
-                    print(f"  ✓ Keyframed domain '{domain_obj.name}' pose (local transforms)")
+                    if transform is not None:
+                        values = np.concatenate(
+                            (transform.location, transform.rotation, transform.scale)
+                        )
+                    else:
+                        values = transform_values(domain_obj, evaluate_frame)
+                    batch.insert_transforms(domain_obj, frame, values)
                 else:
                     # Remove existing keyframes if pose checkbox is unchecked
-                    try:
-                        domain_obj.keyframe_delete(data_path="location", frame=self.frame_number)
-                        domain_obj.keyframe_delete(data_path="rotation_euler", frame=self.frame_number)
-                        domain_obj.keyframe_delete(data_path="scale", frame=self.frame_number)
-                        print(f"  ✗ Removed domain '{domain_obj.name}' pose keyframes")
-                    except:
-                        pass  # No keyframes exist to remove
-                
+                    batch.remove_transforms(domain_obj, frame)
+
                 # Keyframe color if requested
                 if puppet_item.keyframe_color:
-                    # Keyframe the actual geometry node color inputs
-                    self.keyframe_geometry_node_color(domain_obj, self.frame_number)
+                    self.keyframe_geometry_node_color(batch, domain_obj, frame, evaluate_frame)
                 else:
                     # Remove color keyframes if checkbox is unchecked
-                    self.remove_geometry_node_color_keyframes(domain_obj, self.frame_number)
-                
+                    self.remove_geometry_node_color_keyframes(batch, domain_obj, frame)
+
                 total_keyframed += 1
-            
-            keyframed_puppets.append(puppet_name)
+
+            keyframed_puppets.append(puppet_item.puppet_name)
+
+        batch.commit()
 
         # Save keyframe metadata for all processed puppets
         for puppet_item in self.puppet_items:
             controller_obj = bpy.data.objects.get(puppet_item.controller_object_name)
             if controller_obj:
-                save_keyframe_metadata(controller_obj, self.frame_number, puppet_item)
-                print(f"💾 Saved keyframe metadata for '{puppet_item.puppet_name}' at frame {self.frame_number}")
-
-        # Restore original frame
-        if original_frame != self.frame_number:
-            scene.frame_set(original_frame)
+                save_keyframe_metadata(controller_obj, frame, puppet_item)
 
         if keyframed_puppets:
             puppet_names = ", ".join(keyframed_puppets)
-            self.report({'INFO'}, f"Keyframed {total_keyframed} objects from puppets: {puppet_names} at frame {self.frame_number}")
+            self.report({'INFO'}, f"Keyframed {total_keyframed} objects from puppets: {puppet_names} at frame {frame}")
         else:
             self.report({'WARNING'}, "No objects were keyframed")
 
@@ -896,39 +743,35 @@ class PROTEINBLENDER_OT_sync_keyframe_metadata(Operator):
         synced_count = 0
 
         # Process all puppets
-        if hasattr(scene, 'outliner_items'):
-            for item in scene.outliner_items:
-                if item.item_type == 'PUPPET' and item.item_id != "puppets_separator":
-                    if item.controller_object_name:
-                        controller_obj = bpy.data.objects.get(item.controller_object_name)
-                        if not controller_obj:
-                            continue
-
-                        # Get puppet's domain objects
-                        from ..operators.keyframe_operators import PROTEINBLENDER_OT_create_keyframe
-                        temp_op = PROTEINBLENDER_OT_create_keyframe()
-                        domain_objects = temp_op.get_puppet_objects(context, item.item_id)
-
-                        # Check what's actually keyframed
-                        actual_state = check_existing_keyframes(controller_obj, domain_objects, current_frame)
-
-                        # Create a temporary settings object to save
-                        class TempSettings:
-                            def __init__(self):
-                                self.use_puppet = any(actual_state.values())  # True if any property is keyframed
-                                self.keyframe_location = actual_state.get('location', False)
-                                self.keyframe_rotation = actual_state.get('rotation', False)
-                                self.keyframe_scale = actual_state.get('scale', False)
-                                self.keyframe_pose = actual_state.get('pose', False)
-                                self.keyframe_color = actual_state.get('color', False)
-
-                        temp_settings = TempSettings()
-
-                        # Only save metadata if at least one property is keyframed
-                        if temp_settings.use_puppet:
-                            save_keyframe_metadata(controller_obj, current_frame, temp_settings)
-                            synced_count += 1
-                            print(f"🔄 Synced metadata for '{item.name}' at frame {current_frame}")
+        for puppet in PuppetRegistry.get_puppets(scene):
+            if puppet.controller_object_name:
+                controller_obj = bpy.data.objects.get(puppet.controller_object_name)
+                if not controller_obj:
+                    continue
+
+                # Get puppet's domain objects
+                domain_objects = PuppetRegistry.get_objects(scene, puppet.puppet_id)
+
+                # Check what's actually keyframed
+                actual_state = check_existing_keyframes(controller_obj, domain_objects, current_frame)
+
+                # Create a temporary settings object to save
+                class TempSettings:
+                    def __init__(self):
+                        self.use_puppet = any(actual_state.values())  # True if any property is keyframed
+                        self.keyframe_location = actual_state.get('location', False)
+                        self.keyframe_rotation = actual_state.get('rotation', False)
+                        self.keyframe_scale = actual_state.get('scale', False)
+                        self.keyframe_pose = actual_state.get('pose', False)
+                        self.keyframe_color = actual_state.get('color', False)
+
+                temp_settings = TempSettings()
+
+                # Only save metadata if at least one property is keyframed
+                if temp_settings.use_puppet:
+                    save_keyframe_metadata(controller_obj, current_frame, temp_settings)
+                    synced_count += 1
+                    print(f"🔄 Synced metadata for '{puppet.name}' at frame {current_frame}")
 
         if synced_count > 0:
             self.report({'INFO'}, f"Synced keyframe metadata for {synced_count} puppet(s) at frame {current_frame}")
@@ -572,8 +572,13 @@ class MOLECULE_PB_OT_duplicate_protein(Operator):
                 if new_domain.style != 'ribbon':  # ribbon is default, only change if different
                     try:
                         from ..utils.molecularnodes.blender.nodes import styles_mapping, append, swap
+                        from ..utils.node_templates import switch_domain_style
+                        # Domains sharing a tree per style move to the tree of their style
+                        if (new_domain.style in styles_mapping and
+                                switch_domain_style(new_domain.object, styles_mapping[new_domain.style])):
+                            new_domain.sync_node_group()
                         # Find the style node in the new domain's node group
-                        if new_domain.node_group:
+                        elif new_domain.node_group:
                             for node in new_domain.node_group.nodes:
                                 if (node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name):
                                     if new_domain.style in styles_mapping:
@@ -655,6 +660,12 @@ class MOLECULE_PB_OT_duplicate_protein(Operator):
             source_tree = source_mod.node_group
             target_tree = target_mod.node_group
 
+            # Domains keep their color in a modifier input
+            from ..utils.node_templates import COLOR_INPUT, get_modifier_input, set_domain_color
+            source_color = get_modifier_input(source_obj, COLOR_INPUT)
+            if source_color is not None:
+                set_domain_color(target_obj, source_color)
+
             # Look for Custom Combine Color node in source
             source_color_node = None
             for node in source_tree.nodes:
@@ -684,32 +695,11 @@ class MOLECULE_PB_OT_duplicate_protein(Operator):
     def _copy_material_alpha(self, source_obj, target_obj, source_tree, target_tree):
         """Copy alpha value from source material to target material"""
         try:
-            # Find Style node in both trees
-            source_style_node = None
-            target_style_node = None
-
-            for node in source_tree.nodes:
-                if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-                    source_style_node = node
-                    break
-
-            for node in target_tree.nodes:
-                if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-                    target_style_node = node
-                    break
-
-            if not source_style_node or not target_style_node:
-                return
-
-            # Get materials
-            source_mat_input = source_style_node.inputs.get("Material")
-            target_mat_input = target_style_node.inputs.get("Material")
-
-            if not source_mat_input or not target_mat_input:
-                return
+            from ..utils.node_templates import get_style_material
 
-            source_mat = source_mat_input.default_value
-            target_mat = target_mat_input.default_value
+            # Domains keep their style material in a modifier input
+            source_mat = get_style_material(source_obj, source_tree)
+            target_mat = get_style_material(target_obj, target_tree)
 
             if not source_mat or not target_mat:
                 return
@@ -57,7 +57,9 @@ class MOLECULE_OT_import_local(Operator, ImportHelper):
         
         try:
             scene_manager = ProteinBlenderScene.get_instance()
-            success = scene_manager.import_molecule_from_file(filepath, identifier)
+            success = scene_manager.import_molecule_from_file(
+                filepath, identifier, instance_assembly=context.scene.protein_props.instance_assembly
+            )
             
             if not success:
                 self.report({'ERROR'}, f"Failed to import {filepath}")
@@ -45,7 +45,8 @@ class MOLECULE_OT_import_protein(Operator):
             success = scene_manager.create_molecule_from_id(
                 identifier,
                 import_method=method,
-                remote_format=fmt
+                remote_format=fmt,
+                instance_assembly=props.instance_assembly
             )
             
             if not success:
@@ -34,6 +34,7 @@ from .pose_library_panel import (
     PROTEINBLENDER_OT_apply_pose,
     PROTEINBLENDER_OT_capture_pose,
     PROTEINBLENDER_OT_delete_pose,
+    PROTEINBLENDER_OT_interpolate_poses,
     PROTEINBLENDER_OT_placeholder
 )
 from .animation_panel import PROTEINBLENDER_PT_animation
@@ -65,6 +66,7 @@ __all__ = [
     'PROTEINBLENDER_OT_apply_pose',
     'PROTEINBLENDER_OT_capture_pose',
     'PROTEINBLENDER_OT_delete_pose',
+    'PROTEINBLENDER_OT_interpolate_poses',
     'PROTEINBLENDER_OT_placeholder',
     'PROTEINBLENDER_PT_animation',
     'CLASSES',
@@ -89,6 +91,7 @@ CLASSES = [
     PROTEINBLENDER_OT_apply_pose,
     PROTEINBLENDER_OT_capture_pose,
     PROTEINBLENDER_OT_delete_pose,
+    PROTEINBLENDER_OT_interpolate_poses,
     PROTEINBLENDER_OT_placeholder,
     
     # Panels in order (top to bottom)
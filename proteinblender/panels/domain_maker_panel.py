@@ -305,6 +305,10 @@ class PROTEINBLENDER_PT_domain_maker(Panel):
                     op = row.operator("proteinblender.split_domain_popup", text=f"Split {item_type}", icon='MOD_ARRAY')
                     op.item_id = selected_item.item_id
                     op.item_type = selected_item.item_type
+                    if selected_item.item_type == 'CHAIN':
+                        op = row.operator("proteinblender.auto_segment_chain", text="Auto Segment", icon='MOD_EXPLODE')
+                        op.chain_id = selected_item.chain_id
+                        op.molecule_id = selected_item.parent_id
                 else:
                     # No valid selection
                     row = col.row()
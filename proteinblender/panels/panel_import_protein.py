@@ -31,6 +31,7 @@ class PROTEIN_PB_PT_import_protein(Panel):
             row.prop(props, "pdb_id", text="PDB ID")
         elif props.import_method == 'ALPHAFOLD':
             row.prop(props, "uniprot_id", text="UniProt ID")
+        col.prop(props, "instance_assembly")
         col.separator(factor=1.0)
 
         # Remote download and local import buttons
@@ -4,6 +4,11 @@ import bpy
 from bpy.types import Panel, Operator, PropertyGroup
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty, CollectionProperty, PointerProperty
 from datetime import datetime
+import numpy as np
+from ..core.puppet_registry import PuppetRegistry
+from ..utils.pose_manager import PoseManager
+from ..utils.pose_thumbnails import PoseThumbnails, image_name
+from ..utils.pose_interpolation import PoseInterpolator, EASING_ITEMS, LOCATION_ITEMS
 
 
 class GroupSelectionItem(PropertyGroup):
@@ -38,15 +43,13 @@ class PROTEINBLENDER_OT_create_pose(Operator):
         self.selected_puppets = {}  # Dictionary to track selected state
         
         # Get available puppets
-        if hasattr(context.scene, 'outliner_items'):
-            for item in context.scene.outliner_items:
-                if item.item_type == 'PUPPET' and item.item_id != "puppets_separator":
-                    self.available_puppets.append({
-                        'id': item.item_id,
-                        'name': item.name
-                    })
-                    # Initialize all puppets as selected by default
-                    self.selected_puppets[item.item_id] = True
+        for puppet in PuppetRegistry.get_puppets(context.scene):
+            self.available_puppets.append({
+                'id': puppet.puppet_id,
+                'name': puppet.name
+            })
+            # Initialize all puppets as selected by default
+            self.selected_puppets[puppet.puppet_id] = True
         
         if not self.available_puppets:
             self.report({'WARNING'}, "No puppets available. Create puppets first.")
@@ -124,97 +127,12 @@ class PROTEINBLENDER_OT_create_pose(Operator):
         pose.created_timestamp = datetime.now().isoformat()
         pose.modified_timestamp = pose.created_timestamp
         
-        # Capture transforms for each puppet
-        print(f"\nDebug: Creating pose '{self.pose_name}'")
-        print(f"Debug: Selected puppet IDs: {selected_ids}")
+        # Capture transforms for all selected puppets in one pass
+        puppet_names = {puppet['id']: puppet['name'] for puppet in self.available_puppets}
+        PoseManager.capture_puppet_transforms(context, pose, selected_ids, puppet_names)
         
-        for puppet_id in selected_ids:
-            print(f"Debug: Processing puppet {puppet_id}")
-            try:
-                # Get the puppet controller Empty object
-                controller_obj = None
-                for item in context.scene.outliner_items:
-                    if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                        if item.controller_object_name:
-                            controller_obj = bpy.data.objects.get(item.controller_object_name)
-                            if controller_obj:
-                                print(f"Debug: Found controller '{controller_obj.name}' for puppet {puppet_id}")
-                        break
-
-                # Get objects in this puppet
-                objects = self.get_puppet_objects(context, puppet_id)
-                print(f"Debug: Group {puppet_id} has {len(objects)} objects")
-
-                if not objects:
-                    print(f"Debug: WARNING - No objects found for puppet {puppet_id}")
-                    # Try to understand why
-                    for item in context.scene.outliner_items:
-                        if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                            print(f"  Group members: {item.puppet_memberships}")
-                            # Try alternative approach to find objects
-                            if item.puppet_memberships:
-                                for member_id in item.puppet_memberships.split(','):
-                                    print(f"  Checking member: {member_id}")
-                                    # Look for outliner item with this ID
-                                    for member_item in context.scene.outliner_items:
-                                        if member_item.item_id == member_id and member_item.object_name:
-                                            obj = bpy.data.objects.get(member_item.object_name)
-                                            if obj:
-                                                print(f"    Found object via outliner: {obj.name}")
-                                                objects.append(obj)
-                            break
-
-                for obj in objects:
-                    transform = pose.transforms.add()
-                    transform.puppet_id = puppet_id
-                    # Find the puppet name
-                    puppet_name = next((g['name'] for g in self.available_puppets
-                                     if g['id'] == puppet_id), puppet_id)
-                    transform.puppet_name = puppet_name
-                    transform.object_name = obj.name
-
-                    # Store transforms RELATIVE to the puppet controller
-                    if controller_obj:
-                        # Calculate relative transforms using matrix math for accuracy
-                        from mathutils import Matrix
-
-                        # Get the inverse of the controller's world matrix
-                        controller_matrix_inv = controller_obj.matrix_world.inverted()
-
-                        # Get object's transform relative to controller
-                        relative_matrix = controller_matrix_inv @ obj.matrix_world
-
-                        # Extract location, rotation, scale from the relative matrix
-                        transform.location = relative_matrix.to_translation()
-                        transform.rotation_euler = relative_matrix.to_euler()
-                        transform.scale = relative_matrix.to_scale()
-
-                        print(f"  Stored RELATIVE: {obj.name}")
-                        print(f"    Controller location: {list(controller_obj.location)}")
-                        print(f"    Object world location: {list(obj.location)}")
-                        print(f"    Relative location: {list(transform.location)}")
-                    else:
-                        # Fallback to absolute positions if no controller found
-                        print(f"  WARNING: No controller found, storing absolute positions")
-                        transform.location = obj.location.copy()
-                        transform.rotation_euler = obj.rotation_euler.copy()
-                        transform.scale = obj.scale.copy()
-
-                    # Capture color if available
-                    from ..panels.visual_setup_panel import get_object_color
-                    color = get_object_color(obj)
-                    if color:
-                        transform.color = color
-                        transform.has_color = True
-                    else:
-                        transform.has_color = False
-            except Exception as e:
-                print(f"Debug: ERROR processing puppet {puppet_id}: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        # Capture screenshot preview
-        self.capture_pose_preview(context, pose)
+        # Queue the thumbnail, drawn later unless cached
+        PoseThumbnails.request(scene, pose)
         
         # Set as active
         if hasattr(scene, 'active_pose_index'):
@@ -222,190 +140,7 @@ class PROTEINBLENDER_OT_create_pose(Operator):
         
         self.report({'INFO'}, f"Created pose '{self.pose_name}' with {len(selected_ids)} puppet(s)")
         return {'FINISHED'}
-    
-    def capture_pose_preview(self, context, pose):
-        """Capture a preview image for the pose"""
-        try:
-            import os
-            import tempfile
-            from pathlib import Path
-            
-            # Create temp directory for pose previews if it doesn't exist
-            temp_dir = Path(tempfile.gettempdir()) / "proteinblender_poses"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Generate filename based on pose name and timestamp
-            import time
-            timestamp = str(int(time.time()))
-            safe_name = "".join(c if c.isalnum() or c in "_-" else "_" for c in pose.name)
-            preview_file = temp_dir / f"pose_{safe_name}_{timestamp}.png"
-            
-            # Store current render settings
-            old_path = context.scene.render.filepath
-            old_format = context.scene.render.image_settings.file_format
-            old_res_x = context.scene.render.resolution_x
-            old_res_y = context.scene.render.resolution_y
-            old_percentage = context.scene.render.resolution_percentage
-            
-            # Configure render for thumbnail
-            context.scene.render.filepath = str(preview_file)
-            context.scene.render.image_settings.file_format = 'PNG'
-            context.scene.render.resolution_x = 256
-            context.scene.render.resolution_y = 256
-            context.scene.render.resolution_percentage = 100
-            
-            # Render viewport preview
-            bpy.ops.render.opengl(write_still=True, view_context=True)
-            
-            # Restore render settings
-            context.scene.render.filepath = old_path
-            context.scene.render.image_settings.file_format = old_format
-            context.scene.render.resolution_x = old_res_x
-            context.scene.render.resolution_y = old_res_y
-            context.scene.render.resolution_percentage = old_percentage
-            
-            # Store the preview path in the pose
-            pose.preview_path = str(preview_file)
-            
-            # Load the image into Blender's data so it's available for display
-            # This must be done here, not during drawing
-            try:
-                # Check if image already exists and remove it
-                img_name = f"pose_preview_{safe_name}"
-                if img_name in bpy.data.images:
-                    old_img = bpy.data.images[img_name]
-                    bpy.data.images.remove(old_img)
-                
-                # Load the new image
-                img = bpy.data.images.load(str(preview_file))
-                img.name = img_name
-                # Generate preview for UI display
-                img.preview_ensure()
-            except Exception as e:
-                print(f"Warning: Could not load preview into Blender: {e}")
-            
-        except Exception as e:
-            print(f"Warning: Could not capture pose preview: {e}")
-    
-    def get_puppet_objects(self, context, puppet_id):
-        """Get all objects that belong to a puppet"""
-        objects = []
-        
-        # Find puppet item
-        puppet_item = None
-        if hasattr(context.scene, 'outliner_items'):
-            for item in context.scene.outliner_items:
-                if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                    puppet_item = item
-                    break
-        
-        if not puppet_item or not hasattr(puppet_item, 'puppet_memberships'):
-            print(f"Debug: No puppet found or no memberships for puppet {puppet_id}")
-            return objects
-        
-        if not puppet_item.puppet_memberships:
-            print(f"Debug: Empty memberships for puppet {puppet_id}")
-            return objects
-        
-        # Parse member IDs and find corresponding objects
-        member_ids = puppet_item.puppet_memberships.split(',')
-        print(f"Debug: Group '{puppet_item.name}' has members: {member_ids}")
-        
-        # Import scene manager to access molecules
-        from ..utils.scene_manager import ProteinBlenderScene
-        scene_manager = ProteinBlenderScene.get_instance()
-        
-        for member_id in member_ids:
-            # Member IDs are in format: molecule_id_domain_id
-            # where molecule_id might contain underscores (e.g., '3b75_001')
-            # and domain_id is like 'chain_8' or a custom domain ID
-            
-            if '_' in member_id:
-                # Try to intelligently parse the member_id
-                # Look for patterns like 'XXX_###_chain_Y' or 'XXX_###_domain_id'
-                
-                # First, check if it contains '_chain_'
-                if '_chain_' in member_id:
-                    # Split at '_chain_' to separate molecule_id from chain identifier
-                    parts = member_id.rsplit('_chain_', 1)
-                    mol_id = parts[0]
-                    domain_id = 'chain_' + parts[1]
-                else:
-                    # For custom domains, we need to find where molecule_id ends
-                    # Molecule IDs typically follow pattern like '3b75_001'
-                    # Try to find the last occurrence of a pattern like '_###_' (underscore, numbers, underscore)
-                    import re
-                    match = re.match(r'^(.+?_\d+)_(.+)$', member_id)
-                    if match:
-                        mol_id = match.group(1)
-                        domain_id = match.group(2)
-                    else:
-                        # Fallback to splitting on last underscore
-                        parts = member_id.rsplit('_', 1)
-                        if len(parts) == 2:
-                            mol_id = parts[0]
-                            domain_id = parts[1]
-                        else:
-                            print(f"Debug: Could not parse member_id '{member_id}'")
-                            continue
-                
-                print(f"Debug: Looking for mol_id='{mol_id}', domain_id='{domain_id}'")
-                
-                # Try to find the domain object (chains are domains too)
-                if mol_id in scene_manager.molecules:
-                    molecule = scene_manager.molecules[mol_id]
-                    
-                    # First try direct lookup
-                    if domain_id in molecule.domains:
-                        domain = molecule.domains[domain_id]
-                        if domain.object:
-                            objects.append(domain.object)
-                            print(f"Debug: Found domain object '{domain.object.name}' for {member_id}")
-                        else:
-                            print(f"Debug: Domain {domain_id} has no object")
-                    else:
-                        # If domain_id is like 'chain_4', try to find the matching domain
-                        if domain_id.startswith('chain_'):
-                            chain_index = domain_id.replace('chain_', '')
-                            print(f"Debug: Looking for chain index {chain_index}")
-                            
-                            # Find domain that starts with mol_id_chainindex_
-                            found_domain = None
-                            for dom_id, dom in molecule.domains.items():
-                                # Check if domain ID starts with pattern like '3b75_001_4_'
-                                if dom_id.startswith(f"{mol_id}_{chain_index}_"):
-                                    found_domain = dom
-                                    print(f"Debug: Matched chain_{chain_index} to domain {dom_id}")
-                                    break
-                            
-                            if found_domain and found_domain.object:
-                                objects.append(found_domain.object)
-                                print(f"Debug: Found chain object '{found_domain.object.name}' for {member_id}")
-                            else:
-                                print(f"Debug: Could not find domain for chain_{chain_index}")
-                                print(f"Debug: Available domains: {list(molecule.domains.keys())}")
-                        else:
-                            print(f"Debug: Domain {domain_id} not found in molecule {mol_id}")
-                            print(f"Debug: Available domains: {list(molecule.domains.keys())}")
-                else:
-                    print(f"Debug: Molecule {mol_id} not found")
-            
-            # Always check outliner items as fallback
-            # (some items might store objects directly)
-            for item in context.scene.outliner_items:
-                if item.item_id == member_id:
-                    if item.object_name:
-                        obj = bpy.data.objects.get(item.object_name)
-                        if obj and obj not in objects:
-                            objects.append(obj)
-                            print(f"Debug: Found object via outliner '{obj.name}' for {member_id}")
-                    else:
-                        print(f"Debug: Outliner item {member_id} has no object_name")
-                    break
-        
-        print(f"Debug: Total objects found for puppet: {len(objects)}")
-        return objects
-    
+
 
 class PROTEINBLENDER_OT_apply_pose(Operator):
     """Apply a saved pose to restore puppet positions"""
@@ -428,80 +163,7 @@ class PROTEINBLENDER_OT_apply_pose(Operator):
             return {'CANCELLED'}
 
         pose = scene.pose_library[self.pose_index]
-        applied_count = 0
-        not_found = []
-
-        print(f"\nDebug: Applying pose '{pose.name}'")
-        print(f"Debug: Pose has {len(pose.transforms)} transforms")
-
-        # Group transforms by puppet to find their controllers
-        puppets = {}
-        for transform in pose.transforms:
-            if transform.puppet_id not in puppets:
-                puppets[transform.puppet_id] = {'controller': None, 'transforms': []}
-            puppets[transform.puppet_id]['transforms'].append(transform)
-
-        # Find controller for each puppet
-        for puppet_id in puppets:
-            for item in scene.outliner_items:
-                if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                    if item.controller_object_name:
-                        controller_obj = bpy.data.objects.get(item.controller_object_name)
-                        if controller_obj:
-                            puppets[puppet_id]['controller'] = controller_obj
-                            print(f"Debug: Found controller '{controller_obj.name}' for puppet {puppet_id}")
-                    break
-
-        # Apply transforms
-        for puppet_id, puppet_data in puppets.items():
-            controller_obj = puppet_data['controller']
-
-            for transform in puppet_data['transforms']:
-                print(f"Debug: Looking for object '{transform.object_name}'")
-                obj = bpy.data.objects.get(transform.object_name)
-                if obj:
-                    print(f"Debug: Found object '{obj.name}'")
-
-                    if controller_obj:
-                        # Apply transforms RELATIVE to the puppet controller
-                        from mathutils import Matrix, Vector, Euler
-
-                        # Build the relative transformation matrix
-                        relative_matrix = Matrix()
-                        relative_matrix = Matrix.Translation(Vector(transform.location))
-                        relative_matrix @= Euler(transform.rotation_euler).to_matrix().to_4x4()
-
-                        # Apply scale
-                        scale_matrix = Matrix()
-                        for i in range(3):
-                            scale_matrix[i][i] = transform.scale[i]
-                        relative_matrix @= scale_matrix
-
-                        # Apply relative to controller's current world position
-                        world_matrix = controller_obj.matrix_world @ relative_matrix
-                        obj.matrix_world = world_matrix
-
-                        print(f"  Applied RELATIVE transform:")
-                        print(f"    Controller at: {list(controller_obj.location)}")
-                        print(f"    Relative location: {list(transform.location)}")
-                        print(f"    Result world location: {list(obj.location)}")
-                    else:
-                        # Fallback to absolute positioning if no controller
-                        print(f"  WARNING: No controller found, applying absolute transform")
-                        obj.location = transform.location
-                        obj.rotation_euler = transform.rotation_euler
-                        obj.scale = transform.scale
-                        print(f"  Applied absolute transform - new location: {list(obj.location)}")
-
-                    # Apply color if available
-                    if transform.has_color:
-                        from ..panels.visual_setup_panel import apply_color_to_object
-                        apply_color_to_object(obj, transform.color)
-
-                    applied_count += 1
-                else:
-                    print(f"Debug: Object '{transform.object_name}' NOT FOUND")
-                    not_found.append(transform.object_name)
+        applied_count, not_found = PoseManager.apply_puppet_transforms(context, pose)
 
         if not_found:
             print(f"Debug: Could not find objects: {not_found}")
@@ -533,249 +195,18 @@ class PROTEINBLENDER_OT_capture_pose(Operator):
         
         pose = scene.pose_library[self.pose_index]
         
-        # Clear existing transforms
-        pose.transforms.clear()
-        
         # Re-capture transforms for each puppet
         puppet_ids = pose.puppet_ids.split(',') if pose.puppet_ids else []
-
-        for puppet_id in puppet_ids:
-            # Get the puppet controller Empty object
-            controller_obj = None
-            for item in context.scene.outliner_items:
-                if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                    if item.controller_object_name:
-                        controller_obj = bpy.data.objects.get(item.controller_object_name)
-                    break
-
-            # Get objects in this puppet
-            objects = self.get_puppet_objects(context, puppet_id)
-
-            for obj in objects:
-                transform = pose.transforms.add()
-                transform.puppet_id = puppet_id
-                transform.object_name = obj.name
-
-                # Store transforms RELATIVE to the puppet controller
-                if controller_obj:
-                    from mathutils import Matrix
-
-                    # Get the inverse of the controller's world matrix
-                    controller_matrix_inv = controller_obj.matrix_world.inverted()
-
-                    # Get object's transform relative to controller
-                    relative_matrix = controller_matrix_inv @ obj.matrix_world
-
-                    # Extract location, rotation, scale from the relative matrix
-                    transform.location = relative_matrix.to_translation()
-                    transform.rotation_euler = relative_matrix.to_euler()
-                    transform.scale = relative_matrix.to_scale()
-                else:
-                    # Fallback to absolute positions if no controller found
-                    transform.location = obj.location.copy()
-                    transform.rotation_euler = obj.rotation_euler.copy()
-                    transform.scale = obj.scale.copy()
-
-                # Capture color if available
-                from ..panels.visual_setup_panel import get_object_color
-                color = get_object_color(obj)
-                if color:
-                    transform.color = color
-                    transform.has_color = True
-                else:
-                    transform.has_color = False
+        PoseManager.capture_puppet_transforms(context, pose, puppet_ids)
         
         # Update timestamp
         pose.modified_timestamp = datetime.now().isoformat()
         
-        # Update screenshot preview
-        self.capture_pose_preview(context, pose)
+        # Update screenshot preview, drawn later unless cached
+        PoseThumbnails.request(scene, pose)
         
         self.report({'INFO'}, f"Captured current positions for pose '{pose.name}'")
         return {'FINISHED'}
-    
-    def capture_pose_preview(self, context, pose):
-        """Capture a preview image for the pose"""
-        try:
-            import os
-            import tempfile
-            from pathlib import Path
-            
-            # Create temp directory for pose previews if it doesn't exist
-            temp_dir = Path(tempfile.gettempdir()) / "proteinblender_poses"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Generate filename based on pose name and timestamp
-            import time
-            timestamp = str(int(time.time()))
-            safe_name = "".join(c if c.isalnum() or c in "_-" else "_" for c in pose.name)
-            preview_file = temp_dir / f"pose_{safe_name}_{timestamp}.png"
-            
-            # Store current render settings
-            old_path = context.scene.render.filepath
-            old_format = context.scene.render.image_settings.file_format
-            old_res_x = context.scene.render.resolution_x
-            old_res_y = context.scene.render.resolution_y
-            old_percentage = context.scene.render.resolution_percentage
-            
-            # Configure render for thumbnail
-            context.scene.render.filepath = str(preview_file)
-            context.scene.render.image_settings.file_format = 'PNG'
-            context.scene.render.resolution_x = 256
-            context.scene.render.resolution_y = 256
-            context.scene.render.resolution_percentage = 100
-            
-            # Render viewport preview
-            bpy.ops.render.opengl(write_still=True, view_context=True)
-            
-            # Restore render settings
-            context.scene.render.filepath = old_path
-            context.scene.render.image_settings.file_format = old_format
-            context.scene.render.resolution_x = old_res_x
-            context.scene.render.resolution_y = old_res_y
-            context.scene.render.resolution_percentage = old_percentage
-            
-            # Store the preview path in the pose
-            pose.preview_path = str(preview_file)
-            
-            # Load the image into Blender's data so it's available for display
-            # This must be done here, not during drawing
-            try:
-                # Check if image already exists and remove it
-                img_name = f"pose_preview_{safe_name}"
-                if img_name in bpy.data.images:
-                    old_img = bpy.data.images[img_name]
-                    bpy.data.images.remove(old_img)
-                
-                # Load the new image
-                img = bpy.data.images.load(str(preview_file))
-                img.name = img_name
-                # Generate preview for UI display
-                img.preview_ensure()
-            except Exception as e:
-                print(f"Warning: Could not load preview into Blender: {e}")
-            
-        except Exception as e:
-            print(f"Warning: Could not capture pose preview: {e}")
-    
-    def get_puppet_objects(self, context, puppet_id):
-        """Get all objects that belong to a puppet"""
-        objects = []
-        
-        # Find puppet item
-        puppet_item = None
-        if hasattr(context.scene, 'outliner_items'):
-            for item in context.scene.outliner_items:
-                if item.item_id == puppet_id and item.item_type == 'PUPPET':
-                    puppet_item = item
-                    break
-        
-        if not puppet_item or not hasattr(puppet_item, 'puppet_memberships'):
-            print(f"Debug: No puppet found or no memberships for puppet {puppet_id}")
-            return objects
-        
-        if not puppet_item.puppet_memberships:
-            print(f"Debug: Empty memberships for puppet {puppet_id}")
-            return objects
-        
-        # Parse member IDs and find corresponding objects
-        member_ids = puppet_item.puppet_memberships.split(',')
-        print(f"Debug: Group '{puppet_item.name}' has members: {member_ids}")
-        
-        # Import scene manager to access molecules
-        from ..utils.scene_manager import ProteinBlenderScene
-        scene_manager = ProteinBlenderScene.get_instance()
-        
-        for member_id in member_ids:
-            # Member IDs are in format: molecule_id_domain_id
-            # where molecule_id might contain underscores (e.g., '3b75_001')
-            # and domain_id is like 'chain_8' or a custom domain ID
-            
-            if '_' in member_id:
-                # Try to intelligently parse the member_id
-                # Look for patterns like 'XXX_###_chain_Y' or 'XXX_###_domain_id'
-                
-                # First, check if it contains '_chain_'
-                if '_chain_' in member_id:
-                    # Split at '_chain_' to separate molecule_id from chain identifier
-                    parts = member_id.rsplit('_chain_', 1)
-                    mol_id = parts[0]
-                    domain_id = 'chain_' + parts[1]
-                else:
-                    # For custom domains, we need to find where molecule_id ends
-                    # Molecule IDs typically follow pattern like '3b75_001'
-                    # Try to find the last occurrence of a pattern like '_###_' (underscore, numbers, underscore)
-                    import re
-                    match = re.match(r'^(.+?_\d+)_(.+)$', member_id)
-                    if match:
-                        mol_id = match.group(1)
-                        domain_id = match.group(2)
-                    else:
-                        # Fallback to splitting on last underscore
-                        parts = member_id.rsplit('_', 1)
-                        if len(parts) == 2:
-                            mol_id = parts[0]
-                            domain_id = parts[1]
-                        else:
-                            print(f"Debug: Could not parse member_id '{member_id}'")
-                            continue
-                
-                print(f"Debug: Looking for mol_id='{mol_id}', domain_id='{domain_id}'")
-                
-                # Try to find the domain object (chains are domains too)
-                if mol_id in scene_manager.molecules:
-                    molecule = scene_manager.molecules[mol_id]
-                    
-                    # First try direct lookup
-                    if domain_id in molecule.domains:
-                        domain = molecule.domains[domain_id]
-                        if domain.object:
-                            objects.append(domain.object)
-                            print(f"Debug: Found domain object '{domain.object.name}' for {member_id}")
-                        else:
-                            print(f"Debug: Domain {domain_id} has no object")
-                    else:
-                        # If domain_id is like 'chain_4', try to find the matching domain
-                        if domain_id.startswith('chain_'):
-                            chain_index = domain_id.replace('chain_', '')
-                            print(f"Debug: Looking for chain index {chain_index}")
-                            
-                            # Find domain that starts with mol_id_chainindex_
-                            found_domain = None
-                            for dom_id, dom in molecule.domains.items():
-                                # Check if domain ID starts with pattern like '3b75_001_4_'
-                                if dom_id.startswith(f"{mol_id}_{chain_index}_"):
-                                    found_domain = dom
-                                    print(f"Debug: Matched chain_{chain_index} to domain {dom_id}")
-                                    break
-                            
-                            if found_domain and found_domain.object:
-                                objects.append(found_domain.object)
-                                print(f"Debug: Found chain object '{found_domain.object.name}' for {member_id}")
-                            else:
-                                print(f"Debug: Could not find domain for chain_{chain_index}")
-                                print(f"Debug: Available domains: {list(molecule.domains.keys())}")
-                        else:
-                            print(f"Debug: Domain {domain_id} not found in molecule {mol_id}")
-                            print(f"Debug: Available domains: {list(molecule.domains.keys())}")
-                else:
-                    print(f"Debug: Molecule {mol_id} not found")
-            
-            # Always check outliner items as fallback
-            # (some items might store objects directly)
-            for item in context.scene.outliner_items:
-                if item.item_id == member_id:
-                    if item.object_name:
-                        obj = bpy.data.objects.get(item.object_name)
-                        if obj and obj not in objects:
-                            objects.append(obj)
-                            print(f"Debug: Found object via outliner '{obj.name}' for {member_id}")
-                    else:
-                        print(f"Debug: Outliner item {member_id} has no object_name")
-                    break
-        
-        print(f"Debug: Total objects found for puppet: {len(objects)}")
-        return objects
 
 
 class PROTEINBLENDER_OT_delete_pose(Operator):
@@ -816,6 +247,102 @@ class PROTEINBLENDER_OT_delete_pose(Operator):
         return {'FINISHED'}
 
 
+# Keep enum item strings alive, Blender does not hold references to them
+_pose_enum_items = []
+
+
+def _pose_items(self, context):
+    """Enum items for the poses in the scene pose library"""
+    global _pose_enum_items
+    library = getattr(context.scene, 'pose_library', [])
+    _pose_enum_items = [(str(idx), pose.name, "") for idx, pose in enumerate(library)]
+    return _pose_enum_items or [('NONE', "No Poses", "")]
+
+
+class PROTEINBLENDER_OT_interpolate_poses(Operator):
+    """Keyframe a morph between poses with interpolated in-between conformations"""
+    bl_idname = "proteinblender.interpolate_poses"
+    bl_label = "Morph Between Poses"
+    bl_description = "Bake keyframes that morph puppets smoothly from one pose to another"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    from_pose: EnumProperty(name="From", description="Pose at the start frame", items=_pose_items)
+    to_pose: EnumProperty(name="To", description="Pose at the end frame", items=_pose_items)
+    use_intermediate_poses: BoolProperty(
+        name="Through Poses In Between",
+        description="Also pass through the poses listed between From and To in the library",
+        default=False
+    )
+    start_frame: IntProperty(name="Start Frame", default=1)
+    end_frame: IntProperty(name="End Frame", default=100)
+    inbetweens: IntProperty(
+        name="In-betweens",
+        description="Number of interpolated keyframes between two poses",
+        default=10,
+        min=0,
+        soft_max=300
+    )
+    easing: EnumProperty(name="Easing", items=EASING_ITEMS, default='EASE_IN_OUT')
+    location_mode: EnumProperty(name="Location", items=LOCATION_ITEMS, default='LINEAR')
+    
+    @classmethod
+    def poll(cls, context):
+        return len(getattr(context.scene, 'pose_library', [])) >= 2
+    
+    def invoke(self, context, event):
+        scene = context.scene
+        active_idx = min(getattr(scene, 'active_pose_index', 0), len(scene.pose_library) - 1)
+        self.from_pose = str(active_idx)
+        self.to_pose = str((active_idx + 1) % len(scene.pose_library))
+        self.start_frame = scene.frame_current
+        self.end_frame = scene.frame_current + 100
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        scene = context.scene
+        
+        if not self.from_pose.isdigit() or not self.to_pose.isdigit():
+            self.report({'ERROR'}, "Select two poses")
+            return {'CANCELLED'}
+        
+        from_idx, to_idx = int(self.from_pose), int(self.to_pose)
+        if from_idx == to_idx:
+            self.report({'ERROR'}, "Select two different poses")
+            return {'CANCELLED'}
+        if self.end_frame <= self.start_frame:
+            self.report({'ERROR'}, "End frame must be after the start frame")
+            return {'CANCELLED'}
+        
+        if self.use_intermediate_poses:
+            step = 1 if to_idx > from_idx else -1
+            pose_indices = list(range(from_idx, to_idx + step, step))
+        else:
+            pose_indices = [from_idx, to_idx]
+        
+        # Resolve every pose to local matrices keyed by object name
+        resolved = []
+        for idx in pose_indices:
+            names, matrices = PoseManager.puppet_basis_matrices(context, scene.pose_library[idx])
+            resolved.append(dict(zip(names, matrices)))
+        
+        # Only objects stored in every pose can be interpolated
+        object_names = [
+            name for name in resolved[0]
+            if all(name in pose for pose in resolved[1:]) and name in bpy.data.objects
+        ]
+        if not object_names:
+            self.report({'WARNING'}, "The selected poses have no objects in common")
+            return {'CANCELLED'}
+        
+        poses = np.array([[pose[name] for name in object_names] for pose in resolved])
+        interpolator = PoseInterpolator(poses, easing=self.easing, location_mode=self.location_mode)
+        objects = [bpy.data.objects[name] for name in object_names]
+        written = interpolator.bake(objects, self.start_frame, self.end_frame, self.inbetweens)
+        
+        self.report({'INFO'}, f"Baked {written} keyframes for {len(objects)} objects across {len(pose_indices)} poses")
+        return {'FINISHED'}
+
+
 # Placeholder operator to fix animation panel errors
 class PROTEINBLENDER_OT_placeholder(Operator):
     """Placeholder for future functionality"""
@@ -870,6 +397,9 @@ class PROTEINBLENDER_PT_pose_library(Panel):
             info_box.label(text="Click 'Create Pose' to save puppet positions")
             return
         
+        morph_row = main_box.row()
+        morph_row.operator("proteinblender.interpolate_poses", text="Morph Between Poses", icon='IPO_EASE_IN_OUT')
+        
         main_box.separator()
         
         # Grid layout for pose cards
@@ -910,31 +440,13 @@ class PROTEINBLENDER_PT_pose_library(Panel):
             # Try to display the preview image
             preview_shown = False
             
-            # Look for the image in Blender's loaded images
-            # The image should have been loaded when the pose was created
+            # Thumbnails are loaded under their file name once they are ready
             if pose.preview_path:
-                import os
-                # Normalize the preview path for comparison
-                preview_path_normalized = os.path.normpath(pose.preview_path)
-                
-                # Find image by comparing normalized paths
-                for img in bpy.data.images:
-                    # Skip images without filepath
-                    if not img.filepath:
-                        continue
-                    
-                    # Compare normalized paths
-                    img_path_normalized = os.path.normpath(img.filepath)
-                    
-                    if preview_path_normalized == img_path_normalized:
-                        # Found the image!
-                        if img.preview and img.preview.icon_id > 0:
-                            # Use template_icon for a single large preview
-                            # This method is designed specifically for displaying large icons
-                            screenshot_box.template_icon(icon_value=img.preview.icon_id, scale=5.0)
-                            
-                            preview_shown = True
-                            break
+                img = bpy.data.images.get(image_name(pose.preview_path))
+                if img and img.preview and img.preview.icon_id > 0:
+                    # Use template_icon for a single large preview
+                    screenshot_box.template_icon(icon_value=img.preview.icon_id, scale=5.0)
+                    preview_shown = True
             
             # If no preview shown, display placeholder with proper scaling
             if not preview_shown:
@@ -1013,6 +525,7 @@ CLASSES = [
     PROTEINBLENDER_OT_apply_pose,
     PROTEINBLENDER_OT_capture_pose,
     PROTEINBLENDER_OT_delete_pose,
+    PROTEINBLENDER_OT_interpolate_poses,
     PROTEINBLENDER_OT_placeholder,  # Added placeholder operator
     PROTEINBLENDER_PT_pose_library,
 ]
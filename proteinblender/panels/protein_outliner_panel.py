@@ -2,6 +2,7 @@ import bpy
 from bpy.types import Panel, UIList, Operator
 from bpy.props import StringProperty
 from ..utils.scene_manager import ProteinBlenderScene, build_outliner_hierarchy, update_outliner_visibility
+from ..core.puppet_registry import PuppetRegistry
 
 
 class PROTEINBLENDER_UL_outliner(UIList):
@@ -721,15 +722,15 @@ class PROTEINBLENDER_OT_toggle_visibility(Operator):
                 protein_chain_ids.append(item.item_id)
 
         # Now check all puppets to see if they contain any of these chains
+        protein_chain_ids = set(protein_chain_ids)
+        puppet_ids = {
+            puppet.puppet_id for puppet in PuppetRegistry.get_puppets(scene)
+            if any(member.member_id in protein_chain_ids for member in puppet.members)
+        }
         for puppet in scene.outliner_items:
             if puppet.item_type == 'PUPPET' and puppet.item_id != "puppets_separator":
-                # Get the puppet's member IDs
-                member_ids = puppet.puppet_memberships.split(',') if puppet.puppet_memberships else []
-
                 # Check if any of the puppet's members are chains from this protein
-                has_protein_chains = any(chain_id in member_ids for chain_id in protein_chain_ids)
-
-                if has_protein_chains:
+                if puppet.item_id in puppet_ids:
                     # Update puppet visibility to match the protein
                     puppet.is_visible = visibility
                     update_outliner_visibility(puppet.item_id, visibility)
@@ -753,8 +754,7 @@ class PROTEINBLENDER_OT_toggle_visibility(Operator):
         
         if parent_item and parent_item.item_type == 'PUPPET':
             # For groups, update members by their membership
-            member_ids = parent_item.puppet_memberships.split(',') if parent_item.puppet_memberships else []
-            for member_id in member_ids:
+            for member_id in PuppetRegistry.get_member_ids(scene, parent_id):
                 update_outliner_visibility(member_id, visibility)
                 # If it's a protein, also update its children
                 for item in scene.outliner_items:
@@ -5,6 +5,14 @@ from bpy.types import Panel, Operator
 from bpy.props import EnumProperty, FloatVectorProperty
 from ..utils.scene_manager import ProteinBlenderScene
 from ..utils.molecularnodes.style import STYLE_ITEMS
+from ..utils.node_templates import (
+    COLOR_INPUT,
+    get_modifier_input,
+    get_style_material,
+    set_domain_color,
+    set_style_material,
+    switch_domain_style,
+)
 
 
 class PROTEINBLENDER_OT_apply_color(Operator):
@@ -474,25 +482,8 @@ def apply_material_transparency_to_style_node(obj, alpha_value):
 
     node_tree = mod.node_group
 
-    # Find the Style node (could be Style Surface, Style Ribbon, etc.)
-    style_node = None
-    for node in node_tree.nodes:
-        if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
-            style_node = node
-            break
-
-    if not style_node:
-        print(f"Warning: No Style node found in {obj.name}")
-        return False
-
-    # Check if the Style node has a Material input
-    material_input = style_node.inputs.get("Material")
-    if not material_input:
-        print(f"Warning: Style node in {obj.name} has no Material input")
-        return False
-
-    # Check if we already have a material assigned
-    current_mat = material_input.default_value
+    # Domains share their node tree, their material is a modifier input
+    current_mat = get_style_material(obj, node_tree)
 
     # Check if material needs to be created or duplicated
     mat = None
@@ -500,7 +491,9 @@ def apply_material_transparency_to_style_node(obj, alpha_value):
     if not current_mat or "Alpha_" in current_mat.name:
         # No material or legacy material - create a new one
         mat = get_or_create_transparent_material(obj.name)
-        material_input.default_value = mat
+        if not set_style_material(obj, node_tree, mat):
+            print(f"Warning: No Style node with a Material input found in {obj.name}")
+            return False
     else:
         # We have a material - check if it's shared with other objects
         mat = current_mat
@@ -516,7 +509,7 @@ def apply_material_transparency_to_style_node(obj, alpha_value):
             mat.name = f"MN_Transparent_{obj.name}"
 
             # Assign the duplicated material
-            material_input.default_value = mat
+            set_style_material(obj, node_tree, mat)
             print(f"Created unique material '{mat.name}' for independent alpha control")
 
     # Now update the alpha value in the material's Principled BSDF node
@@ -588,6 +581,16 @@ def get_object_style(obj):
     return None
 
 
+def _style_material_alpha(obj, node_tree):
+    """Alpha of the style material of obj, 1.0 if there is none"""
+    mat = get_style_material(obj, node_tree)
+    if mat and mat.use_nodes and mat.node_tree:
+        for mat_node in mat.node_tree.nodes:
+            if mat_node.type == 'BSDF_PRINCIPLED':
+                return mat_node.inputs['Alpha'].default_value
+    return 1.0
+
+
 def get_object_color(obj):
     """Get the current color from an object's geometry nodes"""
     # Default color if nothing found
@@ -618,6 +621,12 @@ def get_object_color(obj):
     
     node_tree = mod.node_group
     
+    # Domains keep their color in a modifier input
+    modifier_color = get_modifier_input(obj, COLOR_INPUT)
+    if modifier_color is not None:
+        r, g, b = modifier_color[:3]
+        return (r, g, b, _style_material_alpha(obj, node_tree))
+    
     # Look for Custom Combine Color node first (this is what we create)
     for node in node_tree.nodes:
         if node.name == "Custom Combine Color" and node.type == 'COMBINE_COLOR':
@@ -627,24 +636,7 @@ def get_object_color(obj):
             b = node.inputs['Blue'].default_value
             
             # Get alpha from the Style node's material if possible
-            alpha = 1.0
-            style_node = None
-            for n in node_tree.nodes:
-                if n.type == 'GROUP' and n.node_tree and 'Style' in n.node_tree.name:
-                    style_node = n
-                    break
-            
-            if style_node:
-                material_input = style_node.inputs.get("Material")
-                if material_input and material_input.default_value:
-                    mat = material_input.default_value
-                    if mat.use_nodes and mat.node_tree:
-                        for mat_node in mat.node_tree.nodes:
-                            if mat_node.type == 'BSDF_PRINCIPLED':
-                                alpha = mat_node.inputs['Alpha'].default_value
-                                break
-            
-            return (r, g, b, alpha)
+            return (r, g, b, _style_material_alpha(obj, node_tree))
     
     # If no Custom Combine Color, look for Color Common node
     for node in node_tree.nodes:
@@ -669,6 +661,10 @@ def apply_color_to_object(obj, color):
     if len(color) >= 4:
         apply_material_transparency_to_style_node(obj, color[3])
 
+    # Domains take their color from a modifier input, so no node edits are needed
+    if set_domain_color(obj, color):
+        return
+
     # Find the geometry nodes modifier - could be MolecularNodes (for proteins) or DomainNodes (for domains)
     mod = None
     for modifier in obj.modifiers:
@@ -1016,6 +1012,7 @@ def apply_protein_style_direct(scene_manager, protein_item, style):
     for domain in molecule.domains.values():
         if domain.object:
             apply_style_to_object(domain.object, style)
+            domain.sync_node_group()
         # Update domain.style property
         domain.style = style
 
@@ -1057,6 +1054,7 @@ def apply_chain_style_direct(scene_manager, chain_item, style):
                 if domain_chain_str == chain_str or domain_chain_id == chain_id:
                     if domain.object:
                         apply_style_to_object(domain.object, style)
+                        domain.sync_node_group()
                     # Update domain.style property
                     domain.style = style
 
@@ -1074,12 +1072,30 @@ def apply_domain_style_direct(scene_manager, domain_item, style):
         for molecule_id, molecule in scene_manager.molecules.items():
             if domain_item.item_id in molecule.domains:
                 domain = molecule.domains[domain_item.item_id]
+                domain.sync_node_group()
                 domain.style = style
                 break
 
 
 def apply_style_to_object(obj, style):
     """Apply style to a molecular object through its geometry nodes"""
+    # Map our style names to MolecularNodes style node names
+    style_map = {
+        'spheres': 'Style Spheres',
+        'cartoon': 'Style Cartoon',
+        'surface': 'Style Surface',
+        'ribbon': 'Style Ribbon',
+        'sticks': 'Style Sticks',
+        'ball_and_stick': 'Style Ball and Stick'
+    }
+    target_style_name = style_map.get(style)
+
+    # Domains share one tree per style, so they move to another tree
+    # instead of swapping the style node of a tree other domains use
+    if target_style_name and switch_domain_style(obj, target_style_name):
+        obj.select_set(True)
+        return
+
     # Find the MolecularNodes modifier
     mod = None
     for modifier in obj.modifiers:
@@ -1115,17 +1131,6 @@ def apply_style_to_object(obj, style):
     # Swap to the desired style node
     from ..utils.molecularnodes.blender import nodes
     
-    # Map our style names to MolecularNodes style node names
-    style_map = {
-        'spheres': 'Style Spheres',
-        'cartoon': 'Style Cartoon',
-        'surface': 'Style Surface',
-        'ribbon': 'Style Ribbon',
-        'sticks': 'Style Sticks',
-        'ball_and_stick': 'Style Ball and Stick'
-    }
-    
-    target_style_name = style_map.get(style)
     if target_style_name:
         try:
             # Use the swap function from MolecularNodes
@@ -84,7 +84,8 @@ class DomainTransformData(PropertyGroup):
 
 class GroupTransformData(PropertyGroup):
     """Stores transform data for a group in a pose"""
-    group_id: StringProperty(name="Group ID", description="ID of the group and object")
+    group_id: StringProperty(name="Group ID", description="ID of the group")
+    object_name: StringProperty(name="Object Name", description="Name of the object")
     relative_location: FloatVectorProperty(name="Relative Location", size=3)
     relative_rotation: FloatVectorProperty(name="Relative Rotation", size=3, subtype='EULER')
     relative_scale: FloatVectorProperty(name="Relative Scale", size=3, default=(1, 1, 1))
@@ -16,6 +16,11 @@ class PuppetTransform(PropertyGroup):
     rotation_euler: FloatVectorProperty(name="Rotation", size=3, subtype='EULER')
     scale: FloatVectorProperty(name="Scale", size=3, default=(1, 1, 1))
     
+    # Packed row-major 4x4 matrix relative to the puppet controller, read and
+    # written for all objects at once with foreach_get/foreach_set.
+    # All zeros for poses saved before matrices were stored.
+    matrix: FloatVectorProperty(name="Matrix", size=16)
+    
     # Color data (RGBA)
     color: FloatVectorProperty(
         name="Color", 
@@ -6,6 +6,13 @@ from bpy.types import PropertyGroup
 # We no longer use row selection - only checkbox selection is allowed
 # This prevents confusion between row highlighting and actual selection state
 
+
+def _on_puppet_memberships_update(self, context):
+    """Drop the cached puppet index whenever a membership list is edited"""
+    from ..core.puppet_registry import PuppetRegistry
+    PuppetRegistry.invalidate()
+
+
 class ProteinOutlinerItem(PropertyGroup):
     """Unified item for protein outliner display"""
     item_type: EnumProperty(
@@ -102,7 +109,8 @@ class ProteinOutlinerItem(PropertyGroup):
     puppet_memberships: StringProperty(
         name="Puppet Memberships",
         description="Comma-separated list of puppet IDs this item belongs to",
-        default=""
+        default="",
+        update=_on_puppet_memberships_update
     )
     
     controller_object_name: StringProperty(
@@ -165,6 +173,13 @@ class ProteinProperties(bpy.types.PropertyGroup):
         default='pdb',
     )
 
+    instance_assembly: BoolProperty(
+        name="Instance Assembly",
+        description="Show the biological assembly by instancing the asymmetric unit, "
+                    "so every chain is stored once and edits apply to all of its copies",
+        default=False,
+    )
+
 def register():
     from bpy.utils import register_class
     
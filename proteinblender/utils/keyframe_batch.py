@@ -0,0 +1,312 @@
+"""Batched keyframe insertion for ProteinBlender animation.
+
+``keyframe_insert`` walks the RNA path, looks up the F-Curve and inserts a
+single key every time it is called, so keyframing many puppets means tens of
+thousands of round trips. ``KeyframeBatch`` instead collects keys per F-Curve
+and writes each curve once with ``keyframe_points.add`` and ``foreach_set``.
+The scene frame is never changed, so frame change handlers do not run.
+
+Example::
+
+    batch = KeyframeBatch()
+    for obj in objects:
+        batch.insert_transforms(obj, frames, values)  # values: (frames, 9)
+    batch.commit()
+"""
+
+import bpy
+import numpy as np
+
+# (property name, array length) for the transform channels of an object
+TRANSFORM_CHANNELS = (
+    ("location", 3),
+    ("rotation_euler", 3),
+    ("scale", 3),
+)
+
+# Action group Blender uses for object transform F-Curves
+TRANSFORM_GROUP = "Object Transforms"
+
+# Keys closer than this many frames are treated as the same key
+FRAME_TOLERANCE = 0.01
+
+
+def _ensure_action(id_data):
+    """Return the action of id_data, creating animation data if needed."""
+    anim_data = id_data.animation_data
+    if anim_data is None:
+        anim_data = id_data.animation_data_create()
+    if anim_data.action is None:
+        anim_data.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+    return anim_data.action
+
+
+def _find_fcurve(id_data, data_path, index):
+    """Return the F-Curve driving data_path[index] on id_data, or None."""
+    anim_data = id_data.animation_data
+    if anim_data is None or anim_data.action is None:
+        return None
+    return anim_data.action.fcurves.find(data_path, index=index)
+
+
+def _property_width(owner, prop_name):
+    """Number of F-Curve channels needed to animate owner.prop_name."""
+    return max(owner.bl_rna.properties[prop_name].array_length, 1)
+
+
+def _read_keyframes(fcurve):
+    """Return the keyframe coordinates of fcurve as an (n, 2) array."""
+    count = len(fcurve.keyframe_points)
+    co = np.empty(count * 2, dtype=np.float32)
+    fcurve.keyframe_points.foreach_get("co", co)
+    return co.reshape(count, 2)
+
+
+def _match_frames(existing, frames):
+    """Index into existing for every frame, or -1 where no key is close enough."""
+    match = np.full(len(frames), -1, dtype=np.int64)
+    if len(existing) == 0 or len(frames) == 0:
+        return match
+
+    order = np.argsort(existing, kind="stable")
+    sorted_frames = existing[order]
+    pos = np.searchsorted(sorted_frames, frames)
+    last = len(sorted_frames) - 1
+    for candidate in (np.clip(pos, 0, last), np.clip(pos - 1, 0, last)):
+        hit = (match < 0) & (np.abs(sorted_frames[candidate] - frames) < FRAME_TOLERANCE)
+        match[hit] = order[candidate[hit]]
+    return match
+
+
+def channel_values(owner, prop_name, frame=None):
+    """Return the values of owner.prop_name as a float array.
+
+    When frame is given, animated channels are evaluated from their F-Curves
+    at that frame, which gives the same result as ``scene.frame_set(frame)``
+    for the property without running any frame handlers.
+
+    Args:
+        owner: The ID or struct holding the property
+        prop_name: Name of the property
+        frame: Optional frame to evaluate animated channels at
+
+    Returns:
+        numpy array with one value per channel
+    """
+    value = getattr(owner, prop_name)
+    width = _property_width(owner, prop_name)
+    values = np.array(value if width > 1 else [value], dtype=np.float32).ravel()
+
+    if frame is None:
+        return values
+    return _evaluate_channels(owner.id_data, owner.path_from_id(prop_name), values, frame)
+
+
+def path_values(id_data, data_path, frame=None):
+    """Like ``channel_values`` for a full RNA path on id_data.
+
+    Works for properties without RNA definitions, such as geometry nodes
+    modifier inputs (``modifiers["GeometryNodes"]["Socket_2"]``).
+    """
+    value = id_data.path_resolve(data_path)
+    values = np.array(value if hasattr(value, "__len__") else [value], dtype=np.float32).ravel()
+
+    if frame is None:
+        return values
+    return _evaluate_channels(id_data, data_path, values, frame)
+
+
+def _evaluate_channels(id_data, data_path, values, frame):
+    """Replace the animated channels in values with their F-Curve value at frame."""
+    for index in range(len(values)):
+        fcurve = _find_fcurve(id_data, data_path, index)
+        if fcurve is not None and len(fcurve.keyframe_points) > 0:
+            values[index] = fcurve.evaluate(frame)
+    return values
+
+
+def transform_values(obj, frame=None, channels=TRANSFORM_CHANNELS):
+    """Return the transform channels of obj as one flat array.
+
+    Args:
+        obj: Blender object
+        frame: Optional frame to evaluate animated channels at
+        channels: (property name, size) pairs to read
+
+    Returns:
+        numpy array with the channels laid out in order
+    """
+    return np.concatenate([channel_values(obj, prop_name, frame) for prop_name, _ in channels])
+
+
+class KeyframeBatch:
+    """Collects keyframe insertions and removals and writes them per F-Curve.
+
+    Nothing is written until ``commit`` is called. Later insertions for the
+    same channel and frame replace earlier ones.
+    """
+
+    def __init__(self):
+        # (id pointer, data_path, index) -> [id_data, group, frame arrays, value arrays]
+        self._inserts = {}
+        # (id pointer, data_path, index) -> [id_data, frame arrays]
+        self._removals = {}
+
+    def __len__(self):
+        return sum(sum(len(f) for f in entry[2]) for entry in self._inserts.values())
+
+    def insert(self, id_data, data_path, index, frames, values, group=None):
+        """Queue keys for a single F-Curve channel.
+
+        Args:
+            id_data: The ID that owns the animation (object, node tree, ...)
+            data_path: RNA path of the property relative to id_data
+            index: Array index of the channel
+            frames: Frame number or array of frame numbers
+            values: Value or array of values, one per frame
+            group: Optional action group for a newly created F-Curve
+        """
+        frames = np.atleast_1d(np.asarray(frames, dtype=np.float32))
+        values = np.broadcast_to(np.asarray(values, dtype=np.float32), frames.shape)
+
+        key = (id_data.as_pointer(), data_path, index)
+        entry = self._inserts.get(key)
+        if entry is None:
+            entry = self._inserts[key] = [id_data, group, [], []]
+        entry[2].append(frames)
+        entry[3].append(values)
+
+    def remove(self, id_data, data_path, index, frames):
+        """Queue removal of the keys of one channel at the given frames."""
+        frames = np.atleast_1d(np.asarray(frames, dtype=np.float32))
+        key = (id_data.as_pointer(), data_path, index)
+        entry = self._removals.get(key)
+        if entry is None:
+            entry = self._removals[key] = [id_data, []]
+        entry[1].append(frames)
+
+    def insert_property(self, owner, prop_name, frames, values=None, group=None):
+        """Queue keys for every channel of owner.prop_name.
+
+        Args:
+            owner: The ID or struct holding the property (object, node socket, ...)
+            prop_name: Name of the property to keyframe
+            frames: Frame number or array of frame numbers
+            values: Optional array shaped (frames, channels); the current
+                property value is used for every frame when omitted
+            group: Optional action group for newly created F-Curves
+        """
+        frames = np.atleast_1d(np.asarray(frames, dtype=np.float32))
+        width = _property_width(owner, prop_name)
+        if values is None:
+            values = channel_values(owner, prop_name)
+        values = np.broadcast_to(np.asarray(values, dtype=np.float32), (len(frames), width))
+
+        id_data = owner.id_data
+        data_path = owner.path_from_id(prop_name)
+        for index in range(width):
+            self.insert(id_data, data_path, index, frames, values[:, index], group)
+
+    def remove_property(self, owner, prop_name, frames):
+        """Queue removal of the keys of every channel of owner.prop_name."""
+        id_data = owner.id_data
+        data_path = owner.path_from_id(prop_name)
+        for index in range(_property_width(owner, prop_name)):
+            self.remove(id_data, data_path, index, frames)
+
+    def insert_transforms(self, obj, frames, values=None, channels=TRANSFORM_CHANNELS):
+        """Queue transform keys for an object.
+
+        Args:
+            obj: Blender object
+            frames: Frame number or array of frame numbers
+            values: Optional array shaped (frames, total channel size), laid out
+                in the order of channels; current values are used when omitted
+            channels: (property name, size) pairs to keyframe
+        """
+        frames = np.atleast_1d(np.asarray(frames, dtype=np.float32))
+        width = sum(size for _, size in channels)
+        if values is None:
+            values = transform_values(obj, channels=channels)
+        values = np.broadcast_to(np.asarray(values, dtype=np.float32), (len(frames), width))
+
+        column = 0
+        for prop_name, size in channels:
+            self.insert_property(
+                obj, prop_name, frames, values[:, column:column + size], group=TRANSFORM_GROUP
+            )
+            column += size
+
+    def remove_transforms(self, obj, frames, channels=TRANSFORM_CHANNELS):
+        """Queue removal of transform keys for an object at the given frames."""
+        for prop_name, _ in channels:
+            self.remove_property(obj, prop_name, frames)
+
+    def commit(self):
+        """Write all queued removals and insertions.
+
+        Returns:
+            Number of keyframes written
+        """
+        touched = {}
+
+        for (pointer, data_path, index), (id_data, frame_arrays) in self._removals.items():
+            fcurve = _find_fcurve(id_data, data_path, index)
+            if fcurve is None:
+                continue
+            co = _read_keyframes(fcurve)
+            match = _match_frames(co[:, 0], np.concatenate(frame_arrays))
+            doomed = np.unique(match[match >= 0])
+            if len(doomed) == 0:
+                continue
+            points = fcurve.keyframe_points
+            for point_index in doomed[::-1]:
+                points.remove(points[int(point_index)], fast=True)
+            if len(points) == 0:
+                id_data.animation_data.action.fcurves.remove(fcurve)
+            else:
+                fcurve.update()
+            touched[pointer] = id_data
+
+        written = 0
+        for (pointer, data_path, index), (id_data, group, frame_arrays, value_arrays) in self._inserts.items():
+            frames = np.concatenate(frame_arrays)
+            values = np.concatenate(value_arrays)
+
+            # Keep only the last value queued for each frame
+            _, first = np.unique(frames[::-1], return_index=True)
+            keep = len(frames) - 1 - first
+            frames, values = frames[keep], values[keep]
+
+            action = _ensure_action(id_data)
+            fcurve = action.fcurves.find(data_path, index=index)
+            if fcurve is None:
+                fcurve = action.fcurves.new(data_path, index=index, action_group=group or "")
+
+            co = _read_keyframes(fcurve)
+            match = _match_frames(co[:, 0], frames)
+            existing = match >= 0
+            co[match[existing], 1] = values[existing]
+
+            added = ~existing
+            added_count = int(added.sum())
+            if added_count:
+                fcurve.keyframe_points.add(added_count)
+                co = np.concatenate([co, np.column_stack((frames[added], values[added]))])
+
+            fcurve.keyframe_points.foreach_set("co", co.ravel())
+            # Sorts the keys and recalculates the automatic handles
+            fcurve.update()
+            written += len(frames)
+            touched[pointer] = id_data
+
+        # Editing F-Curves directly does not tag the owners for re-evaluation
+        for id_data in touched.values():
+            try:
+                id_data.update_tag(refresh={'TIME'})
+            except (TypeError, ReferenceError):
+                pass
+
+        self._inserts.clear()
+        self._removals.clear()
+        return written
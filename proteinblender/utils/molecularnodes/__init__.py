@@ -1,5 +1,26 @@
-from .addon import register, unregister, _test_register
-from .entities import fetch, load_local
-from . import color, blender
+import importlib
 
 __all__ = ['register', 'unregister', '_test_register', 'fetch', 'load_local', 'color', 'blender']
+
+# Submodules such as `style`, `props` and `session` are imported on their own
+# while the addon registers, so the package itself must not pull in the
+# entities (biotite, MDAnalysis, pandas, ...) until they are actually used.
+_LAZY_ATTRIBUTES = {
+    'register': ('.addon', 'register'),
+    'unregister': ('.addon', 'unregister'),
+    '_test_register': ('.addon', '_test_register'),
+    'fetch': ('.entities', 'fetch'),
+    'load_local': ('.entities', 'load_local'),
+    'color': ('.color', None),
+    'blender': ('.blender', None),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
@@ -6,6 +6,27 @@ import numpy.typing as npt
 
 import math
 
+from . import tables
+
+# sRGB (D65) <-> CIE XYZ
+RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+XYZ_TO_RGB = np.array(
+    [
+        [3.2404542, -1.5371385, -0.4985314],
+        [-0.9692660, 1.8760108, 0.0415560],
+        [0.0556434, -0.2040259, 1.0572252],
+    ]
+)
+
+# color of atoms whose element is unknown or has no color in `iupac_colors_rgb`
+UNKNOWN_RGB = (242, 0, 26)
+
 
 def clamp(value, min_value, max_value):
     return max(min_value, min(value, max_value))
@@ -51,69 +72,140 @@ class Lab:
 
     @staticmethod
     def darken_color(c, amount):
-        tmp_darken_lab = Lab.from_color(c)
-        return Lab.to_color(Lab.darken(tmp_darken_lab, tmp_darken_lab, amount))
+        return darken_colors(c, amount)
 
     @staticmethod
     def lighten_color(c, amount):
-        return Lab.darken_color(c, -amount)
+        return lighten_colors(c, amount)
 
     @staticmethod
     def from_color(color):
-        r, g, b, a = color * 255
-        x, y, z = Lab.rgbToXyz(r, g, b)
-        lightness = 116 * y - 16
-        return Lab(lightness if lightness >= 0 else 0, 500 * (x - y), 200 * (y - z))
+        return Lab(*rgb_to_lab(color).tolist())
 
     @staticmethod
     def to_color(lab):
-        y = (lab.l + 16) / 116
-        x = y if math.isnan(lab.a) else y + lab.a / 500
-        z = y if math.isnan(lab.b) else y - lab.b / 200
-
-        y = Lab.Yn * Lab.lab_xyz(y)
-        x = Lab.Xn * Lab.lab_xyz(x)
-        z = Lab.Zn * Lab.lab_xyz(z)
-
-        r = Lab.xyz_rgb(3.2404542 * x - 1.5371385 * y - 0.4985314 * z)
-        g = Lab.xyz_rgb(-0.9692660 * x + 1.8760108 * y + 0.0415560 * z)
-        b = Lab.xyz_rgb(0.0556434 * x - 0.2040259 * y + 1.0572252 * z)
-
-        return [
-            round(clamp(r, 0, 255)) / 255.0,
-            round(clamp(g, 0, 255)) / 255.0,
-            round(clamp(b, 0, 255)) / 255.0,
-            1.0,
-        ]
+        return lab_to_rgb([lab.l, lab.a, lab.b]).tolist()
+
+
+def rgb_to_lab(colors: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """Convert RGB(A) colors in the 0-1 range to CIE Lab.
+
+    Parameters
+    ----------
+    colors : array_like
+        A color or an array of colors of shape (..., 3) or (..., 4). Alpha
+        is ignored.
+
+    Returns
+    -------
+    np.ndarray
+        Lab values of shape (..., 3).
+    """
+    rgb = np.asarray(colors, dtype=np.float64)[..., :3]
+    linear = np.where(
+        rgb <= 0.04045,
+        rgb / 12.92,
+        ((np.maximum(rgb, 0.04045) + 0.055) / 1.055) ** 2.4,
+    )
+    xyz = linear @ RGB_TO_XYZ.T / (Lab.Xn, Lab.Yn, Lab.Zn)
+    f = np.where(xyz > Lab.T3, np.cbrt(xyz), xyz / Lab.T2 + Lab.T0)
+
+    lab = np.empty_like(f)
+    lab[..., 0] = np.maximum(116 * f[..., 1] - 16, 0)
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def lab_to_rgb(lab: npt.ArrayLike, alpha: npt.ArrayLike = 1.0) -> npt.NDArray[np.float64]:
+    """Convert CIE Lab values to RGBA colors in the 0-1 range.
+
+    Channels are clipped and rounded to 8-bit values. NaN `a` or `b`
+    components are treated as 0.
+
+    Parameters
+    ----------
+    lab : array_like
+        Lab values of shape (..., 3).
+    alpha : array_like, optional
+        Alpha of the returned colors, broadcast against (...). Defaults to 1.
+
+    Returns
+    -------
+    np.ndarray
+        RGBA colors of shape (..., 4).
+    """
+    lab = np.asarray(lab, dtype=np.float64)
+    f = np.empty_like(lab)
+    f[..., 1] = (lab[..., 0] + 16) / 116
+    f[..., 0] = f[..., 1] + np.nan_to_num(lab[..., 1]) / 500
+    f[..., 2] = f[..., 1] - np.nan_to_num(lab[..., 2]) / 200
+
+    xyz = np.where(f > Lab.T1, f**3, Lab.T2 * (f - Lab.T0)) * (Lab.Xn, Lab.Yn, Lab.Zn)
+    linear = xyz @ XYZ_TO_RGB.T
+    rgb = 255 * np.where(
+        linear <= 0.00304,
+        12.92 * linear,
+        1.055 * np.maximum(linear, 0.00304) ** (1 / 2.4) - 0.055,
+    )
+
+    colors = np.empty(lab.shape[:-1] + (4,))
+    colors[..., :3] = np.round(np.clip(rgb, 0, 255)) / 255.0
+    colors[..., 3] = alpha
+    return colors
 
-    @staticmethod
-    def xyz_rgb(c):
-        return 255 * (
-            12.92 * c if c <= 0.00304 else 1.055 * math.pow(c, 1 / 2.4) - 0.055
-        )
 
-    @staticmethod
-    def lab_xyz(t):
-        return t * t * t if t > Lab.T1 else Lab.T2 * (t - Lab.T0)
-
-    @staticmethod
-    def rgb_xyz(c):
-        c /= 255
-        return c / 12.92 if c <= 0.04045 else math.pow((c + 0.055) / 1.055, 2.4)
-
-    @staticmethod
-    def xyz_lab(t):
-        return math.pow(t, 1 / 3) if t > Lab.T3 else t / Lab.T2 + Lab.T0
-
-    @staticmethod
-    def rgbToXyz(r, g, b):
-        r = Lab.rgb_xyz(r)
-        g = Lab.rgb_xyz(g)
-        b = Lab.rgb_xyz(b)
-        x = Lab.xyz_lab((0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / Lab.Xn)
-        y = Lab.xyz_lab((0.2126729 * r + 0.7151522 * g + 0.0721750 * b) / Lab.Yn)
-        z = Lab.xyz_lab((0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / Lab.Zn)
-        return [x, y, z]
+def darken_colors(colors: npt.ArrayLike, amount: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """Darken RGBA colors by lowering their Lab lightness.
+
+    Parameters
+    ----------
+    colors : array_like
+        A color or an array of colors of shape (..., 3) or (..., 4).
+    amount : array_like
+        How much to darken, in steps of 18 Lab lightness. A single value or
+        one per color. Negative values lighten.
+
+    Returns
+    -------
+    np.ndarray
+        RGBA colors of shape (..., 4), keeping the alpha of `colors`.
+    """
+    colors = np.asarray(colors, dtype=np.float64)
+    lab = rgb_to_lab(colors)
+    lab[..., 0] -= Lab.Kn * np.asarray(amount, dtype=np.float64)
+    alpha = colors[..., 3] if colors.shape[-1] == 4 else 1.0
+    return lab_to_rgb(lab, alpha=alpha)
+
+
+def lighten_colors(colors: npt.ArrayLike, amount: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """Lighten RGBA colors by raising their Lab lightness, see `darken_colors`."""
+    return darken_colors(colors, -np.asarray(amount, dtype=np.float64))
+
+
+def hls_to_rgb(h: npt.ArrayLike, lightness: float, saturation: float):
+    """Vectorized `colorsys.hls_to_rgb` over an array of hues.
+
+    Returns
+    -------
+    np.ndarray
+        RGB values of shape (len(h), 3).
+    """
+    h = np.asarray(h, dtype=np.float64)
+    if saturation == 0.0:
+        return np.repeat(np.full(h.shape, lightness)[..., np.newaxis], 3, axis=-1)
+    if lightness <= 0.5:
+        m2 = lightness * (1.0 + saturation)
+    else:
+        m2 = lightness + saturation - (lightness * saturation)
+    m1 = 2.0 * lightness - m2
+
+    hue = np.stack([h + 1.0 / 3.0, h, h - 1.0 / 3.0], axis=-1) % 1.0
+    return np.select(
+        [hue < 1.0 / 6.0, hue < 0.5, hue < 2.0 / 3.0],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2.0 / 3.0 - hue) * 6.0],
+        m1,
+    )
 
 
 def random_rgb(seed=None):
@@ -125,25 +217,21 @@ def random_rgb(seed=None):
 
 
 def plddt(b_factor: np.ndarray) -> npt.NDArray[np.float32]:
-    colors = np.zeros((len(b_factor), 4), float)
-
-    for i, value in enumerate(b_factor):
-        if value > 90:
-            color = np.array([0.000000, 0.086496, 0.672395, 1.000000])
-        elif value > 70:
-            color = np.array([0.130157, 0.597176, 0.896205, 1.000000])
-        elif value > 50:
-            color = np.array([1.000169, 0.708345, 0.006512, 1.000000])
-        else:
-            color = np.array([1.000169, 0.205070, 0.059507, 1.000000])
-        colors[i, :] = color
-
-    return colors
+    b_factor = np.asarray(b_factor)
+    palette = np.array(
+        [
+            [0.000000, 0.086496, 0.672395, 1.000000],
+            [0.130157, 0.597176, 0.896205, 1.000000],
+            [1.000169, 0.708345, 0.006512, 1.000000],
+            [1.000169, 0.205070, 0.059507, 1.000000],
+        ]
+    )
+    index = np.select([b_factor > 90, b_factor > 70, b_factor > 50], [0, 1, 2], 3)
+    return palette[index]
 
 
 def color_from_atomic_number(atomic_number: int):
-    r, g, b = list(iupac_colors_rgb.values())[int(atomic_number - 1)]
-    return np.array((r, g, b, 1))
+    return colors_from_elements(atomic_number)
 
 
 def color_from_element(element: str):
@@ -152,40 +240,47 @@ def color_from_element(element: str):
 
 
 def colors_from_elements(atomic_numbers):
-    colors = np.array(list(map(color_from_atomic_number, atomic_numbers)))
-    return colors
-
+    """RGBA colors (0-1) of atomic numbers, looked up in `ELEMENT_RGBA`.
 
-def equidistant_colors(some_list):
-    u = np.unique(some_list)
-    num_colors = len(u)
+    Unknown atomic numbers (e.g. -1) get `UNKNOWN_RGB`.
+    """
+    atomic_numbers = np.asarray(atomic_numbers, dtype=np.int64)
+    known = (atomic_numbers > 0) & (atomic_numbers < len(ELEMENT_RGBA))
+    return ELEMENT_RGBA[np.where(known, atomic_numbers, 0)]
 
-    hues = [i / (num_colors + 1) for i in range(num_colors)]
 
-    # Convert HSL to RGB
-    colors = [colorsys.hls_to_rgb(hue, 0.6, 0.6) for hue in hues]
+def _equidistant_rgba(num_colors: int) -> npt.NDArray[np.float64]:
+    # pastel colors with equally spaced hues, truncated to 8-bit values
+    hues = np.arange(num_colors) / (num_colors + 1)
+    colors = np.ones((num_colors, 4))
+    colors[:, :3] = np.floor(hls_to_rgb(hues, 0.6, 0.6) * 255) / 255
+    return colors
 
-    # Convert RGB to 8-bit integer values
-    colors = [(int(r * 255), int(g * 255), int(b * 255), 1) for (r, g, b) in colors]
 
-    return dict(zip(u, colors))
+def equidistant_colors(some_list):
+    u = np.unique(some_list)
+    colors = (_equidistant_rgba(len(u))[:, :3] * 255).round().astype(int)
+    return {key: (r, g, b, 1) for key, (r, g, b) in zip(u, colors.tolist())}
 
 
 def color_chains_equidistant(chain_ids):
-    color_dict = equidistant_colors(chain_ids)
-    chain_colors = np.array([color_dict[x] for x in chain_ids])
-    return chain_colors / 255
+    unique, inverse = np.unique(chain_ids, return_inverse=True)
+    return _equidistant_rgba(len(unique))[inverse.reshape(-1)]
 
 
 def color_chains(atomic_numbers, chain_ids):
-    mask = atomic_numbers == 6
-    colors = colors_from_elements(atomic_numbers)
-    chain_color_dict = equidistant_colors(chain_ids)
-    chain_colors = np.array(list(map(lambda x: chain_color_dict.get(x), chain_ids)))
-
-    colors[mask] = chain_colors[mask]
+    """Color carbons by chain and all other atoms by element.
 
-    return colors / 255
+    Returns
+    -------
+    np.ndarray
+        RGBA colors (0-1) of shape (n_atoms, 4).
+    """
+    colors = colors_from_elements(atomic_numbers)
+    unique, inverse = np.unique(chain_ids, return_inverse=True)
+    carbon = np.asarray(atomic_numbers) == 6
+    colors[carbon] = _equidistant_rgba(len(unique))[inverse.reshape(-1)[carbon]]
+    return colors
 
 
 iupac_colors_rgb = {
@@ -206,8 +301,8 @@ iupac_colors_rgb = {
     "P": (255, 128, 0),  # Phosphorus
     "S": (255, 255, 48),  # Sulfur
     "Cl": (31, 240, 31),  # Chlorine
-    "K": (143, 64, 212),  # Potassium
     "Ar": (128, 209, 227),  # Argon
+    "K": (143, 64, 212),  # Potassium
     "Ca": (61, 255, 0),  # Calcium
     "Sc": (230, 230, 230),  # Scandium
     "Ti": (191, 194, 199),  # Titanium
@@ -215,8 +310,8 @@ iupac_colors_rgb = {
     "Cr": (138, 153, 199),  # Chromium
     "Mn": (156, 122, 199),  # Manganese
     "Fe": (224, 102, 51),  # Iron
-    "Ni": (199, 138, 138),  # Nickel
     "Co": (255, 217, 143),  # Cobalt
+    "Ni": (199, 138, 138),  # Nickel
     "Cu": (200, 128, 51),  # Copper
     "Zn": (125, 128, 176),  # Zinc
     "Ga": (194, 143, 143),  # Gallium
@@ -302,3 +397,19 @@ iupac_colors_rgb = {
     "Ts": (242, 0, 26),  # Tennessine
     "Og": (242, 0, 26),  # Oganesson
 }
+
+
+def _element_table() -> npt.NDArray[np.float64]:
+    # RGBA (0-1) of every atomic number, row 0 and elements without a color
+    # are UNKNOWN_RGB
+    size = tables.load()["element_atomic_number"].max() + 1
+    table = np.ones((size, 4))
+    table[:, :3] = np.array(UNKNOWN_RGB) / 255
+    atomic_numbers = tables.atomic_number(list(iupac_colors_rgb))
+    known = atomic_numbers > 0
+    rgb = np.array(list(iupac_colors_rgb.values())) / 255
+    table[atomic_numbers[known], :3] = rgb[known]
+    return table
+
+
+ELEMENT_RGBA = _element_table()
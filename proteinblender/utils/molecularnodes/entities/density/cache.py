@@ -0,0 +1,192 @@
+"""Cache of maps converted to .vdb grids.
+
+Converted grids are stored in one cache directory together with a JSON
+manifest. Entries are keyed by the content of the source map and by every
+parameter that changes the grid (invert, center, world_scale, lod), so a
+map that changed on disk is converted again even when its name did not.
+The manifest also records the initial threshold, so checking and reusing
+a conversion only reads the manifest and never opens the .vdb file.
+
+Hashing a multi-GB map on every import would cost as much as converting
+it, so the content hash covers the size, the header and the first and
+last MiB of data, and is remembered per path, size and mtime in the
+manifest. The size and mtime are part of the key as well, so an edit
+inside the map that the partial hash misses still invalidates the entry.
+
+Once the cached grids exceed ``max_bytes`` the least recently used ones
+are deleted.
+
+Example::
+
+    cache = VDBCache()
+    entry = cache.lookup("emd_1234.map", invert=False, center=False)
+    if entry is None:
+        path = cache.new_path("emd_1234.map", invert=False, center=False)
+        ...  # write the grid to path
+        entry = cache.add("emd_1234.map", path, threshold, invert=False, center=False)
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from ...download import CACHE_DIR
+
+DEFAULT_CACHE_DIR = str(Path(CACHE_DIR) / "densities")
+
+# Total size of the cached grids before the least recently used are deleted
+MAX_CACHE_BYTES = 8 * 2**30
+
+# Bytes hashed from each end of a map to identify its content
+HASH_BYTES = 2**20
+
+MANIFEST_NAME = "manifest.json"
+
+
+def content_hash(file_path) -> str:
+    """Hash the size, start and end of a file."""
+    digest = hashlib.sha1()
+    size = os.path.getsize(file_path)
+    digest.update(str(size).encode())
+    with open(file_path, "rb") as file:
+        digest.update(file.read(HASH_BYTES))
+        if size > 2 * HASH_BYTES:
+            file.seek(size - HASH_BYTES)
+            digest.update(file.read(HASH_BYTES))
+    return digest.hexdigest()
+
+
+class VDBCache:
+    """A directory of converted grids, indexed by a manifest.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where grids and the manifest are stored. Defaults to
+        ``<MolecularNodesCache>/densities``.
+    max_bytes : int, optional
+        Size of the cache above which the least recently used grids are deleted.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = Path(directory or DEFAULT_CACHE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault("entries", {})
+        manifest.setdefault("sources", {})
+        return manifest
+
+    def _write_manifest(self) -> None:
+        partial = self.manifest_path.with_suffix(".partial")
+        with open(partial, "w") as f:
+            json.dump(self._manifest, f, indent=1)
+        os.replace(partial, self.manifest_path)
+
+    def _source_record(self, source) -> dict:
+        """Size, mtime and content hash of a source map.
+
+        The hash is reused while the size and mtime match the manifest.
+        """
+        source = str(Path(source).resolve())
+        stat = os.stat(source)
+        record = self._manifest["sources"].get(source)
+        if (
+            record is not None
+            and record["size"] == stat.st_size
+            and record["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return record
+        record = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": content_hash(source),
+        }
+        self._manifest["sources"][source] = record
+        return record
+
+    def key(self, source, **params) -> str:
+        """Cache key of a source map converted with the given parameters."""
+        record = self._source_record(source)
+        text = json.dumps(
+            [record["hash"], record["size"], record["mtime_ns"], params],
+            sort_keys=True,
+        )
+        return hashlib.sha1(text.encode()).hexdigest()[:20]
+
+    def lookup(self, source, **params) -> dict | None:
+        """Return the manifest entry of a previous conversion, or None.
+
+        The entry has the grid's "path" and "threshold". Only the manifest
+        is read.
+        """
+        key = self.key(source, **params)
+        entry = self._manifest["entries"].get(key)
+        if entry is None or not (self.directory / entry["file"]).exists():
+            self._manifest["entries"].pop(key, None)
+            self._write_manifest()
+            return None
+        entry["last_used"] = time.time()
+        self._write_manifest()
+        return dict(entry, path=str(self.directory / entry["file"]))
+
+    def new_path(self, source, name: str | None = None, **params) -> str:
+        """Path a new conversion should be written to."""
+        name = name or Path(source).name.split(".")[0]
+        return str(self.directory / f"{name}_{self.key(source, **params)}.vdb")
+
+    def add(self, source, path, threshold: float, in_use=(), **params) -> dict:
+        """Record a conversion written to path and evict old ones if needed.
+
+        Grids whose paths are in `in_use`, e.g. those of the volumes in the open
+        .blend file, are never evicted.
+        """
+        key = self.key(source, **params)
+        self._manifest["entries"][key] = {
+            "file": Path(path).name,
+            "source": str(Path(source).resolve()),
+            "params": params,
+            "threshold": float(threshold),
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+        }
+        self._evict(keep={key}, in_use={str(Path(p).resolve()) for p in in_use})
+        self._write_manifest()
+        return dict(self._manifest["entries"][key], path=str(path))
+
+    def _evict(self, keep=(), in_use=()) -> None:
+        """Delete the least recently used grids until the cache fits max_bytes."""
+        entries = self._manifest["entries"]
+        total = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                return
+            path = str((self.directory / entries[key]["file"]).resolve())
+            if key in keep or path in in_use:
+                continue
+            entry = entries.pop(key)
+            total -= entry["size"]
+            try:
+                os.remove(self.directory / entry["file"])
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Delete all cached grids and the manifest."""
+        for entry in self._manifest["entries"].values():
+            try:
+                os.remove(self.directory / entry["file"])
+            except FileNotFoundError:
+                pass
+        self._manifest = {"entries": {}, "sources": {}}
+        self._write_manifest()
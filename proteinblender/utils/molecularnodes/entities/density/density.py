@@ -26,7 +26,9 @@ class Density(MolecularEntity, metaclass=ABCMeta):
         obj = bl.mesh.evaluate_using_mesh(self.object)
         return databpy.named_attribute(obj, name, evaluate=True)
 
-    def path_to_vdb(self, file: str, center: bool = False, invert: bool = False):
+    def path_to_vdb(
+        self, file: str, center: bool = False, invert: bool = False, lod: int = 0
+    ):
         """
         Convert a file path to a corresponding VDB file path.
 
@@ -34,6 +36,8 @@ class Density(MolecularEntity, metaclass=ABCMeta):
         ----------
         file : str
             The path of the original file.
+        lod : int, optional
+            Level of detail of the grid, added to the name when above 0.
 
         Returns
         -------
@@ -45,6 +49,7 @@ class Density(MolecularEntity, metaclass=ABCMeta):
         name = os.path.basename(file).split(".")[0]
         name += "_center" if center else ""
         name += "_invert" if invert else ""
+        name += f"_lod{lod}" if lod else ""
         file_name = name + ".vdb"
         file_path = os.path.join(folder_path, file_name)
         return file_path
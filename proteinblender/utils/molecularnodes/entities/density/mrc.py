@@ -1,11 +1,18 @@
+from .cache import VDBCache
 from .density import Density
 
-import mrcfile
 from ...blender import coll, nodes
 import databpy
 import bpy
 import numpy as np
 import os
+from pathlib import Path
+
+# Voxels converted at a time when copying a map into a grid
+SLAB_VOXELS = 2**25
+
+# Voxels read to estimate the initial threshold
+SAMPLE_VOXELS = 2**21
 
 
 class MRC(Density):
@@ -16,11 +23,25 @@ class MRC(Density):
     that can be written as `.vdb` files and the imported into Blender as volumetric objects.
     """
 
-    def __init__(self, file_path, center=False, invert=False, overwrite=False):
+    def __init__(
+        self,
+        file_path,
+        center=False,
+        invert=False,
+        overwrite=False,
+        lod: int = 0,
+        cache_dir: str | None = None,
+    ):
         super().__init__(file_path=file_path)
-        self.grid = self.map_to_grid(self.file_path, center=center)
+        # the grid is only built when there is no converted .vdb to reuse, and
+        # released once written
         self.file_vdb = self.map_to_vdb(
-            self.file_path, center=center, invert=invert, overwrite=overwrite
+            self.file_path,
+            center=center,
+            invert=invert,
+            overwrite=overwrite,
+            lod=lod,
+            cache_dir=cache_dir,
         )
 
     def create_object(
@@ -74,10 +95,16 @@ class MRC(Density):
         world_scale=0.01,
         center: bool = False,
         overwrite=False,
+        lod: int = 0,
+        cache_dir: str | None = None,
     ) -> (str, float):
         """
         Converts an MRC file to a .vdb file using pyopenvdb.
 
+        Converted files are kept in a VDBCache, keyed by the content of the map and the
+        conversion parameters. Reusing a conversion only reads the cache manifest, so the
+        .vdb file isn't opened until it is displayed.
+
         Parameters
         ----------
         file : str
@@ -91,6 +118,11 @@ class MRC(Density):
             Whether to center the volume on the origin. Defaults to False.
         overwrite : bool, optional
             If True, the .vdb file will be overwritten if it already exists. Defaults to False.
+        lod : int, optional
+            Level of detail, the number of times the resolution is halved. Defaults to 0.
+        cache_dir : str, optional
+            Directory of the conversion cache. Defaults to the densities folder of the
+            MolecularNodes cache.
 
         Returns
         -------
@@ -99,24 +131,23 @@ class MRC(Density):
         """
         import pyopenvdb as vdb
 
-        file_path = self.path_to_vdb(file, center=center, invert=invert)
-
-        # If the map has already been converted to a .vdb and overwrite is False, return that instead
-        if os.path.exists(file_path) and not overwrite:
-            # Also check that the file has the same invert and center settings
-            grid = vdb.readAllGridMetadata(file_path)[0]
-            if (
-                "MN_invert" in grid
-                and grid["MN_invert"] == invert
-                and "MN_center" in grid
-                and grid["MN_center"] == center
-            ):
-                self.threshold = grid["MN_initial_threshold"]
-                return file_path
+        cache = VDBCache(cache_dir)
+        params = dict(invert=invert, center=center, world_scale=world_scale, lod=lod)
+
+        # If the map has already been converted with these settings and overwrite is False,
+        # return that instead
+        if not overwrite:
+            entry = cache.lookup(file, **params)
+            if entry is not None:
+                self.threshold = entry["threshold"]
+                return entry["path"]
+
+        name = Path(self.path_to_vdb(file, center=center, invert=invert, lod=lod)).stem
+        file_path = cache.new_path(file, name=name, **params)
 
         print("Reading new file")
         # Read in the MRC file and convert it to a pyopenvdb grid
-        grid = self.map_to_grid(file=file, invert=invert, center=center)
+        grid = self.map_to_grid(file=file, invert=invert, center=center, lod=lod)
 
         grid.transform.scale(np.array((1, 1, 1)) * world_scale * grid["MN_voxel_size"])
 
@@ -126,25 +157,31 @@ class MRC(Density):
             print("transforming")
             grid.transform.translate(offset)
 
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-        # Write the grid to a .vdb file
+        # Write the grid to a .vdb file, replacing a previous conversion only once complete
         print("writing new file")
-        vdb.write(file_path, grids=[grid])
+        partial = f"{file_path}.partial"
+        vdb.write(partial, grids=[grid])
+        os.replace(partial, file_path)
         self.threshold = grid["MN_initial_threshold"]
         del grid
+        in_use = [bpy.path.abspath(volume.filepath) for volume in bpy.data.volumes]
+        cache.add(file, file_path, self.threshold, in_use=in_use, **params)
 
         # Return the path to the output file
         return file_path
 
-    def map_to_grid(self, file: str, invert: bool = False, center: bool = False):
+    def map_to_grid(
+        self, file: str, invert: bool = False, center: bool = False, lod: int = 0
+    ):
         """
         Reads an MRC file and converts it into a pyopenvdb FloatGrid object.
 
         This function reads a file in MRC format, and converts it into a pyopenvdb FloatGrid object,
         which can be used to represent volumetric data in Blender.
 
+        The map is memory-mapped rather than read, and copied into the grid a slab of
+        z-planes at a time, so only the grid itself and one slab are held in memory.
+
         Parameters
         ----------
         file : str
@@ -152,6 +189,9 @@ class MRC(Density):
         invert : bool, optional
             Whether to invert the data from the grid, defaulting to False. Some file types
             such as EM tomograms have inverted values, where a high value == low density.
+        lod : int, optional
+            Level of detail. Each level halves the resolution of the grid along every axis
+            by averaging blocks of voxels. Defaults to 0, the full resolution.
 
         Returns
         -------
@@ -159,39 +199,51 @@ class MRC(Density):
             A pyopenvdb FloatGrid object containing the density data.
         """
 
+        import mrcfile
         import pyopenvdb as vdb
 
-        volume = mrcfile.read(file)
-
-        dataType = volume.dtype
-
-        # enables different grid types
-
-        if dataType == "float32" or dataType == "float64":
-            grid = vdb.FloatGrid()
-        elif dataType == "int8" or dataType == "int16" or dataType == "int32":
-            volume = volume.astype("int32")
-            grid = vdb.Int32Grid()
-        elif dataType == "int64":
-            grid = vdb.Int64Grid()
-        else:
-            grid = vdb.FloatGrid()
-
-        if invert:
-            volume = np.max(volume) - volume
-
-        initial_threshold = np.quantile(volume, 0.995)
-
-        # The np.copy is needed to force numpy to actually rewrite the data in memory
-        # since openvdb seems to read is straight from memory without checking the striding
-        # The np.transpose is needed to convert the data from zyx to xyz
-        volume = np.copy(np.transpose(volume, (2, 1, 0)), order="C")
-        try:
-            grid.copyFromArray(volume.astype(float))
-        except Exception as e:
-            print(
-                f"Grid data type '{volume.dtype}' is an unsupported type.\nError: {e}"
-            )
+        # gzipped maps can't be memory-mapped and are decompressed into memory
+        opener = mrcfile.open if str(file).endswith(".gz") else mrcfile.mmap
+        with opener(file, mode="r", permissive=True) as mrc:
+            volume = mrc.data
+            voxel_size = float(mrc.voxel_size.x)
+
+            if lod > 0:
+                volume = _block_mean(volume, 2**lod)
+                voxel_size *= 2**lod
+
+            # enables different grid types
+            if lod == 0 and volume.dtype in (np.int8, np.int16, np.int32):
+                grid, grid_dtype = vdb.Int32Grid(), np.int32
+            elif lod == 0 and volume.dtype == np.int64:
+                grid, grid_dtype = vdb.Int64Grid(), np.int64
+            else:
+                grid, grid_dtype = vdb.FloatGrid(), np.float32
+
+            # invert in the grid's dtype, int8/int16 maps would overflow in their own
+            maximum = np.max(volume).astype(grid_dtype) if invert else None
+            initial_threshold = _sample_quantile(volume, 0.995)
+            if invert:
+                initial_threshold = maximum - _sample_quantile(volume, 0.005)
+
+            # openvdb reads the array straight from memory without checking the striding,
+            # so every slab is made contiguous, and transposed from zyx to xyz. Slabs of
+            # z-planes are contiguous in the file, so each part of the map is read once.
+            planes = max(1, SLAB_VOXELS // (volume.shape[1] * volume.shape[2]))
+            for start in range(0, volume.shape[0], planes):
+                slab = volume[start : start + planes]
+                slab = np.ascontiguousarray(slab.transpose(2, 1, 0), dtype=grid_dtype)
+                if invert:
+                    slab = maximum - slab
+                try:
+                    grid.copyFromArray(slab, ijk=(0, 0, start))
+                except Exception as e:
+                    print(
+                        f"Grid data type '{slab.dtype}' is an unsupported type.\nError: {e}"
+                    )
+                    break
+            box_size = tuple(int(n) for n in volume.shape[::-1])
+            del volume, slab
 
         grid.gridClass = vdb.GridClass.FOG_VOLUME
         grid.name = "density"
@@ -199,14 +251,42 @@ class MRC(Density):
         # Set some metadata for the vdb file, so we can check if it's already been converted
         # correctly
         grid["MN_invert"] = invert
-        grid["MN_initial_threshold"] = initial_threshold
+        grid["MN_initial_threshold"] = float(initial_threshold)
         grid["MN_center"] = center
-        with mrcfile.open(file) as mrc:
-            grid["MN_voxel_size"] = float(mrc.voxel_size.x)
-            grid["MN_box_size"] = (
-                int(mrc.header.nx),
-                int(mrc.header.ny),
-                int(mrc.header.nz),
-            )
+        grid["MN_lod"] = lod
+        grid["MN_voxel_size"] = voxel_size
+        grid["MN_box_size"] = box_size
 
         return grid
+
+
+def _sample_quantile(volume: np.ndarray, q: float) -> float:
+    """
+    Estimate a quantile of a map from a regular strided sample of its voxels.
+
+    The stride is chosen so that at most SAMPLE_VOXELS voxels are read, which for
+    a memory-mapped map only touches a fraction of the file.
+    """
+    stride = max(1, int(np.ceil((volume.size / SAMPLE_VOXELS) ** (1 / 3))))
+    sample = volume[::stride, ::stride, ::stride]
+    return float(np.quantile(sample, q))
+
+
+def _block_mean(volume: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Downsample a zyx map by averaging blocks of factor^3 voxels.
+
+    The map is reduced a slab of z-planes at a time, so a memory-mapped map is
+    never loaded whole. Voxels beyond the last complete block are dropped.
+    """
+    nz, ny, nx = (n // factor for n in volume.shape)
+    if min(nz, ny, nx) == 0:
+        raise ValueError(f"Map of shape {volume.shape} is too small for LOD {factor}")
+    result = np.empty((nz, ny, nx), dtype=np.float32)
+    step = max(1, SLAB_VOXELS // (volume.shape[1] * volume.shape[2] * factor))
+    for start in range(0, nz, step):
+        stop = min(start + step, nz)
+        slab = volume[start * factor : stop * factor, : ny * factor, : nx * factor]
+        blocks = slab.reshape(stop - start, factor, ny, factor, nx, factor)
+        result[start:stop] = blocks.mean(axis=(1, 3, 5), dtype=np.float32)
+    return result
@@ -1,5 +1,6 @@
 import bpy
 from pathlib import Path
+from .cache import DEFAULT_CACHE_DIR
 from .mrc import MRC
 
 bpy.types.Scene.MN_import_density_invert = bpy.props.BoolProperty(
@@ -12,6 +13,13 @@ bpy.types.Scene.MN_import_density_center = bpy.props.BoolProperty(
     description="Translate the density so that the center of the box is at the origin.",
     default=False,
 )
+bpy.types.Scene.MN_import_density_lod = bpy.props.IntProperty(
+    name="Level of Detail",
+    description="Halve the resolution of the map this many times. Each level needs 8x less memory.",
+    default=0,
+    min=0,
+    max=4,
+)
 bpy.types.Scene.MN_import_density = bpy.props.StringProperty(
     name="File",
     description="File path for the map file.",
@@ -47,9 +55,16 @@ def load(
     style: str = "density_surface",
     center: bool = False,
     overwrite: bool = False,
+    lod: int = 0,
+    cache_dir: str | None = None,
 ):
     density = MRC(
-        file_path=file_path, center=center, invert=invert, overwrite=overwrite
+        file_path=file_path,
+        center=center,
+        invert=invert,
+        overwrite=overwrite,
+        lod=lod,
+        cache_dir=cache_dir,
     )
     density.create_object(
         name=Path(file_path).name, setup_nodes=setup_nodes, style=style
@@ -71,6 +86,7 @@ class MN_OT_Import_Map(bpy.types.Operator):
             setup_nodes=scene.mn.import_node_setup,
             style=scene.MN_import_density_style,
             center=scene.MN_import_density_center,
+            lod=scene.MN_import_density_lod,
         )
         return {"FINISHED"}
 
@@ -88,9 +104,9 @@ def panel(layout, scene):
     col.alignment = "LEFT"
     col.scale_y = 0.5
     label = f"\
-    An intermediate file will be created: {scene.MN_import_density}.vdb\
+    An intermediate .vdb file will be created in: {DEFAULT_CACHE_DIR}\
     Please do not delete this file or the volume will not render.\
-    Move the original .map file to change this location.\
+    Least recently used files are removed when the cache is full.\
     "
     for line in label.strip().split("    "):
         col.label(text=line)
@@ -100,6 +116,7 @@ def panel(layout, scene):
 
     layout.prop(scene, "MN_import_density_invert")
     layout.prop(scene, "MN_import_density_center")
+    layout.prop(scene, "MN_import_density_lod")
     row = layout.row()
     row.prop(scene.mn, "import_node_setup", text="")
     col = row.column()
@@ -14,13 +14,16 @@ from biotite.structure import AtomArray
 
 
 class CellPack(Ensemble):
-    def __init__(self, file_path):
+    def __init__(self, file_path, processes: int = 0):
         super().__init__(file_path)
         self.file_type = self._file_type()
-        self.file = CellPackReader(file_path)
+        # PETWORLD models are parsed one at a time, `processes` of them ahead
+        self.file = CellPackReader(file_path, processes=processes)
         self.file.get_molecules()
         self.transformations = self.file.assemblies(as_array=True)
         self.color_entity = {}
+        # entity -> lightened color of each of its chains
+        self.color_chains = {}
         self._color_palette_path = Path(file_path).parent / "color_palette.json"
         # self._setup_colors()
 
@@ -65,11 +68,15 @@ class CellPack(Ensemble):
         # could also do by entity, + chain-lighten + atom-lighten
 
         entity = array.entity_id[0]
-        color_entity = self.color_entity[entity]
-        nc = len(self.entity_chains[entity])
-        ci = np.where(self.entity_chains[entity] == chain_name)[0][0] * 2
-        color_chain = color.Lab.lighten_color(color_entity, (float(ci) / nc))
-        colors = np.tile(color_chain, (len(array), 1))
+        chains = self.entity_chains[entity]
+        if entity not in self.color_chains:
+            nc = len(chains)
+            self.color_chains[entity] = color.lighten_colors(
+                np.broadcast_to(self.color_entity[entity], (nc, 4)),
+                np.arange(nc) * 2 / nc,
+            )
+        ci = np.where(chains == chain_name)[0][0]
+        colors = np.tile(self.color_chains[entity][ci], (len(array), 1))
 
         store_named_attribute(
             obj=obj,
@@ -83,26 +90,46 @@ class CellPack(Ensemble):
     ) -> bpy.types.Collection:
         collection = bl.coll.cellpack(name)
 
+        # compute the attributes once for all molecules and slice them per molecule
+        shared = None
+        if self.file.array is not None:
+            molecule._add_mass(self.file.array)
+            shared = molecule._attribute_values(self.file.array)
+
+        tree = None
         for i, mol_id in enumerate(self.file.mol_ids):
             array = self.molecules[mol_id]
             chain_name = array.asym_id[0]
 
+            attributes = None
+            if shared is not None:
+                index = self.file.molecule_slices[mol_id]
+                array.set_annotation("mass", self.file.array.mass[index])
+                attributes = molecule._slice_attributes(shared, index)
+
             obj, coll_none = molecule._create_object(
                 array=array,
                 name=mol_id,
                 collection=collection,
+                attributes=attributes,
             )
 
             if len(self.color_entity) > 0:
                 self._assign_colors(obj, array, chain_name)
 
-            if node_setup:
+            if not node_setup:
+                continue
+            # all instances share one node tree
+            if tree is None:
                 bl.nodes.create_starting_node_tree(
                     obj,
                     name=f"MN_pack_instance_{name}",
                     color=None,
                     material="MN Ambient Occlusion",
                 )
+                tree = bl.nodes.get_mod(obj).node_group
+            else:
+                bl.nodes.get_mod(obj).node_group = tree
 
         self.data_collection = collection
         self.instance_collection = collection
@@ -0,0 +1,200 @@
+"""Block index of the models in large mesoscale (PETWORLD / cellPACK) CIF files.
+
+Reading these files with ``CIFFile.read`` loads the text, a stripped copy of
+every line and biotite's parsed categories at once, several times the size
+of the file. Instead the file is scanned once in binary mode, recording the
+byte ranges of the rows of every ``pdbx_PDB_model_num`` in the ``atom_site``
+loop. The remaining categories (assemblies, operators, entities) are parsed
+without the atom rows, and every model is parsed on its own when needed, so
+peak memory follows the largest model instead of the whole file.
+
+Example::
+
+    index = CIFModelIndex("petworld.cif")
+    file = index.read()  # all categories except atom_site
+    array = parse_model(index.file_path, index.header, index.model_ranges(0))
+"""
+
+from __future__ import annotations
+
+from biotite import structure as struc
+from biotite.structure.io import pdbx
+
+# Lines that end the rows of a loop
+_ROW_END = (b"#", b"_", b"loop_", b"data_")
+
+
+class CIFModelIndex:
+    """Byte offsets of the ``atom_site`` loop of a CIF file and its models.
+
+    Attributes
+    ----------
+    file_path : str
+        The indexed file.
+    header : bytes
+        The ``loop_`` line and column names of ``atom_site``.
+    models : list
+        Model numbers in the order they appear in the file.
+    ranges : dict
+        Model number -> list of (start, stop) byte ranges of its rows.
+    counts : dict
+        Model number -> number of rows.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = str(file_path)
+        self.header = b""
+        self.models: list[str] = []
+        self.ranges: dict[str, list[tuple[int, int]]] = {}
+        self.counts: dict[str, int] = {}
+        # atom_site loop, from its `loop_` line up to the line after its last row
+        self._loop_start = self._rows_start = self._rows_stop = None
+        self._scan()
+
+    def _scan(self):
+        model_col = None
+        last_loop = None
+        columns = []
+        state = "search"
+        offset = 0
+        current = None
+        with open(self.file_path, "rb") as file:
+            for line in file:
+                stripped = line.strip()
+                if state == "search":
+                    if stripped == b"loop_":
+                        last_loop = offset
+                    elif stripped.startswith(b"_atom_site.") and last_loop is not None:
+                        self._loop_start = last_loop
+                        state = "header"
+                    elif stripped:
+                        last_loop = None
+                if state == "header":
+                    if stripped.startswith(b"_atom_site."):
+                        columns.append(stripped.split()[0][len(b"_atom_site.") :])
+                    elif stripped:
+                        self._rows_start = offset
+                        if b"pdbx_PDB_model_num" in columns:
+                            model_col = columns.index(b"pdbx_PDB_model_num")
+                        state = "rows"
+                if state == "rows":
+                    if stripped.startswith(_ROW_END):
+                        self._rows_stop = offset
+                        break
+                    if stripped:
+                        model = "1"
+                        if model_col is not None:
+                            model = stripped.split(None, model_col + 1)[model_col].decode()
+                        if model != current:
+                            current = model
+                            if model not in self.ranges:
+                                self.models.append(model)
+                                self.ranges[model] = []
+                                self.counts[model] = 0
+                            self.ranges[model].append([offset, offset])
+                        self.ranges[model][-1][1] = offset + len(line)
+                        self.counts[model] += 1
+                offset += len(line)
+
+            if state == "rows" and self._rows_stop is None:
+                self._rows_stop = offset
+            if self._rows_start is not None:
+                file.seek(self._loop_start)
+                self.header = file.read(self._rows_start - self._loop_start)
+
+        self.ranges = {
+            model: [tuple(r) for r in ranges] for model, ranges in self.ranges.items()
+        }
+
+    @property
+    def n_models(self) -> int:
+        return len(self.models)
+
+    @property
+    def is_ragged(self) -> bool:
+        """True if the models have different numbers of atoms.
+
+        biotite can't read those as one AtomArrayStack, so every model has
+        to be parsed on its own.
+        """
+        return len(set(self.counts.values())) > 1
+
+    def model_ranges(self, i: int) -> list[tuple[int, int]]:
+        """Byte ranges of the rows of the i-th model (0-based, in file order)."""
+        return self.ranges[self.models[i]]
+
+    def read(self, models: list[int] | None = None) -> pdbx.CIFFile:
+        """Parse the file with the atom rows of only some models.
+
+        Parameters
+        ----------
+        models : list of int, optional
+            0-based indices of the models whose rows are kept. By default
+            no rows are kept and the ``atom_site`` category is left out.
+
+        Returns
+        -------
+        pdbx.CIFFile
+        """
+        from .reader import PetworldCIFFileReader
+
+        with open(self.file_path, "rb") as file:
+            if self._loop_start is None:
+                return PetworldCIFFileReader.deserialize(file.read().decode())
+            parts = [file.read(self._loop_start)]
+            if models:
+                parts.append(self.header)
+                for i in models:
+                    parts.extend(_read_ranges(file, self.model_ranges(i)))
+            file.seek(self._rows_stop)
+            parts.append(file.read())
+        return PetworldCIFFileReader.deserialize(b"".join(parts).decode())
+
+
+def _read_ranges(file, ranges) -> list[bytes]:
+    parts = []
+    for start, stop in ranges:
+        file.seek(start)
+        parts.append(file.read(stop - start))
+    return parts
+
+
+def parse_model(
+    file_path,
+    header: bytes,
+    ranges,
+    extra_fields=["b_factor", "occupancy", "atom_id"],
+    bonds: bool = True,
+) -> struc.AtomArray:
+    """Parse the atoms of one model from its byte ranges.
+
+    Only the rows of the model are read and parsed. Nothing here touches
+    bpy, so it can run in a worker process.
+
+    Parameters
+    ----------
+    file_path : str
+        The indexed CIF file.
+    header : bytes
+        ``CIFModelIndex.header``, the column names of the rows.
+    ranges : list
+        ``CIFModelIndex.model_ranges(i)`` of the model.
+    extra_fields : list, optional
+        Extra atom_site fields to read as annotations.
+    bonds : bool, optional
+        Connect the atoms via their residue names. Defaults to True.
+
+    Returns
+    -------
+    struc.AtomArray
+    """
+    from .reader import PetworldCIFFileReader
+
+    with open(file_path, "rb") as file:
+        text = b"".join([b"data_model\n", header, *_read_ranges(file, ranges)])
+    file = PetworldCIFFileReader.deserialize(text.decode())
+    del text
+    array = pdbx.get_structure(file, model=1, extra_fields=extra_fields)
+    if not array.bonds and bonds:
+        array.bonds = struc.bonds.connect_via_residue_names(array, inter_residue=True)
+    return array
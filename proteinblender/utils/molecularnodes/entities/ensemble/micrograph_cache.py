@@ -0,0 +1,286 @@
+"""Cached, downsampled micrograph textures for STAR ensembles.
+
+Micrographs used to be converted to a full resolution TIFF next to the MRC
+file, synchronously, whenever the displayed image changed. Instead:
+
+* Conversions are written to ``<MolecularNodesCache>/micrographs``, keyed by
+  the MRC path, size and modification time, so read-only data directories
+  work and a micrograph is only converted once.
+* Each micrograph is stored once, halved until it fits in
+  ``MAX_TEXTURE_SIZE``. Averaging and normalising happen in float32 on the
+  memory-mapped data.
+* The cache is bounded: once its textures exceed ``MAX_CACHE_BYTES`` the
+  least recently used ones are deleted.
+* Conversion runs on a worker thread. A placeholder texture is shown
+  meanwhile, and requests for micrographs that were skipped over are
+  cancelled, so flipping through images never queues up stale work.
+* Loaded ``bpy.data.images`` are kept in an LRU of ``MAX_LOADED_IMAGES``;
+  older images that nothing uses anymore are removed.
+
+Example::
+
+    image = MicrographTextures.request(owner, mrc_path, on_ready)
+    # image is the cached texture, or the placeholder until on_ready(image)
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from ...download import CACHE_DIR
+
+MAX_TEXTURE_SIZE = 2048
+MAX_LOADED_IMAGES = 16
+
+# Total size of the cached textures before the least recently used are deleted
+MAX_CACHE_BYTES = 2 * 2**30
+
+# Seconds between checks for finished conversions
+POLL_INTERVAL = 0.05
+
+PLACEHOLDER_NAME = "MN Micrograph Loading"
+
+
+def cache_dir() -> Path:
+    """Return the directory micrograph textures are cached in, creating it if needed."""
+    path = Path(CACHE_DIR) / "micrographs"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def micrograph_key(mrc_path) -> str:
+    """Identify a micrograph file by its path, size and modification time."""
+    mrc_path = Path(mrc_path).resolve()
+    stat = mrc_path.stat()
+    digest = hashlib.sha1(f"{mrc_path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def texture_path(key: str, shape) -> Path:
+    """Cache path of the texture of a micrograph."""
+    height, width = shape
+    return cache_dir() / f"{key}_{width}x{height}.tiff"
+
+
+def cached_texture(key: str):
+    """Return the path of the cached texture of a micrograph, or None.
+
+    The modification time of a found texture is updated, which is what
+    `evict` orders textures by.
+    """
+    for path in cache_dir().glob(f"{key}_*.tiff"):
+        try:
+            os.utime(path)
+        except OSError:
+            continue
+        return path
+    return None
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES, keep=()) -> None:
+    """Delete the least recently used textures until the cache fits max_bytes.
+
+    Textures of the keys in `keep`, e.g. those loaded as images, are never
+    deleted.
+    """
+    files = []
+    for path in cache_dir().glob("*.tiff"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _mtime, size, _path in files)
+    for _mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            return
+        if path.name.split("_")[0] in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _halve(image: np.ndarray) -> np.ndarray:
+    """Downsample by 2 in both axes by averaging 2x2 blocks."""
+    height, width = image.shape[0] // 2, image.shape[1] // 2
+    blocks = image[: height * 2, : width * 2].reshape(height, 2, width, 2)
+    return blocks.mean(axis=(1, 3), dtype=np.float32)
+
+
+def convert_micrograph(mrc_path, key: str) -> Path:
+    """Write the texture of a micrograph to the cache and return its path.
+
+    Runs on a worker thread, so it must not touch bpy.
+    """
+    import mrcfile
+    from PIL import Image
+
+    with mrcfile.mmap(mrc_path, mode="r", permissive=True) as mrc:
+        data = mrc.data
+        # For 3D data sum over the z axis
+        if data.ndim == 3:
+            image = data.sum(axis=0, dtype=np.float32)
+        else:
+            image = np.array(data, dtype=np.float32)
+
+    while max(image.shape) > MAX_TEXTURE_SIZE:
+        image = _halve(image)
+
+    # Normalize the data to 0-1 in place
+    low, high = image.min(), image.max()
+    image -= low
+    if high > low:
+        image /= high - low
+
+    path = texture_path(key, image.shape)
+    partial = path.with_suffix(".partial")
+    # Need to invert in Y to generate the correct tiff
+    Image.fromarray(np.ascontiguousarray(image[::-1, :])).save(partial, format="TIFF")
+    os.replace(partial, path)
+    return path
+
+
+class MicrographTextures:
+    """Loads micrograph textures from the cache, converting them in the background."""
+
+    _executor = None
+    # key -> Future of the conversion
+    _futures = {}
+    # owner -> (key, callback) of the latest request of a STAR object
+    _waiting = {}
+    # key -> image name, least recently used first
+    _images = OrderedDict()
+
+    @classmethod
+    def request(cls, owner, mrc_path, on_ready):
+        """Return the texture of a micrograph, converting it first if needed.
+
+        Args:
+            owner: Hashable id of the requester; a new request replaces its
+                previous one
+            mrc_path: Path of the MRC micrograph
+            on_ready: Called with the image once a background conversion
+                finishes, if this is still the owner's latest request
+
+        Returns:
+            bpy.types.Image: The texture, or the placeholder while converting
+        """
+        key = micrograph_key(mrc_path)
+        previous = cls._waiting.pop(owner, None)
+        if previous is not None and previous[0] != key:
+            cls._cancel_unwanted(previous[0])
+
+        path = cached_texture(key)
+        if path is not None and key not in cls._futures:
+            return cls._load(key, path)
+
+        cls._waiting[owner] = (key, on_ready)
+        if key not in cls._futures:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1)
+            cls._futures[key] = cls._executor.submit(convert_micrograph, str(mrc_path), key)
+        if not bpy.app.timers.is_registered(_poll):
+            bpy.app.timers.register(_poll, first_interval=POLL_INTERVAL)
+        return cls.placeholder()
+
+    @classmethod
+    def cancel(cls, owner):
+        """Forget the pending request of owner."""
+        previous = cls._waiting.pop(owner, None)
+        if previous is not None:
+            cls._cancel_unwanted(previous[0])
+
+    @classmethod
+    def _cancel_unwanted(cls, key):
+        # Only drop conversions that have not started and nobody waits for
+        if any(waiting_key == key for waiting_key, _ in cls._waiting.values()):
+            return
+        future = cls._futures.get(key)
+        if future is not None and future.cancel():
+            del cls._futures[key]
+
+    @classmethod
+    def _poll(cls):
+        """Timer callback: hand finished conversions to their owners."""
+        for key, future in list(cls._futures.items()):
+            if not future.done():
+                continue
+            del cls._futures[key]
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"Warning: Could not convert micrograph: {e}")
+                path = None
+
+            for owner, (waiting_key, on_ready) in list(cls._waiting.items()):
+                if waiting_key != key:
+                    continue
+                del cls._waiting[owner]
+                if path is not None:
+                    on_ready(cls._load(key, path))
+
+            if path is not None:
+                evict(keep=set(cls._images) | {key})
+
+        return POLL_INTERVAL if cls._futures else None
+
+    @classmethod
+    def _load(cls, key, path):
+        name = cls._images.get(key)
+        image = bpy.data.images.get(name) if name else None
+        if image is None:
+            image = bpy.data.images.load(str(path), check_existing=True)
+            image.colorspace_settings.name = "Non-Color"
+        cls._images[key] = image.name
+        cls._images.move_to_end(key)
+        cls._evict()
+        return image
+
+    @classmethod
+    def _evict(cls):
+        """Remove the least recently used images that are no longer in use."""
+        for key in list(cls._images)[:-1]:
+            if len(cls._images) <= MAX_LOADED_IMAGES:
+                return
+            image = bpy.data.images.get(cls._images[key])
+            if image is None:
+                del cls._images[key]
+            elif image.users == 0:
+                bpy.data.images.remove(image)
+                del cls._images[key]
+
+    @staticmethod
+    def placeholder():
+        """Small grey image shown while a micrograph is converted."""
+        image = bpy.data.images.get(PLACEHOLDER_NAME)
+        if image is None:
+            image = bpy.data.images.new(PLACEHOLDER_NAME, 4, 4, float_buffer=True)
+            image.pixels.foreach_set(np.full(4 * 4 * 4, 0.5, dtype=np.float32))
+            image.colorspace_settings.name = "Non-Color"
+        return image
+
+    @classmethod
+    def shutdown(cls):
+        """Drop pending requests and stop the timer and worker thread."""
+        cls._waiting.clear()
+        if bpy.app.timers.is_registered(_poll):
+            bpy.app.timers.unregister(_poll)
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+        cls._futures.clear()
+        cls._images.clear()
+
+
+def _poll():
+    # Timers are identified by the function object, a new bound method is
+    # created on every access to MicrographTextures._poll
+    return MicrographTextures._poll()
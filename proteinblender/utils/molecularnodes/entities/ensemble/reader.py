@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from io import BytesIO
 from pathlib import Path
 
@@ -7,6 +8,7 @@ from biotite import structure as struc
 from biotite.structure.io import pdbx
 
 from ..molecule.pdbx import PDBX
+from .cif_index import CIFModelIndex, parse_model
 
 
 # For reading cellpack files, we override the CIFFile from biotite. The only change we
@@ -43,15 +45,107 @@ class PetworldCIFFileReader(pdbx.CIFFile):
         )
 
 
+class LazyModels(Mapping):
+    """The molecules of a PETWORLD file, each parsed from its own model on access.
+
+    Only the most recently accessed molecule is kept in memory. With
+    `processes`, the models after the accessed one are parsed ahead in worker
+    processes. Blender's Python can't start fresh interpreters that import the
+    addon, so the workers are forked; where fork isn't available the models
+    are parsed in this process.
+    """
+
+    def __init__(self, reader, extra_fields, bonds=True, processes: int = 0):
+        import multiprocessing
+
+        self._reader = reader
+        self._extra_fields = extra_fields
+        self._bonds = bonds
+        self._keys = {
+            "{}_{}".format(str(i).rjust(4, "0"), i + 1): i
+            for i in range(reader.n_molecules)
+        }
+        if "fork" not in multiprocessing.get_all_start_methods():
+            processes = 0
+        self._processes = processes
+        self._executor = None
+        self._pending = {}
+        self._last = (None, None)
+
+    def __getitem__(self, key) -> struc.AtomArray:
+        i = self._keys[key]
+        if self._last[0] != i:
+            # drop the previous molecule before parsing the next
+            self._last = (None, None)
+            self._last = (i, self._reader._annotate_model(self._parse(i), i))
+        return self._last[1]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _args(self, i):
+        index = self._reader.index
+        return (
+            index.file_path,
+            index.header,
+            index.model_ranges(i),
+            self._extra_fields,
+            self._bonds,
+        )
+
+    def _parse(self, i) -> struc.AtomArray:
+        if not self._processes:
+            return parse_model(*self._args(i))
+
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                self._processes, mp_context=multiprocessing.get_context("fork")
+            )
+        # keep a bounded window of models parsing ahead
+        for j in range(i, min(i + 2 * self._processes, len(self))):
+            if j not in self._pending:
+                self._pending[j] = self._executor.submit(parse_model, *self._args(j))
+        for j in [j for j in self._pending if j < i]:
+            self._pending.pop(j).cancel()
+
+        array = self._pending.pop(i).result()
+        if not self._pending:
+            self.close()
+        return array
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+
 class CellPackReader(PDBX):
-    def __init__(self, file_path):
+    def __init__(self, file_path, processes: int = 0):
         super().__init__(file_path)
         self._extra_annotations["asym_id"] = self._get_asym_id
         self._extra_annotations["pdb_model_num"] = self._get_pdb_model_num
         self.file_path = file_path
+        # byte index of the atom_site models, for .cif files
+        self.index: CIFModelIndex | None = None
+        self.processes = processes
         self.file: pdbx.BinaryCIFFile | pdbx.CIFFile = self._read()
-        self.n_molecules: int = pdbx.get_model_count(self.file)
-        self.molecules: dict[str, struc.AtomArray] = {}
+        if self.index is not None and self.index.n_models > 0:
+            self.n_molecules: int = self.index.n_models
+        else:
+            self.n_molecules = pdbx.get_model_count(self.file)
+        self.molecules: Mapping[str, struc.AtomArray] = {}
+        # all molecules sorted by chain, and the slice of each molecule in it;
+        # not set for PETWORLD files that are read one model at a time
+        self.array: struc.AtomArray | None = None
+        self.molecule_slices: dict[str, slice] = {}
 
     @property
     def mol_ids(self) -> np.ndarray:
@@ -65,10 +159,61 @@ class CellPackReader(PDBX):
         if suffix == ".bcif":
             return pdbx.BinaryCIFFile.read(self.file_path)
         elif suffix == ".cif":
+            self.index = CIFModelIndex(self.file_path)
+            if self._is_lazy:
+                # the models are parsed one at a time by get_molecules
+                return self.index.read()
+            if self.index.n_models > 1:
+                # get_molecules only uses the first of equally sized models
+                return self.index.read([0])
             return PetworldCIFFileReader.read(self.file_path)
         else:
             raise ValueError(f"Invalid file format: '{suffix}")
 
+    @property
+    def _is_lazy(self) -> bool:
+        """Models of different sizes, read one at a time from the index."""
+        return self.index is not None and self.index.is_ragged
+
+    def _annotate_model(self, array: struc.AtomArray, i: int) -> struc.AtomArray:
+        """Add the annotations of the i-th model parsed on its own."""
+        # self.file has no atom_site, so the model number comes from the index
+        array = self.set_extra_annotations(array, self.file)
+        array.set_annotation(
+            "pdb_model_num", np.repeat(int(self.index.models[i]), len(array))
+        )
+        array.set_annotation("pdbx_PDB_model_num", np.repeat(i + 1, len(array)))
+        array.chain_id = array.pdbx_PDB_model_num
+        return array
+
+    @staticmethod
+    def _split_molecules(array, starts, stops) -> dict[str, struc.AtomArray]:
+        """Slice a chain-sorted array into one array per chain.
+
+        Slicing a BondList scans every bond, so the bonds are split by
+        molecule once instead of once per slice.
+        """
+        bonds = array.bonds
+        array.bonds = None
+        molecules = {array.chain_id[start]: array[start:stop] for start, stop in zip(starts, stops)}
+        array.bonds = bonds
+        if bonds is None:
+            return molecules
+
+        pairs = bonds.as_array()
+        owner = np.searchsorted(starts, pairs[:, 0], "right") - 1
+        # bonds between chains can't be kept on either molecule
+        inside = owner == np.searchsorted(starts, pairs[:, 1], "right") - 1
+        pairs, owner = pairs[inside], owner[inside]
+        order = np.argsort(owner, kind="stable")
+        pairs, owner = pairs[order], owner[order]
+        groups = np.split(pairs, np.searchsorted(owner, np.arange(1, len(starts))))
+
+        for mol, group, start in zip(molecules.values(), groups, starts):
+            group[:, :2] -= start
+            mol.bonds = struc.BondList(mol.array_length(), group)
+        return molecules
+
     def _get_asym_id(self, array, file) -> np.ndarray:
         return array.chain_id
 
@@ -108,6 +253,11 @@ class CellPackReader(PDBX):
         if "PDB_model_num" in self.blocks["pdbx_struct_assembly_gen"]:
             self._is_petworld = True
 
+        if self._is_lazy:
+            self._is_petworld = True
+            self.molecules = LazyModels(self, extra_fields, bonds, self.processes)
+            return
+
         try:
             array = self.get_structure(extra_fields, bonds)
             if isinstance(array, struc.AtomArrayStack):
@@ -118,9 +268,18 @@ class CellPackReader(PDBX):
             #         "chain_id", np.char.rjust(array.pdb_model_num, 4, "0")
             #     )
 
-            self.molecules = {
-                c: array[array.chain_id == c] for c in np.unique(array.chain_id)
+            # sort once by chain so every molecule is a contiguous slice,
+            # instead of masking the full array once per chain
+            if np.any(array.chain_id[1:] < array.chain_id[:-1]):
+                array = array[np.argsort(array.chain_id, kind="stable")]
+            chains, starts = np.unique(array.chain_id, return_index=True)
+            stops = np.append(starts[1:], array.array_length())
+
+            self.array = array
+            self.molecule_slices = {
+                c: slice(start, stop) for c, start, stop in zip(chains, starts, stops)
             }
+            self.molecules = self._split_molecules(array, starts, stops)
         except InvalidFileError:
             self._is_petworld = True
             for i in range(self.n_molecules):
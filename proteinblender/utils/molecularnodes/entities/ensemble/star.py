@@ -1,44 +1,81 @@
+from __future__ import annotations
+
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import bpy
 import numpy as np
 
-# Try to import optional dependencies
-try:
-    import mrcfile
-    import starfile
-    from PIL import Image
-    from scipy.spatial.transform import Rotation as R
-    from pandas import DataFrame, CategoricalDtype
-    STARFILE_DEPS_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: StarFile functionality limited due to missing dependency: {e}")
-    STARFILE_DEPS_AVAILABLE = False
-    # Provide dummy classes to prevent import errors
-    DataFrame = None
-    CategoricalDtype = None
-    R = None
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+def _check_dependencies():
+    """Import the optional StarFile dependencies on first use.
+
+    pandas, scipy, mrcfile, starfile and PIL are only needed once a star file
+    is opened, so they are not imported when the addon is registered.
+    """
+    try:
+        import mrcfile  # noqa: F401
+        import starfile  # noqa: F401
+        import pandas  # noqa: F401
+        from PIL import Image  # noqa: F401
+        from scipy.spatial.transform import Rotation  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "StarFile functionality requires scipy, pandas, mrcfile, starfile, and PIL. "
+            f"Please install these dependencies. ({e})"
+        ) from e
 
 from ... import blender as bl
 from databpy import AttributeTypes, BlenderObject
 import databpy
 from .base import Ensemble
+from .micrograph_cache import MicrographTextures
+
+
+def unregister_handlers():
+    """Remove the micrograph handlers of all STAR objects and stop conversions."""
+    for handler in list(bpy.app.handlers.depsgraph_update_post):
+        if getattr(handler, "__func__", None) is StarFile._update_micrograph_texture:
+            bpy.app.handlers.depsgraph_update_post.remove(handler)
+    MicrographTextures.shutdown()
 
 
 class StarFile(Ensemble):
     def __init__(self, file_path):
-        if not STARFILE_DEPS_AVAILABLE:
-            raise ImportError("StarFile functionality requires scipy, pandas, mrcfile, starfile, and PIL. Please install these dependencies.")
+        _check_dependencies()
         super().__init__(file_path)
         self.type = "starfile"
         self.current_image = -1
 
     @classmethod
-    def from_starfile(cls, file_path):
-        if not STARFILE_DEPS_AVAILABLE:
-            raise ImportError("StarFile functionality requires scipy, pandas, mrcfile, starfile, and PIL. Please install these dependencies.")
+    def from_starfile(
+        cls,
+        file_path,
+        micrographs=None,
+        classes=None,
+        fraction: float = 1.0,
+    ):
+        """Read a STAR file, optionally only a subset of its particles.
+
+        Any of `micrographs`, `classes` or a `fraction` below 1 streams the
+        particle table and keeps only the matching rows instead of loading
+        the whole table first.
+        """
+        _check_dependencies()
         self = cls(file_path)
-        self.data = self._read()
+        if micrographs or classes or fraction < 1.0:
+            from .star_stream import read_star_table
+
+            self.data = read_star_table(
+                file_path, micrographs=micrographs, classes=classes, fraction=fraction
+            )
+            if len(self.data) == 0:
+                raise ValueError("No particles in the STAR file match the selection")
+        else:
+            self.data = self._read()
         self.df = self._assign_df()
         return self
 
@@ -48,7 +85,7 @@ class StarFile(Ensemble):
         self.object = blender_object
         self.data = self._read()
         self._create_mn_columns()
-        bpy.app.handlers.depsgraph_update_post.append(self._update_micrograph_texture)
+        self._register_handler()
         return self
 
     @property
@@ -60,6 +97,9 @@ class StarFile(Ensemble):
         return bl.nodes.MN_micrograph_material()
 
     def _read(self):
+        import starfile
+        from pandas import DataFrame
+
         star: DataFrame = list(
             starfile.read(self.file_path, always_dict=True).values()
         )[0]
@@ -98,7 +138,7 @@ class StarFile(Ensemble):
                 "File is not a valid RELION>=3.1 or cisTEM STAR file, other formats are not currently supported."
             )
 
-    def _convert_mrc_to_tiff(self):
+    def _micrograph_path(self):
         if self._is_relion():
             micrograph_path = self.object["rlnMicrographName_categories"][
                 self.star_node.inputs["Image"].default_value - 1
@@ -108,7 +148,7 @@ class StarFile(Ensemble):
                 self.star_node.inputs["Image"].default_value - 1
             ].strip("'")
         else:
-            return False
+            return None
 
         # This could be more elegant
         if not Path(micrograph_path).exists():
@@ -128,34 +168,24 @@ class StarFile(Ensemble):
                     )
             micrograph_path = pot_micrograph_path
 
-        tiff_path = Path(micrograph_path).with_suffix(".tiff")
-        if not tiff_path.exists():
-            with mrcfile.open(micrograph_path) as mrc:
-                micrograph_data = mrc.data.copy()
-
-            # For 3D data sum over the z axis. Probalby would be nicer to load the data as a volume
-            if micrograph_data.ndim == 3:
-                micrograph_data = np.sum(micrograph_data, axis=0)
-            # Normalize the data to 0-1
-            micrograph_data = (micrograph_data - micrograph_data.min()) / (
-                micrograph_data.max() - micrograph_data.min()
-            )
+        return Path(micrograph_path)
 
-            if micrograph_data.dtype != np.float32:
-                micrograph_data = micrograph_data.astype(np.float32)
+    def _register_handler(self):
+        if self._update_micrograph_texture not in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.append(self._update_micrograph_texture)
 
-            # Need to invert in Y to generate the correct tiff
-            Image.fromarray(micrograph_data[::-1, :]).save(tiff_path)
-        return tiff_path
+    def unregister_handler(self):
+        """Stop updating the micrograph texture of this object."""
+        if self._update_micrograph_texture in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(self._update_micrograph_texture)
+        MicrographTextures.cancel(id(self))
 
     def _update_micrograph_texture(self, *_):
         try:
             show_micrograph = self.star_node.inputs["Show Micrograph"]
             _ = self.object["mn"]
         except ReferenceError:
-            bpy.app.handlers.depsgraph_update_post.remove(
-                self._update_micrograph_texture
-            )
+            self.unregister_handler()
             return
         if self.star_node.inputs["Image"].default_value == self.current_image:
             return
@@ -163,15 +193,21 @@ class StarFile(Ensemble):
             self.current_image = self.star_node.inputs["Image"].default_value
         if not show_micrograph:
             return
-        tiff_path = self._convert_mrc_to_tiff()
-        if tiff_path:
-            try:
-                image_obj = bpy.data.images[tiff_path.name]
-            except KeyError:
-                image_obj = bpy.data.images.load(str(tiff_path))
-            image_obj.colorspace_settings.name = "Non-Color"
+        micrograph_path = self._micrograph_path()
+        if micrograph_path:
+            # the placeholder is shown until a background conversion finishes
+            self._set_micrograph_image(
+                MicrographTextures.request(
+                    id(self), micrograph_path, self._set_micrograph_image
+                )
+            )
+
+    def _set_micrograph_image(self, image_obj):
+        try:
             self.micrograph_material.node_tree.nodes["Image Texture"].image = image_obj
             self.star_node.inputs["Micrograph"].default_value = image_obj
+        except ReferenceError:
+            self.unregister_handler()
 
     def create_object(
         self,
@@ -191,7 +227,7 @@ class StarFile(Ensemble):
             bl.nodes.create_starting_nodes_starfile(self.object)
 
         self.object["starfile_path"] = str(self.file_path)
-        bpy.app.handlers.depsgraph_update_post.append(self._update_micrograph_texture)
+        self._register_handler()
         return self.object
 
 
@@ -232,16 +268,18 @@ class EnsembleDataFrame:
         """
         Returns the rotations as a numpy array of quaternions.
         """
+        from scipy.spatial.transform import Rotation as R
+
         rot_tilt_psi_cols = self.data[self._rot_columns].to_numpy()
 
+        # one batched conversion for all particles
         # require 'scalar_first=True' as blender is wxyz quaternions
-        quaternions = np.array(
-            [
-                R.from_euler("ZYZ", row, degrees=True).inv().as_quat(scalar_first=True)
-                for row in rot_tilt_psi_cols
-            ]
+        quaternions = (
+            R.from_euler("ZYZ", rot_tilt_psi_cols, degrees=True)
+            .inv()
+            .as_quat(scalar_first=True)
         )
-        return quaternions
+        return quaternions.reshape((-1, 4))
 
     def image_id_values(self) -> np.ndarray:
         """
@@ -260,30 +298,56 @@ class EnsembleDataFrame:
 
         return np.zeros(len(self.data), dtype=int)
 
-    def store_data_on_object(self, obj: bpy.types.Object):
+    def store_data_on_object(self, obj: bpy.types.Object, chunk_columns: int = 16):
         """
         Stores the data on the object.
+
+        Numeric columns are converted to their attribute dtype a block of
+        `chunk_columns` columns at a time, so every attribute is written with one
+        bulk `foreach_set` from a contiguous 32 bit buffer while only one block of
+        converted columns is held in memory.
         """
+        from pandas import CategoricalDtype
+
         bob = BlenderObject(obj)
         bob.store_named_attribute(
-            self.rotation_as_quaternion(),
+            self.rotation_as_quaternion().astype(np.float32),
             name="rotation",
             atype=AttributeTypes.QUATERNION,
         )
 
         bob.store_named_attribute(
-            self.image_id_values(),
+            self.image_id_values().astype(np.int32),
             name="image_id",
             atype=AttributeTypes.INT,
         )
 
+        blocks = {AttributeTypes.FLOAT: [], AttributeTypes.INT: [], AttributeTypes.BOOLEAN: []}
         for col in self.data.columns:
-            if isinstance(self.data[col].dtype, CategoricalDtype):
+            dtype = self.data[col].dtype
+            if isinstance(dtype, CategoricalDtype):
                 bob.object[f"{col}_categories"] = list(self.data[col].cat.categories)
-                data = self.data[col].cat.codes.to_numpy()
+                data = self.data[col].cat.codes.to_numpy().astype(np.int32)
                 bob.store_named_attribute(data, name=col, atype=AttributeTypes.INT)
+            elif np.issubdtype(dtype, np.bool_):
+                blocks[AttributeTypes.BOOLEAN].append(col)
+            elif np.issubdtype(dtype, np.integer):
+                blocks[AttributeTypes.INT].append(col)
             else:
-                bob.store_named_attribute(self.data[col].to_numpy(), name=col)
+                blocks[AttributeTypes.FLOAT].append(col)
+
+        dtypes = {
+            AttributeTypes.FLOAT: np.float32,
+            AttributeTypes.INT: np.int32,
+            AttributeTypes.BOOLEAN: np.bool_,
+        }
+        for atype, columns in blocks.items():
+            for start in range(0, len(columns), chunk_columns):
+                chunk = columns[start : start + chunk_columns]
+                # column-major, so each column below is a contiguous slice
+                values = np.asfortranarray(self.data[chunk].to_numpy(dtype=dtypes[atype]))
+                for i, col in enumerate(chunk):
+                    bob.store_named_attribute(values[:, i], name=col, atype=atype)
 
 
 class RelionDataFrame(EnsembleDataFrame):
@@ -12,8 +12,17 @@ bpy.types.Scene.MN_import_star_file_path = bpy.props.StringProperty(
 )
 
 
-def load_starfile(file_path, node_setup=True, world_scale=0.01):
-    ensemble = StarFile.from_starfile(file_path)
+def load_starfile(
+    file_path,
+    node_setup=True,
+    world_scale=0.01,
+    micrographs=None,
+    classes=None,
+    fraction=1.0,
+):
+    ensemble = StarFile.from_starfile(
+        file_path, micrographs=micrographs, classes=classes, fraction=fraction
+    )
     ensemble.create_object(
         name=Path(file_path).name, node_setup=node_setup, world_scale=world_scale
     )
@@ -70,8 +79,9 @@ def load_cellpack(
     node_setup=True,
     world_scale=0.01,
     fraction: float = 1,
+    processes: int = 0,
 ):
-    ensemble = CellPack(file_path)
+    ensemble = CellPack(file_path, processes=processes)
     ensemble.create_object(
         name=name, node_setup=node_setup, world_scale=world_scale, fraction=fraction
     )
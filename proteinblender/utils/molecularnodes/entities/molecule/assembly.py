@@ -3,9 +3,29 @@ A subpackage for reading rotation matrices and translation vectors
 for biological assemblies from different file formats.
 
 The central functions are `get_transformations_`
+
+Operator expressions such as ``(1-60)(61-88)`` are parsed once into their
+steps, and the Cartesian product of the steps is composed with batched
+4x4 matrix products instead of one Python loop per combined operator, so
+icosahedral and helical assemblies with thousands of operators stay cheap.
+`transforms_array` turns the resulting transformations into the structured
+array that `bl.mesh.create_data_object` instances from.
 """
 
 from abc import ABCMeta, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+
+# data types for the np.array that will store per-chain symmetry operations
+TRANSFORM_DTYPE = [
+    ("assembly_id", int),
+    ("transform_id", int),
+    ("chain_id", "U10"),
+    ("rotation", float, 4),  # quaternion form
+    ("translation", float, 3),
+    ("pdb_model_num", int),
+]
 
 
 class AssemblyParser(metaclass=ABCMeta):
@@ -46,3 +66,145 @@ class AssemblyParser(metaclass=ABCMeta):
         dict{'1', list[transformations]}
 
         """
+
+
+@lru_cache(maxsize=1024)
+def parse_operation_expression(expression: str) -> tuple:
+    """
+    Split an ``oper_expression`` into its steps of operator IDs.
+
+    ``(1-5,7)(61-88)`` becomes ``(('61', ..., '88'), ('1', ..., '5', '7'))``: one
+    tuple of IDs per parenthesised group, in the order they are applied, which is
+    right to left. Every assembly row repeats the same few expressions, so results
+    are cached.
+    """
+    # Split groups by parentheses:
+    # use the opening parenthesis as delimiter
+    # and just remove the closing parenthesis
+    groups = [e for e in expression.replace(")", "").split("(") if len(e) > 0]
+
+    steps = []
+    # Important: Operations are applied from right to left
+    for group in reversed(groups):
+        ids = []
+        for item in group.split(","):
+            if "-" in item:
+                # Range of operation IDs, they must be integers
+                first, last = item.split("-")
+                ids.extend(str(id) for id in range(int(first), int(last) + 1))
+            else:
+                ids.append(item.strip())
+        steps.append(tuple(ids))
+    return tuple(steps)
+
+
+def compose_operations(steps, operators: dict) -> np.ndarray:
+    """
+    Compose the Cartesian product of operator steps into 4x4 matrices.
+
+    Parameters
+    ----------
+    steps : sequence of sequence of str
+        Operator IDs of every step, in the order they are applied, as returned
+        by `parse_operation_expression`.
+    operators : dict
+        Operator ID -> 4x4 matrix.
+
+    Returns
+    -------
+    np.ndarray
+        (n, 4, 4) matrices, ordered like ``itertools.product(*steps)``: the
+        combinations of the last step vary fastest.
+    """
+    result = np.identity(4)[np.newaxis]
+    for step in steps:
+        matrices = np.stack([operators[id] for id in step])
+        # every matrix of this step after every combination so far
+        result = np.matmul(matrices[np.newaxis], result[:, np.newaxis]).reshape(-1, 4, 4)
+    return result
+
+
+def matrices_to_quaternions(matrices: np.ndarray) -> np.ndarray:
+    """
+    Convert the rotation part of (n, 4, 4) matrices into (n, 4) wxyz quaternions.
+
+    Like `mathutils.Matrix.decompose`, the scale of each axis is divided out
+    before the rotation is converted.
+    """
+    rotation = np.asarray(matrices, dtype=float)[:, :3, :3]
+    scale = np.linalg.norm(rotation, axis=1, keepdims=True)
+    rotation = rotation / np.where(scale == 0, 1, scale)
+
+    m = rotation
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    # solve for the largest component first for numerical stability
+    candidates = np.stack(
+        [
+            1 + trace,
+            1 + m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2],
+            1 - m[:, 0, 0] + m[:, 1, 1] - m[:, 2, 2],
+            1 - m[:, 0, 0] - m[:, 1, 1] + m[:, 2, 2],
+        ],
+        axis=1,
+    )
+    largest = np.argmax(candidates, axis=1)
+    quat = np.empty((len(m), 4))
+    # rows: w, x, y, z expressed for each choice of largest component
+    pairs = np.stack(
+        [
+            [candidates[:, 0], m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1]],
+            [m[:, 2, 1] - m[:, 1, 2], candidates[:, 1], m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0]],
+            [m[:, 0, 2] - m[:, 2, 0], m[:, 0, 1] + m[:, 1, 0], candidates[:, 2], m[:, 1, 2] + m[:, 2, 1]],
+            [m[:, 1, 0] - m[:, 0, 1], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1], candidates[:, 3]],
+        ]
+    )
+    index = np.arange(len(m))
+    quat[:] = pairs[largest, :, index]
+    quat /= 2 * np.sqrt(candidates[index, largest])[:, np.newaxis]
+    # keep w positive so the same rotation always gives the same quaternion
+    quat[quat[:, 0] < 0] *= -1
+    return quat
+
+
+def transforms_array(assemblies: dict) -> np.ndarray:
+    """
+    Build the per-chain transformation array from ``get_assemblies()`` output.
+
+    Every transformation is repeated for each of its chains. Matrices are
+    decomposed for all transformations of the file at once.
+
+    Parameters
+    ----------
+    assemblies : dict
+        Assembly ID -> list of ``{"chain_ids", "matrix", "pdb_model_num"}``.
+
+    Returns
+    -------
+    np.ndarray
+        Structured array with the fields of ``TRANSFORM_DTYPE``.
+    """
+    assembly_ids, transform_ids, chain_ids, model_nums, counts = [], [], [], [], []
+    matrices = []
+    for i, assembly in enumerate(assemblies.values()):
+        for j, transform in enumerate(assembly):
+            chains = transform["chain_ids"]
+            counts.append(len(chains))
+            chain_ids.extend(chains)
+            assembly_ids.append(i + 1)
+            transform_ids.append(j)
+            model_nums.append(transform.get("pdb_model_num", 0))
+            matrices.append(transform["matrix"])
+
+    arr = np.zeros(len(chain_ids), dtype=TRANSFORM_DTYPE)
+    if len(chain_ids) == 0:
+        return arr
+
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    counts = np.asarray(counts)
+    arr["assembly_id"] = np.repeat(assembly_ids, counts)
+    arr["transform_id"] = np.repeat(transform_ids, counts)
+    arr["chain_id"] = chain_ids
+    arr["rotation"] = np.repeat(matrices_to_quaternions(matrices), counts, axis=0)
+    arr["translation"] = np.repeat(matrices[:, :3, 3], counts, axis=0)
+    arr["pdb_model_num"] = np.repeat(model_nums, counts)
+    return arr
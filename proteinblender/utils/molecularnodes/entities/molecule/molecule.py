@@ -13,7 +13,7 @@ import numpy.typing as npt
 from biotite import InvalidFileError
 
 from ... import blender as bl
-from ... import color, data, utils
+from ... import color, tables, utils
 import databpy
 from ..entity import MolecularEntity, EntityType
 
@@ -250,9 +250,13 @@ class Molecule(MolecularEntity, metaclass=ABCMeta):
         else:
             array = self.array
 
+        # indices of the kept atoms, for per-model values computed on the full array
+        atom_index = np.arange(array.array_length())
+
         # remove the solvent from the structure if requested
         if del_solvent:
             mask = np.invert(struc.filter_solvent(array))
+            atom_index = atom_index[mask]
             if is_stack:
                 array = array[:, mask]
             else:
@@ -260,6 +264,7 @@ class Molecule(MolecularEntity, metaclass=ABCMeta):
 
         if del_hydrogen:
             mask = array.element != "H"
+            atom_index = atom_index[mask]
             if is_stack:
                 array = array[:, mask]
             else:
@@ -274,6 +279,19 @@ class Molecule(MolecularEntity, metaclass=ABCMeta):
             verbose=verbose,
         )
 
+        # secondary structure computed per model is stored on the frame objects
+        sec_struct_models = getattr(self, "sec_struct_models", None)
+        if frames and sec_struct_models is not None and not selection:
+            for i, values in enumerate(sec_struct_models):
+                frame = frames.objects.get(f"{obj.name}_frame_{i}")
+                if frame is not None:
+                    databpy.store_named_attribute(
+                        obj=frame,
+                        data=values[atom_index],
+                        name="sec_struct",
+                        atype=databpy.AttributeTypes.INT,
+                    )
+
         if style:
             bl.nodes.create_starting_node_tree(
                 object=obj, coll_frames=frames, style=style, color=color
@@ -336,81 +354,31 @@ class Molecule(MolecularEntity, metaclass=ABCMeta):
         return f"<Molecule object: {self.name}>"
 
 
-def _create_object(
-    array,
-    name=None,
-    centre="",
-    style="spherers",
-    collection=None,
-    world_scale=0.01,
-    color_plddt: bool = False,
-    verbose=False,
-) -> Tuple[bpy.types.Object, bpy.types.Collection]:
-    import biotite.structure as struc
-
-    frames = None
-    is_stack = isinstance(array, struc.AtomArrayStack)
-
+def _add_mass(array):
+    """Set the `mass` annotation of an atom array unless it already has one."""
+    if "mass" in array.get_annotation_categories():
+        return
     try:
-        mass = np.array(
-            [
-                data.elements.get(x, {}).get("standard_mass", 0.0)
-                for x in np.char.title(array.element)
-            ]
-        )
+        mass = tables.standard_mass(np.char.title(array.element))
         array.set_annotation("mass", mass)
     except AttributeError as e:
         print(e)
 
-    def centre_array(atom_array, centre):
-        if centre == "centroid":
-            atom_array.coord -= databpy.centre(atom_array.coord)
-        elif centre == "mass":
-            atom_array.coord -= databpy.centre(atom_array.coord, weight=atom_array.mass)
-
-    if centre in ["mass", "centroid"]:
-        if is_stack:
-            for atom_array in array:
-                centre_array(atom_array, centre)
-        else:
-            centre_array(atom_array, centre)
 
-    if is_stack:
-        if array.stack_depth() > 1:
-            frames = array
-        array = array[0]
-
-    if not collection:
-        collection = bl.coll.mn()
-
-    bonds_array = []
-    bond_idx = []
-
-    if array.bonds:
-        bonds_array = array.bonds.as_array()
-        bond_idx = bonds_array[:, [0, 1]]
-        # the .copy(order = 'C') is to fix a weird ordering issue with the resulting array
-        bond_types = bonds_array[:, 2].copy(order="C")
+def _attribute_values(array, world_scale=0.01, color_plddt: bool = False, verbose=False):
+    """Compute the per-atom attributes stored on molecule objects.
 
-    # creating the blender object and meshes and everything
-    bob = databpy.create_bob(
-        name=name,
-        collection=collection,
-        vertices=array.coord * world_scale,
-        edges=bond_idx,
-    )
+    Returns
+    -------
+    tuple
+        (values, properties): values maps each attribute name to a tuple of
+        (data, type, domain), properties holds custom object properties such
+        as the `ligands` that `res_name` refers to. Attributes that can't be
+        computed for the array are left out.
+    """
+    import biotite.structure as struc
 
-    # Add information about the bond types to the model on the edge domain
-    # Bond types: 'ANY' = 0, 'SINGLE' = 1, 'DOUBLE' = 2, 'TRIPLE' = 3, 'QUADRUPLE' = 4
-    # 'AROMATIC_SINGLE' = 5, 'AROMATIC_DOUBLE' = 6, 'AROMATIC_TRIPLE' = 7
-    # https://www.biotite-python.org/apidoc/biotite.structure.BondType.html#biotite.structure.BondType
-    if array.bonds:
-        bob.store_named_attribute(
-            data=bond_types,
-            name="bond_type",
-            atype=databpy.AttributeTypes.INT,
-            domain="EDGE",
-        )
+    properties = {}
 
     # The attributes for the model are initially defined as single-use functions. This allows
     # for a loop that attempts to add each attibute by calling the function. Only during this
@@ -422,13 +390,7 @@ def _create_object(
     # anybody might have.
 
     def att_atomic_number():
-        atomic_number = np.array(
-            [
-                data.elements.get(x, {"atomic_number": -1}).get("atomic_number")
-                for x in np.char.title(array.element)
-            ]
-        )
-        return atomic_number
+        return tables.atomic_number(np.char.title(array.element))
 
     def att_atom_id():
         return array.atom_id
@@ -441,35 +403,29 @@ def _create_object(
 
     def att_res_name():
         other_res = []
-        counter = 0
         id_counter = -1
         res_names = array.res_name
         res_ids = array.res_id
-        res_nums = []
-
-        for name in res_names:
-            res_num = data.residues.get(name, {"res_name_num": -1}).get("res_name_num")
-
-            if res_num == 9999:
-                if (
-                    res_names[counter - 1] != name
-                    or res_ids[counter] != res_ids[counter - 1]
-                ):
-                    id_counter += 1
-
-                unique_res_name = str(id_counter + 100) + "_" + str(name)
-                other_res.append(unique_res_name)
-
-                num = (
-                    np.where(np.isin(np.unique(other_res), unique_res_name))[0][0] + 100
-                )
-                res_nums.append(num)
-            else:
-                res_nums.append(res_num)
-            counter += 1
+        res_nums = tables.res_name_num(res_names)
+
+        # residues numbered 9999 are ligands, numbered in order of appearance
+        for counter in np.flatnonzero(res_nums == 9999):
+            name = res_names[counter]
+            if (
+                res_names[counter - 1] != name
+                or res_ids[counter] != res_ids[counter - 1]
+            ):
+                id_counter += 1
+
+            unique_res_name = str(id_counter + 100) + "_" + str(name)
+            other_res.append(unique_res_name)
+
+            res_nums[counter] = (
+                np.where(np.isin(np.unique(other_res), unique_res_name))[0][0] + 100
+            )
 
-        bob.object["ligands"] = np.unique(other_res)
-        return np.array(res_nums)
+        properties["ligands"] = np.unique(other_res)
+        return res_nums
 
     def att_chain_id():
         if isinstance(array.chain_id[0], int):
@@ -487,52 +443,22 @@ def _create_object(
         return array.occupancy
 
     def att_vdw_radii():
-        vdw_radii = np.array(
-            list(
-                map(
-                    # divide by 100 to convert from picometres to angstroms which is
-                    # what all of coordinates are in
-                    lambda x: data.elements.get(x, {}).get("vdw_radii", 100.0) / 100,
-                    np.char.title(array.element),
-                )
-            )
-        )
+        # divide by 100 to convert from picometres to angstroms which is
+        # what all of coordinates are in
+        vdw_radii = tables.vdw_radii(np.char.title(array.element)) / 100
         return vdw_radii * world_scale
 
     def att_mass():
         return array.mass
 
     def att_atom_name():
-        atom_name = np.array(
-            list(map(lambda x: data.atom_names.get(x, -1), array.atom_name))
-        )
-
-        return atom_name
+        return tables.atom_name_num(array.atom_name)
 
     def att_lipophobicity():
-        lipo = np.array(
-            list(
-                map(
-                    lambda x, y: data.lipophobicity.get(x, {"0": 0}).get(y, 0),
-                    array.res_name,
-                    array.atom_name,
-                )
-            )
-        )
-
-        return lipo
+        return tables.lipophobicity(array.res_name, array.atom_name)
 
     def att_charge():
-        charge = np.array(
-            list(
-                map(
-                    lambda x, y: data.atom_charge.get(x, {"0": 0}).get(y, 0),
-                    array.res_name,
-                    array.atom_name,
-                )
-            )
-        )
-        return charge
+        return tables.atom_charge(array.res_name, array.atom_name)
 
     def att_color():
         if color_plddt:
@@ -705,26 +631,129 @@ def _create_object(
         },
     )
 
-    # assign the attributes to the object
+    # compute each of the attributes, skipping the ones the array has no data for
+    values = {}
     for att in attributes:
         if verbose:
             start = time.process_time()
+        try:
+            values[att["name"]] = (att["value"](), att["type"], att["domain"])
+            if verbose:
+                print(f'Computed {att["name"]} after {time.process_time() - start} s')
+        except Exception as e:
+            if verbose:
+                print(e)
+                warnings.warn(f"Unable to compute attribute: {att['name']}")
+
+    return values, properties
+
+
+def _slice_attributes(attributes, index):
+    """Select the atoms at index (a slice or index array) from `_attribute_values()`."""
+    values, properties = attributes
+    sliced = {
+        name: (value[index], atype, domain)
+        for name, (value, atype, domain) in values.items()
+    }
+    return sliced, dict(properties)
+
+
+def _create_object(
+    array,
+    name=None,
+    centre="",
+    style="spherers",
+    collection=None,
+    world_scale=0.01,
+    color_plddt: bool = False,
+    verbose=False,
+    attributes=None,
+) -> Tuple[bpy.types.Object, bpy.types.Collection]:
+    """Create the Blender object for an atom array.
+
+    `attributes` takes the result of `_attribute_values()` for this array,
+    e.g. sliced from the values of a larger array, so they are not computed
+    again for every object.
+    """
+    import biotite.structure as struc
+
+    frames = None
+    is_stack = isinstance(array, struc.AtomArrayStack)
+
+    _add_mass(array)
+
+    def centre_array(atom_array, centre):
+        if centre == "centroid":
+            atom_array.coord -= databpy.centre(atom_array.coord)
+        elif centre == "mass":
+            atom_array.coord -= databpy.centre(atom_array.coord, weight=atom_array.mass)
+
+    if centre in ["mass", "centroid"]:
+        if is_stack:
+            for atom_array in array:
+                centre_array(atom_array, centre)
+        else:
+            centre_array(atom_array, centre)
+
+    if is_stack:
+        if array.stack_depth() > 1:
+            frames = array
+        array = array[0]
+
+    if not collection:
+        collection = bl.coll.mn()
+
+    bonds_array = []
+    bond_idx = []
+
+    if array.bonds:
+        bonds_array = array.bonds.as_array()
+        bond_idx = bonds_array[:, [0, 1]]
+        # the .copy(order = 'C') is to fix a weird ordering issue with the resulting array
+        bond_types = bonds_array[:, 2].copy(order="C")
+
+    # creating the blender object and meshes and everything
+    bob = databpy.create_bob(
+        name=name,
+        collection=collection,
+        vertices=array.coord * world_scale,
+        edges=bond_idx,
+    )
+
+    # Add information about the bond types to the model on the edge domain
+    # Bond types: 'ANY' = 0, 'SINGLE' = 1, 'DOUBLE' = 2, 'TRIPLE' = 3, 'QUADRUPLE' = 4
+    # 'AROMATIC_SINGLE' = 5, 'AROMATIC_DOUBLE' = 6, 'AROMATIC_TRIPLE' = 7
+    # https://www.biotite-python.org/apidoc/biotite.structure.BondType.html#biotite.structure.BondType
+    if array.bonds:
+        bob.store_named_attribute(
+            data=bond_types,
+            name="bond_type",
+            atype=databpy.AttributeTypes.INT,
+            domain="EDGE",
+        )
+
+    if attributes is None:
+        attributes = _attribute_values(
+            array, world_scale=world_scale, color_plddt=color_plddt, verbose=verbose
+        )
+    values, properties = attributes
+
+    # assign the attributes to the object
+    for att_name, (value, atype, domain) in values.items():
         try:
             bob.store_named_attribute(
-                data=att["value"](),
-                name=att["name"],
-                atype=att["type"],
-                domain=att["domain"],
+                data=value,
+                name=att_name,
+                atype=atype,
+                domain=domain,
             )
-            if verbose:
-                print(f'Added {att["name"]} after {time.process_time() - start} s')
         except Exception as e:
             if verbose:
                 print(e)
-                warnings.warn(f"Unable to add attribute: {att['name']}")
-                print(
-                    f'Failed adding {att["name"]} after {time.process_time() - start} s'
-                )
+                warnings.warn(f"Unable to add attribute: {att_name}")
+
+    for key, value in properties.items():
+        bob.object[key] = value
 
     coll_frames = None
     if frames:
@@ -1,12 +1,11 @@
-import itertools
-
 import biotite.structure as struc
 import biotite.structure.io.pdbx as pdbx
 import numpy as np
 from biotite import InvalidFileError
 
-from .assembly import AssemblyParser
+from .assembly import AssemblyParser, compose_operations, parse_operation_expression
 from .molecule import Molecule
+from .sec_struct import LOOP, NOT_PEPTIDE, assign_intervals, ss_labels_to_int
 
 
 class OldCIF(Molecule):
@@ -62,15 +61,6 @@ class OldCIF(Molecule):
         return CIFAssemblyParser(self.file).get_assemblies()
 
 
-def _ss_label_to_int(label):
-    if "HELX" in label:
-        return 1
-    elif "STRN" in label:
-        return 2
-    else:
-        return 3
-
-
 def _get_secondary_structure(array, file):
     """
     Get secondary structure information for the array from the file.
@@ -122,40 +112,15 @@ def _get_secondary_structure(array, file):
 
     # convert the string labels to integer representations of the SS
     # AH: 1, BS: 2, LOOP: 3
+    id_int = ss_labels_to_int(id_label)
 
-    id_int = np.array([_ss_label_to_int(label) for label in id_label], int)
-
-    # create a lookup dictionary that enables lookup of secondary structure
-    # based on the chain_id and res_id values
-
-    lookup = dict()
-    for chain in np.unique(chains):
-        arrays = []
-        mask = chain == chains
-        start_sub = starts[mask]
-        end_sub = ends[mask]
-        id_sub = id_int[mask]
-
-        for start, end, id in zip(start_sub, end_sub, id_sub):
-            idx = np.arange(start, end + 1, dtype=int)
-            arr = np.zeros((len(idx), 2), dtype=int)
-            arr[:, 0] = idx
-            arr[:, 1] = 3
-            arr[:, 1] = id
-            arrays.append(arr)
-
-        lookup[chain] = dict(np.vstack(arrays).tolist())
-
-    # use the lookup dictionary to get the SS annotation based on the chain_id and res_id
-    secondary_structure = np.zeros(len(array.chain_id), int)
-    for i, (chain, res) in enumerate(zip(array.chain_id, array.res_id)):
-        try:
-            secondary_structure[i] = lookup[chain].get(res, 3)
-        except KeyError:
-            secondary_structure[i] = 0
-
-    # assign SS to 0 where not peptide
-    secondary_structure[~struc.filter_amino_acids(array)] = 0
+    # residues of recorded chains default to loop, chains without any
+    # records and atoms that are not amino acids are not assigned
+    secondary_structure = assign_intervals(
+        array.chain_id, array.res_id, chains, starts, ends, id_int, fill=LOOP
+    )
+    secondary_structure[~np.isin(array.chain_id, chains)] = NOT_PEPTIDE
+    secondary_structure[~struc.filter_amino_acids(array)] = NOT_PEPTIDE
     return secondary_structure
 
 
@@ -208,28 +173,30 @@ class CIFAssemblyParser(AssemblyParser):
         # of the `atom_site` category
         # However, by default `PDBxFile` uses the `auth_asym_id` as
         # chain ID
-        matrices = []
-        for id, op_expr, asym_id_expr in zip(
-            assembly_gen_category["assembly_id"],
-            assembly_gen_category["oper_expression"],
-            assembly_gen_category["asym_id_list"],
+        transformations = []
+        for pdb_model_num, (id, op_expr, asym_id_expr) in enumerate(
+            zip(
+                np.atleast_1d(assembly_gen_category["assembly_id"]),
+                np.atleast_1d(assembly_gen_category["oper_expression"]),
+                np.atleast_1d(assembly_gen_category["asym_id_list"]),
+            )
         ):
             # Find the operation expressions for given assembly ID
             # We already asserted that the ID is actually present
             if id == assembly_id:
-                operations = _parse_operation_expression(op_expr)
+                steps = parse_operation_expression(op_expr)
+                matrices = compose_operations(steps, transformation_dict).tolist()
                 affected_chain_ids = asym_id_expr.split(",")
-                for i, operation in enumerate(operations):
-                    rotations = []
-                    translations = []
-                    for op_step in operation:
-                        rotation, translation = transformation_dict[op_step]
-                        rotations.append(rotation)
-                        translations.append(translation)
-                    matrix = _chain_transformations(rotations, translations)
-                    matrices.append((affected_chain_ids, matrix.tolist()))
-
-        return matrices
+                transformations.extend(
+                    {
+                        "chain_ids": affected_chain_ids,
+                        "matrix": matrix,
+                        "pdb_model_num": pdb_model_num,
+                    }
+                    for matrix in matrices
+                )
+
+        return transformations
 
     def get_assemblies(self):
         assembly_dict = {}
@@ -239,86 +206,15 @@ class CIFAssemblyParser(AssemblyParser):
         return assembly_dict
 
 
-def _chain_transformations(rotations, translations):
-    """
-    Get a total rotation/translation transformation by combining
-    multiple rotation/translation transformations.
-    This is done by intermediately combining rotation matrices and
-    translation vectors into 4x4 matrices in the form
-
-    |r11 r12 r13 t1|
-    |r21 r22 r23 t2|
-    |r31 r32 r33 t3|
-    |0   0   0   1 |.
-    """
-    total_matrix = np.identity(4)
-    for rotation, translation in zip(rotations, translations):
-        matrix = np.zeros((4, 4))
-        matrix[:3, :3] = rotation
-        matrix[:3, 3] = translation
-        matrix[3, 3] = 1
-        total_matrix = matrix @ total_matrix
-
-    # return total_matrix[:3, :3], total_matrix[:3, 3]
-    return matrix
-
-
 def _get_transformations(struct_oper):
     """
-    Get transformation operation in terms of rotation matrix and
-    translation for each operation ID in ``pdbx_struct_oper_list``.
-    """
-    transformation_dict = {}
-    for index, id in enumerate(struct_oper["id"]):
-        rotation_matrix = np.array(
-            [
-                [float(struct_oper[f"matrix[{i}][{j}]"][index]) for j in (1, 2, 3)]
-                for i in (1, 2, 3)
-            ]
-        )
-        translation_vector = np.array(
-            [float(struct_oper[f"vector[{i}]"][index]) for i in (1, 2, 3)]
-        )
-        transformation_dict[id] = (rotation_matrix, translation_vector)
-    return transformation_dict
-
-
-def _parse_operation_expression(expression):
-    """
-    Get successive operation steps (IDs) for the given
-    ``oper_expression``.
-    Form the cartesian product, if necessary.
+    Get the 4x4 transformation matrix for each operation ID in
+    ``pdbx_struct_oper_list``.
     """
-    # Split groups by parentheses:
-    # use the opening parenthesis as delimiter
-    # and just remove the closing parenthesis
-    expressions_per_step = expression.replace(")", "").split("(")
-    expressions_per_step = [e for e in expressions_per_step if len(e) > 0]
-    # Important: Operations are applied from right to left
-    expressions_per_step.reverse()
-
-    operations = []
-    for expr in expressions_per_step:
-        if "-" in expr:
-            if "," in expr:
-                for gexpr in expr.split(","):
-                    if "-" in gexpr:
-                        first, last = gexpr.split("-")
-                        operations.append(
-                            [str(id) for id in range(int(first), int(last) + 1)]
-                        )
-                    else:
-                        operations.append([gexpr])
-            else:
-                # Range of operation IDs, they must be integers
-                first, last = expr.split("-")
-                operations.append([str(id) for id in range(int(first), int(last) + 1)])
-        elif "," in expr:
-            # List of operation IDs
-            operations.append(expr.split(","))
-        else:
-            # Single operation ID
-            operations.append([expr])
-
-    # Cartesian product of operations
-    return list(itertools.product(*operations))
+    ids = np.atleast_1d(struct_oper["id"])
+    matrices = np.tile(np.identity(4), (len(ids), 1, 1))
+    for i in (1, 2, 3):
+        for j in (1, 2, 3):
+            matrices[:, i - 1, j - 1] = np.atleast_1d(struct_oper[f"matrix[{i}][{j}]"]).astype(float)
+        matrices[:, i - 1, 3] = np.atleast_1d(struct_oper[f"vector[{i}]"]).astype(float)
+    return dict(zip(ids.astype(str), matrices))
@@ -3,19 +3,30 @@ import numpy as np
 from biotite import InvalidFileError
 from biotite.structure import (
     BadStructureError,
-    annotate_sse,
-    spread_residue_wise,
     connect_via_residue_names,
 )
 from biotite.structure.io import pdb
 
 from .assembly import AssemblyParser
 from .molecule import Molecule
+from .sec_struct import (
+    HELIX,
+    LOOP,
+    NOT_PEPTIDE,
+    SHEET,
+    assign_intervals,
+    compute_sec_struct,
+    compute_sec_struct_models,
+)
 
 
 class PDB(Molecule):
-    def __init__(self, file_path):
+    def __init__(self, file_path, sec_struct_per_model: bool = False):
         super().__init__(file_path=file_path)
+        # computed secondary structure of every model, (n_models, n_atoms), set
+        # when the file has no HELIX / SHEET records and sec_struct_per_model is on
+        self.sec_struct_models = None
+        self._sec_struct_per_model = sec_struct_per_model
         self.file = self.read(file_path)
         self.array = self._get_structure()
         self.n_atoms = self.array.array_length()
@@ -52,7 +63,11 @@ class PDB(Molecule):
         try:
             sec_struct = _get_sec_struct(self.file, array)
         except BadStructureError:
-            sec_struct = _comp_secondary_structure(array[0])
+            if self._sec_struct_per_model and array.stack_depth() > 1:
+                self.sec_struct_models = compute_sec_struct_models(array)
+                sec_struct = self.sec_struct_models[0]
+            else:
+                sec_struct = compute_sec_struct(array[0])
 
         array.set_annotation("sec_struct", sec_struct)
 
@@ -69,17 +84,15 @@ def _get_sec_struct(file, array):
     if len(lines_helix) == 0 and len(lines_sheet) == 0:
         raise struc.BadStructureError("No secondary structure information detected.")
 
-    sec_struct = np.zeros(array.array_length(), int)
-
     helix_values = (22, 25, 34, 37, 20)
     sheet_values = (23, 26, 34, 37, 22)
 
-    values = ((lines_helix, 1, helix_values), (lines_sheet, 2, sheet_values))
+    values = ((lines_helix, HELIX, helix_values), (lines_sheet, SHEET, sheet_values))
 
-    def _get_mask(line, start1, end1, start2, end2, chainid):
+    def _get_records(lines, start1, end1, start2, end2, chainid):
         """
-        Takes a line and makes a mask for the array for atoms which are defined inside the
-        range of values defined by the start and end values.
+        Reads the chain and the start and end residue numbers from the fixed
+        width columns of the record lines.
         """
         # bump the starting values down by one for indexing into
         # pythong strings
@@ -87,56 +100,36 @@ def _get_sec_struct(file, array):
         start2 -= 1
         chainid -= 1
 
-        # get the values as intergers
-        start_num = int(line[start1:end1])
-        end_num = int(line[start2:end2])
-        chain_id = line[chainid].strip()
-
-        # create a mask for the array based on these values
-        mask = np.logical_and(
-            np.logical_and(array.chain_id == chain_id, array.res_id >= start_num),
-            array.res_id <= end_num,
-        )
+        start_num = [int(line[start1:end1]) for line in lines]
+        end_num = [int(line[start2:end2]) for line in lines]
+        chain_id = [line[chainid].strip() for line in lines]
 
-        return mask
+        return chain_id, start_num, end_num
 
-    # assigns secondary structure based on lines and stores it in the sec_struct
+    # collect the records in file order, later records take precedence
+    chains, starts, ends, ids = [], [], [], []
     for lines, idx, value_list in values:
-        for line in lines:
-            sec_struct[_get_mask(line, *value_list)] = idx
+        chain_id, start_num, end_num = _get_records(lines, *value_list)
+        chains.extend(chain_id)
+        starts.extend(start_num)
+        ends.extend(end_num)
+        ids.extend([idx] * len(lines))
+
+    sec_struct = assign_intervals(
+        array.chain_id, array.res_id, chains, starts, ends, ids, fill=NOT_PEPTIDE
+    )
 
     # assign remaining AA atoms to 3 (loop), while all other remaining
     # atoms will be 0 (not relevant)
-    mask = np.logical_and(sec_struct == 0, struc.filter_canonical_amino_acids(array))
+    mask = np.logical_and(
+        sec_struct == NOT_PEPTIDE, struc.filter_canonical_amino_acids(array)
+    )
 
-    sec_struct[mask] = 3
+    sec_struct[mask] = LOOP
 
     return sec_struct
 
 
-def _comp_secondary_structure(array):
-    """Use dihedrals to compute the secondary structure of proteins
-
-    Through biotite built-in method derivated from P-SEA algorithm (Labesse 1997)
-    Returns an array with secondary structure for each atoms where:
-    - 0 = '' = non-protein or not assigned by biotite annotate_sse
-    - 1 = a = alpha helix
-    - 2 = b = beta sheet
-    - 3 = c = coil
-
-    Inspired from https://www.biotite-python.org/examples/gallery/structure/transketolase_sse.html
-    """
-    # TODO Port [PyDSSP](https://github.com/ShintaroMinami/PyDSSP)
-
-    conv_sse_char_int = {"a": 1, "b": 2, "c": 3, "": 0}
-
-    char_sse = annotate_sse(array)
-    int_sse = np.array([conv_sse_char_int[char] for char in char_sse], dtype=int)
-    atom_sse = spread_residue_wise(array, int_sse)
-
-    return atom_sse
-
-
 class PDBAssemblyParser(AssemblyParser):
     # Implementation adapted from ``biotite.structure.io.pdb.file``
 
@@ -147,31 +140,30 @@ class PDBAssemblyParser(AssemblyParser):
         return self._file.list_assemblies()
 
     def get_transformations(self, assembly_id):
+        return self._transformations(self._assembly_lines(), assembly_id)
+
+    def _assembly_lines(self):
+        """Split the REMARK 350 lines by assembly in one pass."""
         # Get lines containing transformations for assemblies
         remark_lines = self._file.get_remark(350)
         if remark_lines is None:
             raise InvalidFileError(
                 "File does not contain assembly information (REMARK 350)"
             )
-        # Get lines corresponding to selected assembly ID
-        assembly_start_i = None
-        assembly_stop_i = None
-        for i, line in enumerate(remark_lines):
-            if line.startswith("BIOMOLECULE"):
-                current_assembly_id = line[12:].strip()
-                if assembly_start_i is not None:
-                    # Start was already found -> this is the next entry
-                    # -> this is the stop
-                    assembly_stop_i = i
-                    break
-                if current_assembly_id == assembly_id:
-                    assembly_start_i = i
+        starts = [i for i, line in enumerate(remark_lines) if line.startswith("BIOMOLECULE")]
         # In case of the final assembly of the file,
         # the 'stop' is the end of REMARK 350 lines
-        assembly_stop_i = len(remark_lines) if assembly_stop_i is None else i
-        if assembly_start_i is None:
+        stops = starts[1:] + [len(remark_lines)]
+        return {
+            remark_lines[start][12:].strip(): remark_lines[start:stop]
+            for start, stop in zip(starts, stops)
+        }
+
+    @staticmethod
+    def _transformations(assemblies, assembly_id):
+        if assembly_id not in assemblies:
             raise KeyError(f"The assembly ID '{assembly_id}' is not found")
-        assembly_lines = remark_lines[assembly_start_i:assembly_stop_i]
+        assembly_lines = assemblies[assembly_id]
 
         # Get transformations for a sets of chains
         transformations = []
@@ -206,15 +198,18 @@ class PDBAssemblyParser(AssemblyParser):
 
             matrices = _parse_transformations(assembly_lines[transform_start:stop])
 
-            for matrix in matrices:
-                transformations.append((affected_chain_ids, matrix.tolist()))
+            transformations.extend(
+                {"chain_ids": affected_chain_ids, "matrix": matrix, "pdb_model_num": i}
+                for matrix in matrices.tolist()
+            )
 
         return transformations
 
     def get_assemblies(self):
+        assemblies = self._assembly_lines()
         assembly_dict = {}
         for assembly_id in self.list_assemblies():
-            assembly_dict[assembly_id] = self.get_transformations(assembly_id)
+            assembly_dict[assembly_id] = self._transformations(assemblies, assembly_id)
 
         return assembly_dict
 
@@ -231,24 +226,13 @@ def _parse_transformations(lines):
         raise InvalidFileError("Invalid number of transformation vectors")
     n_transformations = len(lines) // 3
 
-    matrices = np.tile(np.identity(4), (n_transformations, 1, 1))
-
-    transformation_i = 0
-    component_i = 0
-    for line in lines:
-        # The first two elements (component and
-        # transformation index) are not used
-        transformations = [float(e) for e in line.split()[2:]]
-
-        if len(transformations) != 4:
-            raise InvalidFileError("Invalid number of transformation vector elements")
-        matrices[transformation_i, component_i, :] = transformations
-
-        component_i += 1
-        if component_i == 3:
-            # All (x,y,z) components were parsed
-            # -> head to the next transformation
-            transformation_i += 1
-            component_i = 0
+    # Every line is 'BIOMTn  id  r1 r2 r3  t'; the first two elements
+    # (component and transformation index) are not used
+    fields = " ".join(lines).split()
+    if len(fields) != 6 * len(lines):
+        raise InvalidFileError("Invalid number of transformation vector elements")
+    values = np.array(fields, dtype=object).reshape(n_transformations, 3, 6)[:, :, 2:]
 
+    matrices = np.tile(np.identity(4), (n_transformations, 1, 1))
+    matrices[:, :3, :] = values.astype(float)
     return matrices
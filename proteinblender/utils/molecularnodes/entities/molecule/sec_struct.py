@@ -0,0 +1,223 @@
+"""Assign secondary structure records (HELIX / SHEET, struct_conf /
+struct_sheet_range) to the atoms of a structure.
+
+Records are residue intervals on a chain. Atoms and record bounds are
+encoded as sorted integer (chain, res_id) keys, so every record is located
+with ``np.searchsorted`` on the unique residues instead of building a mask
+over all atoms or looking up every atom in a dictionary. Where records
+overlap, the one listed last wins, as it did before.
+
+Files without records fall back to ``compute_sec_struct``, which runs
+biotite's P-SEA ``annotate_sse`` on the alpha carbons of each chain only
+and spreads the per-residue result back to the atoms. Results are cached
+by the content of the atom array, so importing the same structure again
+does not recompute them. ``compute_sec_struct_models`` does the same for
+every model of an NMR ensemble in parallel.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Integer codes stored in the `sec_struct` attribute
+NOT_PEPTIDE = 0
+HELIX = 1
+SHEET = 2
+LOOP = 3
+
+# Computed structures kept for re-imports, oldest dropped first
+CACHE_SIZE = 16
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def ss_labels_to_int(labels) -> np.ndarray:
+    """Convert struct_conf / struct_sheet_range ids to secondary structure codes.
+
+    Labels containing HELX are helices, STRN are strands and anything else
+    is a loop.
+    """
+    labels = np.asarray(labels, dtype=str)
+    codes = np.full(len(labels), LOOP, dtype=int)
+    codes[np.char.find(labels, "STRN") >= 0] = SHEET
+    codes[np.char.find(labels, "HELX") >= 0] = HELIX
+    return codes
+
+
+def assign_intervals(
+    chain_id, res_id, record_chains, starts, ends, values, fill: int = LOOP
+) -> np.ndarray:
+    """Return the value of the last record covering each atom.
+
+    Parameters
+    ----------
+    chain_id, res_id : array
+        Chain and residue number of every atom.
+    record_chains, starts, ends, values : array
+        Chain, first and last residue (inclusive) and value of every record.
+    fill : int, optional
+        Value of atoms that no record covers. Defaults to LOOP.
+
+    Returns
+    -------
+    np.ndarray
+        One value per atom.
+    """
+    chain_id = np.asarray(chain_id)
+    res_id = np.asarray(res_id, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    values = np.asarray(values, dtype=int)
+
+    result = np.full(len(chain_id), fill, dtype=int)
+    if len(chain_id) == 0 or len(starts) == 0:
+        return result
+
+    # Integer chain codes shared by atoms and records
+    chain_labels, chain_codes = np.unique(
+        np.concatenate((chain_id.astype(str), np.asarray(record_chains, dtype=str))),
+        return_inverse=True,
+    )
+    atom_chains = chain_codes[: len(chain_id)].astype(np.int64)
+    record_codes = chain_codes[len(chain_id) :].astype(np.int64)
+
+    # (chain, res_id) -> one sortable integer
+    low = min(res_id.min(), starts.min(), ends.min())
+    span = max(res_id.max(), starts.max(), ends.max()) - low + 1
+    residue_keys, atom_residue = np.unique(
+        atom_chains * span + (res_id - low), return_inverse=True
+    )
+
+    # Every record covers a contiguous run of the sorted residues
+    first = np.searchsorted(residue_keys, record_codes * span + (starts - low), "left")
+    last = np.searchsorted(residue_keys, record_codes * span + (ends - low), "right")
+    lengths = np.maximum(last - first, 0)
+
+    # Later records take precedence, so keep the highest record index per residue
+    records = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.arange(lengths.sum()) - offsets + np.repeat(first, lengths)
+    winner = np.full(len(residue_keys), -1, dtype=np.int64)
+    np.maximum.at(winner, positions, records)
+
+    residue_values = np.where(winner >= 0, values[winner], fill)
+    result[:] = residue_values[atom_residue.ravel()]
+    return result
+
+
+def sse_chars_to_int(chars) -> np.ndarray:
+    """Convert biotite P-SEA characters ('a', 'b', 'c', '') to secondary structure codes."""
+    chars = np.asarray(chars, dtype=str)
+    codes = np.full(len(chars), NOT_PEPTIDE, dtype=int)
+    codes[chars == "a"] = HELIX
+    codes[chars == "b"] = SHEET
+    codes[chars == "c"] = LOOP
+    return codes
+
+
+def _alpha_carbons(array) -> np.ndarray:
+    """Indices of the CA atoms of amino acids."""
+    import biotite.structure as struc
+
+    return np.where(struc.filter_amino_acids(array) & (array.atom_name == "CA"))[0]
+
+
+def _cache_key(array) -> str:
+    digest = hashlib.sha1()
+    for values in (array.coord, array.chain_id, array.res_id, array.res_name, array.atom_name):
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def _residue_sse(ca_array) -> np.ndarray:
+    """P-SEA codes of a CA-only array, computed chain by chain."""
+    import biotite.structure as struc
+
+    codes = np.full(ca_array.array_length(), NOT_PEPTIDE, dtype=int)
+    # chain starts also split where residue numbering restarts
+    starts = struc.get_chain_starts(ca_array, add_exclusive_stop=True)
+    for start, stop in zip(starts[:-1], starts[1:]):
+        codes[start:stop] = sse_chars_to_int(struc.annotate_sse(ca_array[start:stop]))
+    return codes
+
+
+def compute_sec_struct(array, use_cache: bool = True) -> np.ndarray:
+    """Compute per-atom secondary structure codes from the coordinates.
+
+    Only the alpha carbons of amino acids are passed to P-SEA, one chain at
+    a time. Every atom gets the code of its residue's CA; ligands, nucleic
+    acids and residues without a CA are NOT_PEPTIDE.
+
+    Parameters
+    ----------
+    array : AtomArray
+        A single model of the structure.
+    use_cache : bool, optional
+        Reuse a previous result for identical alpha carbons. Defaults to True.
+
+    Returns
+    -------
+    np.ndarray
+        One code per atom.
+    """
+    import biotite.structure as struc
+
+    key = None
+    if use_cache:
+        key = _cache_key(array)
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key].copy()
+
+    ca_indices = _alpha_carbons(array)
+
+    sec_struct = np.full(array.array_length(), NOT_PEPTIDE, dtype=int)
+    if len(ca_indices):
+        # residue index of every atom, and of every CA
+        residue_starts = struc.get_residue_starts(array)
+        atom_residue = np.searchsorted(residue_starts, np.arange(array.array_length()), "right") - 1
+        residue_codes = np.full(len(residue_starts), NOT_PEPTIDE, dtype=int)
+        residue_codes[atom_residue[ca_indices]] = _residue_sse(array[ca_indices])
+        sec_struct = residue_codes[atom_residue]
+
+    if key is not None:
+        with _cache_lock:
+            _cache[key] = sec_struct.copy()
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return sec_struct
+
+
+def compute_sec_struct_models(stack, max_workers: int = None) -> np.ndarray:
+    """Compute secondary structure codes for every model of an ensemble.
+
+    Models are computed in parallel threads; the geometry in annotate_sse is
+    numpy and releases the GIL for most of its work.
+
+    Parameters
+    ----------
+    stack : AtomArrayStack
+        The models, e.g. of an NMR ensemble.
+    max_workers : int, optional
+        Number of threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns
+    -------
+    np.ndarray
+        Codes shaped (n_models, n_atoms).
+    """
+    models = [stack[i] for i in range(stack.stack_depth())]
+    if len(models) == 1:
+        return compute_sec_struct(models[0])[np.newaxis]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return np.stack(list(executor.map(compute_sec_struct, models)))
+
+
+def clear_cache() -> None:
+    """Forget all computed secondary structures."""
+    with _cache_lock:
+        _cache.clear()
@@ -18,7 +18,12 @@ from .sdf import SDF
 from ...style import STYLE_ITEMS
 
 
-def parse(filepath_or_stream, *, stream_format_hint: str | None = None) -> Molecule:
+def parse(
+    filepath_or_stream,
+    *,
+    stream_format_hint: str | None = None,
+    sec_struct_per_model: bool = False,
+) -> Molecule:
     # TODO: I don't like that we might be dealing with bytes or a filepath here,
     # I need to work out a nicer way to have it be cleanly one or the other
 
@@ -109,7 +114,11 @@ def parse(filepath_or_stream, *, stream_format_hint: str | None = None) -> Molec
         # The parser's __init__ (which calls _read) should handle both paths and streams
         # input_for_parser will be either the original path (if not .gz) 
         # or an in-memory stream (if .gz or originally a stream)
-        molecule = selected_parser(input_for_parser)
+        if selected_parser is PDB:
+            # computing secondary structure for every NMR model is opt-in
+            molecule = PDB(input_for_parser, sec_struct_per_model=sec_struct_per_model)
+        else:
+            molecule = selected_parser(input_for_parser)
     except InvalidFileError: # This is a biotite error
         # Attempt fallback to OldCIF for CIF-like formats if primary parsing fails
         if suffix in {".cif", ".mmcif", ".pdbx"}:
@@ -173,8 +182,9 @@ def load_local(
     del_hydrogen=False,
     style="spheres",
     build_assembly=False,
+    sec_struct_per_model=False,
 ):
-    mol = parse(file_path)
+    mol = parse(file_path, sec_struct_per_model=sec_struct_per_model)
     mol.create_object(
         name=name,
         style=style,
@@ -1,11 +1,7 @@
-try:
-    from MDAnalysis import Universe
-except ImportError as e:
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.error(f"Failed to import MDAnalysis: {e}")
-    Universe = None
-    
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from .ops import TrajectoryImportOperator
 from ... import color
 from ...blender import coll, nodes
@@ -15,10 +11,11 @@ from databpy import AttributeTypes
 
 from ..entity import EntityType
 
-from .oxdna.OXDNAParser import OXDNAParser
-from .oxdna.OXDNAReader import OXDNAReader
 from .trajectory import Trajectory
 
+if TYPE_CHECKING:
+    from MDAnalysis import Universe
+
 DNA_SCALE = 10
 
 
@@ -75,6 +72,12 @@ class OXDNA(Trajectory):
 
 
 def load(top, traj, name="oxDNA", style="oxdna", world_scale=0.01):
+    # The oxDNA parser and reader subclass MDAnalysis classes, so they are
+    # only imported when an oxDNA trajectory is loaded
+    from MDAnalysis import Universe
+    from .oxdna.OXDNAParser import OXDNAParser
+    from .oxdna.OXDNAReader import OXDNAReader
+
     univ = Universe(top, traj, topology_format=OXDNAParser, format=OXDNAReader)
     traj = OXDNA(univ, world_scale=world_scale)
     traj.create_object(name=name, style=style)
@@ -1,7 +1,13 @@
-import MDAnalysis as mda
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy.typing as npt
 import numpy as np
 
+if TYPE_CHECKING:
+    import MDAnalysis as mda
+
 
 class Selection:
     def __init__(
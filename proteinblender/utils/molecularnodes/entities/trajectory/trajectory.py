@@ -1,12 +1,13 @@
-from typing import Dict, Callable
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Callable
 
 import bpy
-import MDAnalysis as mda
 import numpy as np
 import numpy.typing as npt
 
 
-from ... import data
+from ... import tables
 from ..entity import MolecularEntity, EntityType
 from ...blender import coll, nodes, path_resolve
 import databpy
@@ -18,6 +19,10 @@ from ...utils import (
 )
 from .selections import Selection
 
+if TYPE_CHECKING:
+    # MDAnalysis is heavy, it is only imported once a trajectory is used
+    import MDAnalysis as mda
+
 
 class Trajectory(MolecularEntity):
     def __init__(self, universe: mda.Universe, world_scale: float = 0.01):
@@ -30,6 +35,35 @@ class Trajectory(MolecularEntity):
         self.cache: dict = {}
         self._entity_type = EntityType.MD
 
+    def __getstate__(self):
+        # topology values are recomputed after loading a session, not pickled
+        state = self.__dict__.copy()
+        state.pop("_topology_memo", None)
+        return state
+
+    def _topology_value(self, name: str, compute: Callable):
+        """Return a per-atom value that only depends on the topology.
+
+        Values are computed once and kept until the universe is replaced or
+        attributes are added to or removed from its topology. Loading a new
+        trajectory into the same universe keeps them.
+        """
+        topology = self.universe._topology
+        key = (id(self.universe), id(topology), len(topology.attrs))
+        memo = getattr(self, "_topology_memo", None)
+        if memo is None or memo["key"] != key:
+            # hold on to the universe and topology so their ids can't be reused
+            memo = {"key": key, "refs": (self.universe, topology), "values": {}}
+            self._topology_memo = memo
+        values = memo["values"]
+        if name not in values:
+            values[name] = compute()
+        return values[name]
+
+    def clear_topology_cache(self) -> None:
+        "Forget the computed topology values, e.g. after editing the topology in place"
+        self.__dict__.pop("_topology_memo", None)
+
     def selection_from_ui(self, ui_item) -> Selection:
         self.selections[ui_item.name] = Selection(
             universe=self.universe,
@@ -121,39 +155,41 @@ class Trajectory(MolecularEntity):
 
     @property
     def elements(self) -> np.ndarray:
+        return self._topology_value("elements", self._elements)
+
+    def _elements(self) -> np.ndarray:
         if hasattr(self.atoms, "elements"):
-            return self.atoms.elements
+            return _strings(self.atoms.elements)
+
+        from MDAnalysis.topology.guessers import guess_atom_element
 
         try:
+            # guess once per distinct atom name instead of once per atom
+            names, index = self._topology_value("atom_names", self._atom_names)
+            known = tables.element_index(names) >= 0
             guessed_elements = [
-                x
-                if x in data.elements.keys()
-                else mda.topology.guessers.guess_atom_element(x)
-                for x in self.atoms.names
+                x if is_known else guess_atom_element(x)
+                for x, is_known in zip(names, known)
             ]
-            return np.array(guessed_elements)
+            return np.array(guessed_elements, dtype=str)[index]
 
         except Exception:
             return np.repeat("X", self.n_atoms)
 
     @property
     def atomic_number(self) -> np.ndarray:
-        return np.array(
-            [
-                data.elements.get(element, data.elements.get("X")).get("atomic_number")
-                for element in self.elements
-            ]
+        # unknown elements are "X"
+        return self._topology_value(
+            "atomic_number", lambda: tables.atomic_number(self.elements, default=-1)
         )
 
     @property
     def vdw_radii(self) -> np.ndarray:
+        radii = self._topology_value(
+            "vdw_radii", lambda: tables.vdw_radii(self.elements, default=100)
+        )
         return (
-            np.array(
-                [
-                    data.elements.get(element, {}).get("vdw_radii", 100)
-                    for element in self.elements
-                ]
-            )
+            radii
             * 0.01  # pm to Angstrom
             * self.world_scale  # Angstrom to world scale
         )
@@ -161,14 +197,13 @@ class Trajectory(MolecularEntity):
     @property
     def mass(self) -> np.ndarray:
         # units: daltons
+        return self._topology_value("mass", self._mass)
+
+    def _mass(self) -> np.ndarray:
         if hasattr(self.atoms, "masses"):
-            return np.array([x.mass for x in self.atoms])
+            return np.asarray(self.atoms.masses, dtype=float)
         else:
-            masses = [
-                data.elements.get(element, {"standard_mass": 0}).get("standard_mass")
-                for element in self.elements
-            ]
-            return np.array(masses)
+            return tables.standard_mass(self.elements, default=0)
 
     @property
     def n_frames(self) -> int:
@@ -207,7 +242,12 @@ class Trajectory(MolecularEntity):
 
     @property
     def res_name(self) -> np.ndarray:
-        return np.array(list(map(lambda x: x[0:3], self.atoms.resnames)))
+        return self._topology_value("res_name", self._res_name)
+
+    def _res_name(self) -> np.ndarray:
+        # truncate the name of every residue, then spread them to the atoms
+        names = [x[0:3] for x in self.universe.residues.resnames]
+        return np.array(names, dtype=str)[self.atoms.resindices]
 
     @property
     def atom_id(self) -> np.ndarray:
@@ -215,13 +255,9 @@ class Trajectory(MolecularEntity):
 
     @property
     def res_num(self) -> np.ndarray:
-        return np.array(
-            [
-                data.residues.get(res_name, data.residues.get("UNK")).get(
-                    "res_name_num"
-                )
-                for res_name in self.res_name
-            ]
+        # unknown residues are "UNK"
+        return self._topology_value(
+            "res_num", lambda: tables.res_name_num(self.res_name, default=-1)
         )
 
     @property
@@ -249,24 +285,27 @@ class Trajectory(MolecularEntity):
 
     @property
     def chain_id_num(self) -> np.ndarray:
-        chain_ids, chain_id_index = np.unique(self.chain_id, return_inverse=True)
-        return chain_id_index
+        return self._topology_value(
+            "chain_id_num",
+            lambda: np.unique(_strings(self.chain_id), return_inverse=True)[1],
+        )
 
     @property
     def atom_type(self) -> np.ndarray:
         return self.atoms.types
 
+    def _atom_type_index(self) -> tuple:
+        unique, index = np.unique(_strings(self.atom_type), return_inverse=True)
+        return unique.astype(self.atom_type.dtype), index
+
     @property
     def atom_type_unique(self) -> np.ndarray:
-        return np.unique(self.atom_type)
+        return self._topology_value("atom_type_index", self._atom_type_index)[0]
 
     @property
     def atom_type_num(self) -> np.ndarray:
         try:
-            atom_type_unique, atom_type_index = np.unique(
-                self.atom_type, return_inverse=True
-            )
-            return atom_type_index
+            return self._topology_value("atom_type_index", self._atom_type_index)[1]
         except AttributeError:
             return None
 
@@ -277,12 +316,16 @@ class Trajectory(MolecularEntity):
         else:
             return np.zeros(self.n_atoms)
 
+    def _atom_names(self) -> tuple:
+        # the distinct atom names and the index of each atom's name among them
+        names, index = np.unique(_strings(self.atoms.names), return_inverse=True)
+        return names, index.reshape(-1)
+
     @property
     def atom_name_num(self) -> np.ndarray:
         if hasattr(self.atoms, "names"):
-            return np.array(
-                list(map(lambda x: data.atom_names.get(x, -1), self.atom_name))
-            )
+            names, index = self._topology_value("atom_names", self._atom_names)
+            return tables.atom_name_num(names)[index]
         else:
             return np.repeat(-1, self.n_atoms)
 
@@ -296,7 +339,7 @@ class Trajectory(MolecularEntity):
 
     @property
     def is_lipid(self) -> np.ndarray:
-        return np.isin(self.atoms.resnames, data.lipid_names)
+        return tables.is_lipid(self.atoms.resnames)
 
     @property
     def is_backbone(self) -> np.ndarray:
@@ -716,3 +759,12 @@ class Trajectory(MolecularEntity):
 
     def __repr__(self):
         return f"<Trajectory, `universe`: {self.universe}, `object`: {self.object}"
+
+
+def _strings(values) -> np.ndarray:
+    """Convert object arrays of strings (as returned by MDAnalysis) to a str array.
+
+    Comparing and sorting fixed width strings is much faster than Python objects.
+    """
+    values = np.asarray(values)
+    return values.astype(str) if values.dtype == object else values
@@ -6,7 +6,6 @@ __name__ = "MolecularNodes.trajectory"
 __author__ = "Brady Johnston"
 
 import bpy
-import MDAnalysis as mda
 
 from ... import blender as bl
 from .trajectory import Trajectory
@@ -37,6 +36,8 @@ def load(top, traj, name="NewTrajectory", style="spheres"):
     top = bl.path_resolve(top)
     traj = bl.path_resolve(traj)
 
+    import MDAnalysis as mda
+
     universe = mda.Universe(top, traj)
 
     traj = Trajectory(universe=universe)
@@ -65,9 +66,14 @@ class MN_OT_Reload_Trajectory(bpy.types.Operator):
         topo = obj.mn.filepath_topology
         traj = obj.mn.filepath_trajectory
 
+        import MDAnalysis as mda
+
         if "oxdna" in obj.mn.entity_type:
+            from .oxdna.OXDNAParser import OXDNAParser
+            from .oxdna.OXDNAReader import OXDNAReader
+
             uni = mda.Universe(
-                topo, traj, topology_format=dna.OXDNAParser, format=dna.OXDNAReader
+                topo, traj, topology_format=OXDNAParser, format=OXDNAReader
             )
             traj = dna.OXDNA(uni)
         else:
@@ -1,6 +1,6 @@
 import os
 import pickle as pk
-from typing import Dict, Union
+from typing import TYPE_CHECKING, Dict, Union
 
 import bpy
 from bpy.app.handlers import persistent
@@ -8,9 +8,12 @@ from bpy.props import StringProperty
 from bpy.types import Context
 from databpy.object import get_from_uuid
 
-from .entities.ensemble.base import Ensemble
-from .entities.molecule.molecule import Molecule
-from .entities.trajectory.trajectory import Trajectory
+if TYPE_CHECKING:
+    # The entity modules import biotite, MDAnalysis and friends; they are
+    # only needed once something has been loaded into the session
+    from .entities.ensemble.base import Ensemble
+    from .entities.molecule.molecule import Molecule
+    from .entities.trajectory.trajectory import Trajectory
 
 
 def trim(dictionary: dict):
@@ -21,7 +24,7 @@ def trim(dictionary: dict):
     return dic
 
 
-def make_paths_relative(trajectories: Dict[str, Trajectory]) -> None:
+def make_paths_relative(trajectories: Dict[str, "Trajectory"]) -> None:
     for key, traj in trajectories.items():
         traj.universe.load_new(make_path_relative(traj.universe.trajectory.filename))
         traj.save_filepaths_on_object()
@@ -55,26 +58,32 @@ def make_path_relative(filepath):
 
 class MNSession:
     def __init__(self) -> None:
-        self.entities: Dict[str, Union[Molecule, Trajectory, Ensemble]] = {}
+        self.entities: Dict[str, Union["Molecule", "Trajectory", "Ensemble"]] = {}
 
     @property
-    def molecules(self) -> Dict[str, Molecule]:
+    def molecules(self) -> Dict[str, "Molecule"]:
+        from .entities.molecule.molecule import Molecule
+
         return {k: v for k, v in self.entities.items() if isinstance(v, Molecule)}
 
     @property
-    def trajectories(self) -> Dict[str, Trajectory]:
+    def trajectories(self) -> Dict[str, "Trajectory"]:
+        from .entities.trajectory.trajectory import Trajectory
+
         # return a filtered dictionary of only the trajectories using isinstance(item, Trajectory)
         return {k: v for k, v in self.entities.items() if isinstance(v, Trajectory)}
 
     @property
-    def ensembles(self) -> Dict[str, Ensemble]:
+    def ensembles(self) -> Dict[str, "Ensemble"]:
+        from .entities.ensemble.base import Ensemble
+
         # return a filtered dictionary of only the ensembles using isinstance(item, Ensemble)
         return {k: v for k, v in self.entities.items() if isinstance(v, Ensemble)}
 
-    def register_entity(self, item: Union[Molecule, Trajectory, Ensemble]) -> None:
+    def register_entity(self, item: "Union[Molecule, Trajectory, Ensemble]") -> None:
         self.entities[item.uuid] = item
 
-    def match(self, obj: bpy.types.Object) -> Union[Molecule, Trajectory, Ensemble]:
+    def match(self, obj: bpy.types.Object) -> "Union[Molecule, Trajectory, Ensemble]":
         return self.get(obj.uuid)
 
     def get_object(self, uuid: str) -> bpy.types.Object | None:
@@ -85,7 +94,7 @@ class MNSession:
         """
         return get_from_uuid(uuid)
 
-    def get(self, uuid: str) -> Union[Molecule, Trajectory, Ensemble] | None:
+    def get(self, uuid: str) -> "Union[Molecule, Trajectory, Ensemble] | None":
         return self.entities.get(uuid)
 
     @property
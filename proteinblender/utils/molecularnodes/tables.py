@@ -0,0 +1,187 @@
+"""NumPy lookup tables compiled from `data.py`.
+
+`data.py` stores elements, residues, atom names, charges and lipophobicity
+as nested dicts, which can only be queried one atom at a time. Here they
+are compiled into arrays with sorted string keys, so a lookup over every
+atom is a single ``np.searchsorted``. The compiled tables are cached in
+``tables.npz`` next to this module and rebuilt when ``data.py`` changes,
+so ``data`` is only imported to build them.
+
+Example::
+
+    from . import tables
+    tables.atomic_number(["C", "N", "Xx"])  # array([ 6,  7, -1])
+    tables.atom_charge(array.res_name, array.atom_name)
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+DATA_PATH = Path(__file__).with_name("data.py")
+CACHE_PATH = Path(__file__).with_name("tables.npz")
+
+
+def _data_hash() -> str:
+    return hashlib.sha1(DATA_PATH.read_bytes()).hexdigest()
+
+
+def _keys(keys) -> np.ndarray:
+    return np.array(sorted(keys), dtype=str)
+
+
+def _pair_table(prefix: str, nested: dict) -> dict:
+    """Dense (residue, atom name) table of a nested dict, NaN where missing."""
+    residues = _keys(nested)
+    atoms = _keys({atom for names in nested.values() for atom in names})
+    values = np.full((len(residues), len(atoms)), np.nan)
+    atom_index = {atom: i for i, atom in enumerate(atoms)}
+    for i, residue in enumerate(residues):
+        for atom, value in nested[residue].items():
+            values[i, atom_index[atom]] = value
+    return {
+        f"{prefix}_residues": residues,
+        f"{prefix}_atoms": atoms,
+        f"{prefix}_values": values,
+    }
+
+
+def build(data_hash: str | None = None) -> dict:
+    """Compile the dicts of `data.py` into arrays.
+
+    Missing numeric fields are stored as NaN and replaced by the default of
+    the accessor.
+    """
+    from . import data
+
+    elements = _keys(data.elements)
+    residues = _keys(data.residues)
+    atom_names = _keys(data.atom_names)
+    return {
+        "data_hash": np.array(data_hash or _data_hash()),
+        "element_keys": elements,
+        "element_atomic_number": np.array(
+            [data.elements[e]["atomic_number"] for e in elements], dtype=np.int32
+        ),
+        "element_vdw_radii": np.array(
+            [data.elements[e].get("vdw_radii", np.nan) for e in elements], dtype=float
+        ),
+        "element_mass": np.array(
+            [data.elements[e].get("standard_mass", np.nan) for e in elements],
+            dtype=float,
+        ),
+        "residue_keys": residues,
+        "residue_res_name_num": np.array(
+            [data.residues[r]["res_name_num"] for r in residues], dtype=np.int32
+        ),
+        "atom_name_keys": atom_names,
+        "atom_name_num": np.array(
+            [data.atom_names[a] for a in atom_names], dtype=np.int32
+        ),
+        "lipid_keys": _keys(set(data.lipid_names)),
+        **_pair_table("charge", data.atom_charge),
+        **_pair_table("lipophobicity", data.lipophobicity),
+    }
+
+
+@lru_cache(maxsize=None)
+def load() -> dict:
+    """Return the tables, from the cache if it matches `data.py`."""
+    data_hash = _data_hash()
+    try:
+        with np.load(CACHE_PATH) as cached:
+            if str(cached["data_hash"]) == data_hash:
+                return {key: cached[key] for key in cached.files}
+    except (OSError, KeyError, ValueError):
+        pass
+
+    tables = build(data_hash)
+    partial = CACHE_PATH.with_suffix(".partial")
+    try:
+        with open(partial, "wb") as f:
+            np.savez(f, **tables)
+        os.replace(partial, CACHE_PATH)
+    except OSError as e:
+        # e.g. a read-only install, the tables are rebuilt next session
+        print(f"Warning: Could not cache lookup tables: {e}")
+    return tables
+
+
+def _index(keys: np.ndarray, values: npt.ArrayLike) -> np.ndarray:
+    """Index of every value in the sorted `keys`, -1 where it is missing."""
+    values = np.asarray(values)
+    if values.dtype.kind != "U":
+        values = values.astype(str)
+    if len(keys) == 0:
+        return np.full(values.shape, -1)
+    index = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where(keys[index] == values, index, -1)
+
+
+def _take(table: np.ndarray, index: np.ndarray, default):
+    found = index >= 0
+    values = table[np.where(found, index, 0)]
+    if values.dtype.kind == "f":
+        found &= ~np.isnan(values)
+    return np.where(found, values, default)
+
+
+def element_index(symbols: npt.ArrayLike) -> np.ndarray:
+    """Row of each element symbol in the element tables, -1 if unknown."""
+    return _index(load()["element_keys"], symbols)
+
+
+def atomic_number(symbols: npt.ArrayLike, default: int = -1) -> np.ndarray:
+    return _take(load()["element_atomic_number"], element_index(symbols), default)
+
+
+def vdw_radii(symbols: npt.ArrayLike, default: float = 100.0) -> np.ndarray:
+    """Van der Waals radii in picometres."""
+    return _take(load()["element_vdw_radii"], element_index(symbols), default)
+
+
+def standard_mass(symbols: npt.ArrayLike, default: float = 0.0) -> np.ndarray:
+    """Standard atomic masses in daltons."""
+    return _take(load()["element_mass"], element_index(symbols), default)
+
+
+def res_name_num(res_names: npt.ArrayLike, default: int = -1) -> np.ndarray:
+    tables = load()
+    index = _index(tables["residue_keys"], res_names)
+    return _take(tables["residue_res_name_num"], index, default)
+
+
+def atom_name_num(atom_names: npt.ArrayLike, default: int = -1) -> np.ndarray:
+    tables = load()
+    index = _index(tables["atom_name_keys"], atom_names)
+    return _take(tables["atom_name_num"], index, default)
+
+
+def is_lipid(res_names: npt.ArrayLike) -> np.ndarray:
+    return _index(load()["lipid_keys"], res_names) >= 0
+
+
+def _pair(prefix: str, res_names, atom_names, default: float) -> np.ndarray:
+    tables = load()
+    residue = _index(tables[f"{prefix}_residues"], res_names)
+    atom = _index(tables[f"{prefix}_atoms"], atom_names)
+    values = tables[f"{prefix}_values"][np.maximum(residue, 0), np.maximum(atom, 0)]
+    found = (residue >= 0) & (atom >= 0) & ~np.isnan(values)
+    return np.where(found, values, default)
+
+
+def atom_charge(
+    res_names: npt.ArrayLike, atom_names: npt.ArrayLike, default: float = 0.0
+) -> np.ndarray:
+    """AMBER partial charge of each (residue name, atom name)."""
+    return _pair("charge", res_names, atom_names, default)
+
+
+def lipophobicity(
+    res_names: npt.ArrayLike, atom_names: npt.ArrayLike, default: float = 0.0
+) -> np.ndarray:
+    return _pair("lipophobicity", res_names, atom_names, default)
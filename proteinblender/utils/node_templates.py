@@ -0,0 +1,446 @@
+"""Shared node group templates for ProteinBlender domains.
+
+Every domain used to carry its own copies of node groups that never differ
+between domains: a ``Color Common_<domain>`` copy of the color tree, and a
+``selection_<molecule>`` chain switch per molecule even when the chains are
+the same. Values such as the domain color live on the group *node* inputs,
+so all domains can reference one template tree instead. Files only hold
+one tree per distinct template, which keeps saving, loading and depsgraph
+builds fast with many domains.
+
+Per-domain values (chain, residue range, color and style material) are
+inputs of the ``DomainNodes`` modifier. Changing them writes a modifier
+property, which neither edits nor recompiles a node tree, and the values
+can be keyframed on the object like any other property. As nothing
+per-domain is left in the graph, all domains of a molecule with the same
+style share one ``<molecule>_domains_<style>`` tree, so the number of
+domain trees grows with the styles in use rather than with the domains.
+
+``deduplicate_node_groups`` collapses the duplicates already stored in
+older files: nested template groups (styles, colors and chain switches)
+whose content is identical and whose names only differ by a ``.001`` style
+suffix or a per-domain suffix are remapped to a single tree. Top level
+trees of molecules and domains are never merged.
+
+Example::
+
+    group = chain_selection_group(["A", "B", "C"])
+    switch_domain_style(domain_obj, "Style Cartoon")
+    set_modifier_inputs(domain_obj, {RESIDUE_MIN_INPUT: 1, RESIDUE_MAX_INPUT: 120})
+    removed = deduplicate_node_groups()
+"""
+
+import hashlib
+import re
+
+import bpy
+
+# Templates that older versions copied once per domain as "<name>_<domain id>"
+PER_DOMAIN_COPIES = ("Color Common",)
+
+# Node properties that only affect the editor, not the evaluated result
+UI_PROPERTIES = {
+    "location", "width", "width_hidden", "height", "dimensions", "select",
+    "hide", "show_options", "show_preview", "show_texture", "mute_ui",
+    "use_custom_color", "color", "parent", "name", "label", "warning_propagation",
+}
+
+_DUPLICATE_SUFFIX = re.compile(r"^(?P<base>.+)\.\d{3,}$")
+
+# Name prefixes of the nested templates deduplicate_node_groups may merge
+MERGEABLE_TEMPLATES = ("Style", "Color", "selection_") + PER_DOMAIN_COPIES
+
+# Geometry nodes modifier of domain objects
+DOMAIN_MODIFIER = "DomainNodes"
+
+# Domain parameters exposed as inputs of the domain modifier
+CHAIN_INPUT = "Chain"
+RESIDUE_MIN_INPUT = "Residue Min"
+RESIDUE_MAX_INPUT = "Residue Max"
+COLOR_INPUT = "Domain Color"
+MATERIAL_INPUT = "Material"
+
+DOMAIN_INPUTS = (
+    (CHAIN_INPUT, "NodeSocketInt"),
+    (RESIDUE_MIN_INPUT, "NodeSocketInt"),
+    (RESIDUE_MAX_INPUT, "NodeSocketInt"),
+    (COLOR_INPUT, "NodeSocketColor"),
+    (MATERIAL_INPUT, "NodeSocketMaterial"),
+)
+
+
+def chain_selection_group(chains):
+    """Return the shared chain selection switch for a list of chain labels.
+
+    Molecules with the same chains share one group. The chain to select is
+    set on the boolean inputs of each group node.
+
+    Args:
+        chains: Chain labels in chain_id order
+
+    Returns:
+        bpy.types.NodeGroup
+    """
+    from .molecularnodes.blender import nodes
+
+    labels = [str(chain) for chain in chains]
+    digest = hashlib.sha1("\0".join(labels).encode()).hexdigest()[:8]
+    return nodes.custom_iswitch(
+        name=f"selection_chains_{digest}",
+        iter_list=labels,
+        field="chain_id",
+        dtype="BOOLEAN",
+    )
+
+
+def _interface_input(tree, name):
+    """Return the input socket called name of a node group interface, or None."""
+    for item in tree.interface.items_tree:
+        if item.item_type == 'SOCKET' and item.in_out == 'INPUT' and item.name == name:
+            return item
+    return None
+
+
+def expose_domain_inputs(tree, targets):
+    """Drive node sockets of a domain tree from modifier inputs.
+
+    Creates the DOMAIN_INPUTS on the tree interface where missing and links
+    them from the Group Input node to the given sockets.
+
+    Args:
+        tree: Domain node group
+        targets: Dict of input name -> node socket to drive
+    """
+    from .molecularnodes.blender import nodes
+
+    input_node = nodes.get_input(tree)
+    for name, socket_type in DOMAIN_INPUTS:
+        target = targets.get(name)
+        if target is None:
+            continue
+        if _interface_input(tree, name) is None:
+            item = tree.interface.new_socket(name, in_out='INPUT', socket_type=socket_type)
+            # New modifiers start from the value the socket had in the tree
+            if hasattr(target, "default_value"):
+                item.default_value = target.default_value
+        tree.links.new(input_node.outputs[name], target)
+
+
+def _input_value(value):
+    """Vector inputs are stored as arrays, compare them as tuples."""
+    if hasattr(value, "__len__") and not isinstance(value, (str, bpy.types.ID)):
+        return tuple(value)
+    return value
+
+
+def _modifier_input(obj, name):
+    """Return (modifier, socket identifier) of a domain modifier input.
+
+    Both are None if obj has no domain modifier or its tree lacks the input.
+    """
+    modifier = obj.modifiers.get(DOMAIN_MODIFIER) if obj else None
+    if modifier is None or modifier.node_group is None:
+        return None, None
+    item = _interface_input(modifier.node_group, name)
+    if item is None:
+        return None, None
+    return modifier, item.identifier
+
+
+def modifier_input_path(obj, name):
+    """RNA path of a domain modifier input relative to obj, or None."""
+    modifier, identifier = _modifier_input(obj, name)
+    if modifier is None:
+        return None
+    return f'modifiers["{modifier.name}"]["{identifier}"]'
+
+
+def get_modifier_input(obj, name):
+    """Return the value of a domain modifier input, or None if it has none."""
+    modifier, identifier = _modifier_input(obj, name)
+    if modifier is None or identifier not in modifier.keys():
+        return None
+    return _input_value(modifier[identifier])
+
+
+def set_modifier_inputs(obj, values):
+    """Write domain modifier inputs, tagging obj only if something changed.
+
+    Args:
+        obj: Domain object
+        values: Dict of input name -> value
+
+    Returns:
+        bool: False if obj lacks any of the inputs, e.g. domains saved by
+        older versions, so the caller can fall back to editing nodes
+    """
+    inputs = {name: _modifier_input(obj, name) for name in values}
+    if any(modifier is None for modifier, _identifier in inputs.values()):
+        return False
+
+    changed = False
+    for name, value in values.items():
+        modifier, identifier = inputs[name]
+        value = _input_value(value)
+        if get_modifier_input(obj, name) != value:
+            modifier[identifier] = value
+            changed = True
+
+    if changed:
+        obj.update_tag(refresh={'DATA'})
+    return True
+
+
+def set_domain_color(obj, color):
+    """Set the color input of a domain object; alpha lives on its material."""
+    return set_modifier_inputs(obj, {COLOR_INPUT: (color[0], color[1], color[2], 1.0)})
+
+
+def find_style_node(tree):
+    """Return the style group node of tree, or None."""
+    for node in tree.nodes:
+        if node.type == 'GROUP' and node.node_tree and 'Style' in node.node_tree.name:
+            return node
+    return None
+
+
+def get_style_material(obj, tree):
+    """Material of the style of obj, from its modifier input for domains.
+
+    Falls back to the Material socket of the style node, which keeps the
+    material the tree was built with.
+    """
+    modifier, identifier = _modifier_input(obj, MATERIAL_INPUT)
+    if modifier is not None and modifier.get(identifier) is not None:
+        return modifier[identifier]
+    style_node = find_style_node(tree)
+    socket = style_node.inputs.get("Material") if style_node else None
+    return socket.default_value if socket else None
+
+
+def set_style_material(obj, tree, material):
+    """Set the material of the style of obj.
+
+    Returns:
+        bool: False if obj has neither a material input nor a style node
+    """
+    if set_modifier_inputs(obj, {MATERIAL_INPUT: material}):
+        return True
+    style_node = find_style_node(tree)
+    socket = style_node.inputs.get("Material") if style_node else None
+    if socket is None:
+        return False
+    socket.default_value = material
+    return True
+
+
+def is_domain_tree(tree):
+    """Whether tree takes every per-domain value from modifier inputs.
+
+    Only such trees are shared between domains. Domains saved by older
+    versions have a tree of their own with the chain set on its nodes.
+    """
+    return tree is not None and _interface_input(tree, CHAIN_INPUT) is not None
+
+
+def domain_tree_name(molecule_id, style_tree_name):
+    """Name of the tree shared by the domains of a molecule with one style."""
+    return f"{molecule_id}_domains_{template_name(style_tree_name)}"
+
+
+def use_domain_tree(obj, tree):
+    """Point the domain modifier of obj at tree, keeping its input values.
+
+    The previous tree is removed once no object uses it anymore.
+    """
+    modifier = obj.modifiers.get(DOMAIN_MODIFIER)
+    previous = modifier.node_group
+    if previous == tree:
+        return
+
+    values = {}
+    for name, _socket_type in DOMAIN_INPUTS:
+        value = get_modifier_input(obj, name)
+        if value is not None and _interface_input(tree, name) is not None:
+            values[name] = value
+    modifier.node_group = tree
+    set_modifier_inputs(obj, values)
+    obj.update_tag(refresh={'DATA'})
+
+    if previous is not None and previous.users == 0:
+        bpy.data.node_groups.remove(previous)
+
+
+def switch_domain_style(obj, style_tree_name):
+    """Move a domain to the shared tree of its molecule for another style.
+
+    The tree is copied from the current one with the style node swapped
+    the first time a domain of the molecule uses that style.
+
+    Returns:
+        bool: False if obj has no shared domain tree, e.g. domains from
+        older files, which swap the style node in their own tree instead
+    """
+    from .molecularnodes.blender import nodes
+
+    modifier = obj.modifiers.get(DOMAIN_MODIFIER) if obj else None
+    if modifier is None or not is_domain_tree(modifier.node_group):
+        return False
+
+    name = domain_tree_name(obj.get("parent_molecule_id", ""), style_tree_name)
+    tree = bpy.data.node_groups.get(name)
+    if tree is None:
+        tree = modifier.node_group.copy()
+        tree.name = name
+        nodes.swap(find_style_node(tree), style_tree_name)
+    use_domain_tree(obj, tree)
+    return True
+
+
+def template_name(name):
+    """Return the template a node group name was copied from.
+
+    ``Style Ribbon.003`` and ``Color Common_3b75_001_A_1_50`` both map back
+    to their template, other names are returned unchanged.
+    """
+    match = _DUPLICATE_SUFFIX.match(name)
+    if match:
+        name = match.group("base")
+    for base in PER_DOMAIN_COPIES:
+        if name.startswith(f"{base}_"):
+            return base
+    return name
+
+
+def _value_key(value):
+    """Hashable form of a node or socket property value."""
+    if isinstance(value, bpy.types.ID):
+        return ("ID", type(value).__name__, value.name)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    try:
+        return tuple(_value_key(v) for v in value)
+    except TypeError:
+        return repr(value)
+
+
+def _node_key(node):
+    properties = []
+    for prop in node.bl_rna.properties:
+        identifier = prop.identifier
+        if (prop.is_readonly and identifier != "node_tree") or identifier in UI_PROPERTIES:
+            continue
+        if prop.type == "COLLECTION":
+            continue
+        properties.append((identifier, _value_key(getattr(node, identifier, None))))
+
+    inputs = tuple(
+        (socket.identifier, _value_key(getattr(socket, "default_value", None)))
+        for socket in node.inputs
+        if not socket.is_linked
+    )
+    return (node.name, node.bl_idname, tuple(properties), inputs)
+
+
+def tree_signature(tree):
+    """Digest of everything in a node group that affects its result.
+
+    Two trees with the same signature evaluate identically, so one can
+    replace the other.
+    """
+    interface = []
+    for item in tree.interface.items_tree:
+        interface.append((
+            item.item_type,
+            item.name,
+            getattr(item, "in_out", None),
+            getattr(item, "socket_type", None),
+            _value_key(getattr(item, "default_value", None)),
+        ))
+
+    node_keys = sorted((_node_key(node) for node in tree.nodes), key=lambda key: key[0])
+    link_keys = sorted(
+        (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+        for link in tree.links
+    )
+
+    digest = hashlib.sha1(repr((tree.bl_idname, interface, node_keys, link_keys)).encode())
+    return digest.hexdigest()
+
+
+def _domain_tree_names():
+    """Names of the node groups recorded on domains, live or in undo states."""
+    try:
+        from .scene_manager import ProteinBlenderScene
+    except ImportError:
+        return set()
+
+    scene_manager = ProteinBlenderScene.get_instance()
+    names = set()
+    for molecule in scene_manager.molecules.values():
+        for domain in molecule.domains.values():
+            names.add(getattr(domain, 'node_group_name', None))
+    for state in scene_manager._saved_states.values():
+        for domain_data in (getattr(state, 'domains_data', None) or {}).values():
+            names.add(domain_data.get('node_group_name'))
+    names.discard(None)
+    names.discard("")
+    return names
+
+
+def _protected_trees():
+    """Names of node groups that must keep their identity.
+
+    These are trees used directly by a modifier, i.e. the per-object trees
+    of molecules and domains, and trees referenced by name from domains.
+    """
+    names = _domain_tree_names()
+    for obj in bpy.data.objects:
+        for modifier in obj.modifiers:
+            if modifier.type == 'NODES' and modifier.node_group is not None:
+                names.add(modifier.node_group.name)
+    return names
+
+
+def deduplicate_node_groups():
+    """Remap identical copies of a nested node group template to a single tree.
+
+    Only templates named in MERGEABLE_TEMPLATES are merged. Trees used by a
+    modifier or recorded on a domain are left alone, since objects and undo
+    states look them up by name. Nested groups are handled by repeating
+    until nothing changes, since merging inner copies can make their
+    parents identical.
+
+    Returns:
+        int: Number of node groups removed
+    """
+    protected = _protected_trees()
+    removed = 0
+    while True:
+        groups = {}
+        for tree in bpy.data.node_groups:
+            if tree.library is not None or tree.name in protected:
+                continue
+            if not template_name(tree.name).startswith(MERGEABLE_TEMPLATES):
+                continue
+            # Keyframes on node inputs belong to this tree only
+            if tree.animation_data and tree.animation_data.action:
+                continue
+            key = (template_name(tree.name), tree_signature(tree))
+            groups.setdefault(key, []).append(tree)
+
+        merged = 0
+        for (base, _signature), trees in groups.items():
+            if len(trees) < 2:
+                continue
+            # Keep the tree that carries the template name if there is one
+            trees.sort(key=lambda tree: (tree.name != base, tree.name))
+            keep = trees[0]
+            for duplicate in trees[1:]:
+                duplicate.user_remap(keep)
+                bpy.data.node_groups.remove(duplicate)
+                merged += 1
+
+        removed += merged
+        if not merged:
+            return removed
@@ -0,0 +1,235 @@
+"""Pose interpolation for ProteinBlender.
+
+Generates in-between conformations for a sequence of stored poses. Every
+pose is an (n, 4, 4) array with one local transform per object; rotations
+are slerped as quaternions, scales are lerped and locations are either
+lerped or follow a Catmull-Rom spline through all poses. All objects and
+all sampled frames are computed in one vectorized pass and baked with a
+single ``KeyframeBatch`` commit, so the scene frame is never stepped.
+
+Example::
+
+    interpolator = PoseInterpolator(pose_matrices, location_mode='SPLINE')
+    interpolator.bake(objects, start_frame=1, end_frame=300, inbetweens=20)
+"""
+
+import numpy as np
+
+from .keyframe_batch import KeyframeBatch
+from .pose_manager import decompose_matrices
+
+EASING_ITEMS = [
+    ('LINEAR', "Linear", "Constant speed between poses"),
+    ('EASE_IN', "Ease In", "Start slowly and speed up towards the next pose"),
+    ('EASE_OUT', "Ease Out", "Start fast and slow down into the next pose"),
+    ('EASE_IN_OUT', "Ease In and Out", "Slow down around every pose"),
+]
+
+LOCATION_ITEMS = [
+    ('LINEAR', "Linear", "Move in straight lines between poses"),
+    ('SPLINE', "Spline", "Move along a smooth curve through all poses"),
+]
+
+# Quaternions closer than this are lerped instead of slerped
+SLERP_THRESHOLD = 0.9995
+
+
+def ease(u, mode='LINEAR'):
+    """Apply an easing curve to normalized segment times in [0, 1]."""
+    if mode == 'EASE_IN':
+        return u * u
+    if mode == 'EASE_OUT':
+        return 1.0 - (1.0 - u) * (1.0 - u)
+    if mode == 'EASE_IN_OUT':
+        return u * u * (3.0 - 2.0 * u)
+    return u
+
+
+def matrices_to_quaternions(rot):
+    """Convert (n, 3, 3) rotation matrices to (n, 4) quaternions (w, x, y, z)."""
+    m = np.asarray(rot, dtype=np.float64)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+
+    # Pick the numerically stable branch per matrix (Shepperd's method)
+    trace = m00 + m11 + m22
+    case = np.argmax(np.stack([trace, m00, m11, m22], axis=1), axis=1)
+    quats = np.empty((len(m), 4))
+
+    candidates = (
+        (1.0 + trace, lambda s: (0.25 * s, (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s)),
+        (1.0 + m00 - m11 - m22, lambda s: ((m21 - m12) / s, 0.25 * s, (m01 + m10) / s, (m02 + m20) / s)),
+        (1.0 + m11 - m00 - m22, lambda s: ((m02 - m20) / s, (m01 + m10) / s, 0.25 * s, (m12 + m21) / s)),
+        (1.0 + m22 - m00 - m11, lambda s: ((m10 - m01) / s, (m02 + m20) / s, (m12 + m21) / s, 0.25 * s)),
+    )
+    for branch, (radicand, components) in enumerate(candidates):
+        rows = case == branch
+        if not rows.any():
+            continue
+        s = 2.0 * np.sqrt(np.maximum(radicand, 1e-12))
+        quats[rows] = np.stack(components(s), axis=1)[rows]
+
+    return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+
+def quaternions_to_matrices(quats):
+    """Convert (..., 4) quaternions (w, x, y, z) to (..., 3, 3) rotation matrices."""
+    w, x, y, z = np.moveaxis(np.asarray(quats, dtype=np.float64), -1, 0)
+    rot = np.empty(w.shape + (3, 3))
+    rot[..., 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    rot[..., 0, 1] = 2.0 * (x * y - w * z)
+    rot[..., 0, 2] = 2.0 * (x * z + w * y)
+    rot[..., 1, 0] = 2.0 * (x * y + w * z)
+    rot[..., 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    rot[..., 1, 2] = 2.0 * (y * z - w * x)
+    rot[..., 2, 0] = 2.0 * (x * z - w * y)
+    rot[..., 2, 1] = 2.0 * (y * z + w * x)
+    rot[..., 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return rot
+
+
+def slerp(q0, q1, u):
+    """Spherical linear interpolation between broadcastable quaternion arrays.
+
+    Args:
+        q0: Start quaternions (..., 4)
+        q1: End quaternions (..., 4), assumed to be in the same hemisphere as q0
+        u: Interpolation factors broadcastable to (..., 1)
+
+    Returns:
+        numpy array of normalized quaternions
+    """
+    dot = np.clip(np.sum(q0 * q1, axis=-1, keepdims=True), -1.0, 1.0)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    close = dot > SLERP_THRESHOLD
+    safe_sin = np.where(close, 1.0, sin_theta)
+
+    w0 = np.where(close, 1.0 - u, np.sin((1.0 - u) * theta) / safe_sin)
+    w1 = np.where(close, u, np.sin(u * theta) / safe_sin)
+    result = w0 * q0 + w1 * q1
+    return result / np.linalg.norm(result, axis=-1, keepdims=True)
+
+
+class PoseInterpolator:
+    """Interpolates a sequence of poses for the same set of objects.
+
+    Poses are spaced one unit apart in pose time, so a sample time of 1.5
+    lies halfway between the second and third pose.
+    """
+
+    def __init__(self, poses, easing='LINEAR', location_mode='LINEAR'):
+        """
+        Args:
+            poses: Array shaped (poses, objects, 4, 4) of local object
+                transforms, at least two poses
+            easing: One of EASING_ITEMS, applied to every pose-to-pose segment
+            location_mode: One of LOCATION_ITEMS
+        """
+        poses = np.asarray(poses, dtype=np.float64)
+        if poses.ndim != 4 or poses.shape[0] < 2:
+            raise ValueError("At least two poses are needed to interpolate")
+
+        self.easing = easing
+        self.location_mode = location_mode
+        pose_count, object_count = poses.shape[:2]
+
+        flat = poses.reshape(-1, 4, 4)
+        self.locations = flat[:, :3, 3].reshape(pose_count, object_count, 3)
+        self.scales = np.linalg.norm(flat[:, :3, :3], axis=1)
+        safe_scales = np.where(self.scales > 1e-12, self.scales, 1.0)
+        quats = matrices_to_quaternions(flat[:, :3, :3] / safe_scales[:, None, :])
+        self.scales = self.scales.reshape(pose_count, object_count, 3)
+        quats = quats.reshape(pose_count, object_count, 4)
+
+        # Keep consecutive poses in the same hemisphere so slerp takes the short way
+        for i in range(1, pose_count):
+            flip = np.sum(quats[i - 1] * quats[i], axis=-1) < 0.0
+            quats[i][flip] *= -1.0
+        self.quaternions = quats
+
+    @property
+    def pose_count(self):
+        return self.locations.shape[0]
+
+    def sample(self, times):
+        """Return interpolated local transforms at the given pose times.
+
+        Args:
+            times: Array of pose times in [0, pose_count - 1]
+
+        Returns:
+            numpy array shaped (times, objects, 4, 4)
+        """
+        times = np.clip(np.atleast_1d(np.asarray(times, dtype=np.float64)), 0.0, self.pose_count - 1)
+        segment = np.minimum(times.astype(np.int64), self.pose_count - 2)
+        u = ease(times - segment, self.easing)[:, None, None]
+
+        start, end = segment, segment + 1
+        quats = slerp(self.quaternions[start], self.quaternions[end], u)
+        scales = self.scales[start] + (self.scales[end] - self.scales[start]) * u
+
+        if self.location_mode == 'SPLINE':
+            # Catmull-Rom through all poses, clamped at both ends
+            p0 = self.locations[np.maximum(start - 1, 0)]
+            p1 = self.locations[start]
+            p2 = self.locations[end]
+            p3 = self.locations[np.minimum(end + 1, self.pose_count - 1)]
+            locations = 0.5 * (
+                2.0 * p1
+                + (p2 - p0) * u
+                + (2.0 * p0 - 5.0 * p1 + 4.0 * p2 - p3) * u ** 2
+                + (3.0 * p1 - p0 - 3.0 * p2 + p3) * u ** 3
+            )
+        else:
+            locations = self.locations[start] + (self.locations[end] - self.locations[start]) * u
+
+        matrices = np.zeros(quats.shape[:2] + (4, 4))
+        matrices[..., :3, :3] = quaternions_to_matrices(quats) * scales[..., None, :]
+        matrices[..., :3, 3] = locations
+        matrices[..., 3, 3] = 1.0
+        return matrices
+
+    def bake(self, objects, start_frame, end_frame, inbetweens=10, batch=None):
+        """Keyframe the interpolated transforms of objects.
+
+        Keys are placed on every pose plus ``inbetweens`` evenly spaced keys
+        between consecutive poses, spread from start_frame to end_frame.
+
+        Args:
+            objects: Blender objects, in the same order as the poses' objects
+            start_frame: Frame of the first pose
+            end_frame: Frame of the last pose
+            inbetweens: Number of interpolated keys between two poses
+            batch: Optional KeyframeBatch to queue into; when omitted a new
+                batch is created and committed
+
+        Returns:
+            int: Number of keyframes written (0 when queued into a given batch)
+        """
+        segments = self.pose_count - 1
+        times = np.linspace(0.0, segments, segments * (max(inbetweens, 0) + 1) + 1)
+        frames = start_frame + times / segments * (end_frame - start_frame)
+
+        matrices = self.sample(times)
+        sample_count, object_count = matrices.shape[:2]
+        location, rotation, scale = decompose_matrices(matrices.reshape(-1, 4, 4))
+
+        # Remove 2*pi jumps so the F-Curves do not spin between keys
+        rotation = np.unwrap(rotation.reshape(sample_count, object_count, 3), axis=0)
+        values = np.concatenate(
+            (
+                location.reshape(sample_count, object_count, 3),
+                rotation,
+                scale.reshape(sample_count, object_count, 3),
+            ),
+            axis=2,
+        )
+
+        own_batch = batch is None
+        if own_batch:
+            batch = KeyframeBatch()
+        for i, obj in enumerate(objects):
+            batch.insert_transforms(obj, frames, values[:, i])
+        return batch.commit() if own_batch else 0
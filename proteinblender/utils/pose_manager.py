@@ -4,18 +4,95 @@ import bpy
 import numpy as np
 from mathutils import Vector, Matrix
 from datetime import datetime
-import os
-import uuid
+
+from ..core.puppet_registry import PuppetRegistry
+
+
+# Value of the "atom_name" attribute for alpha carbons (see molecularnodes.data.atom_names)
+ALPHA_CARBON_ATOM_NAME = 2
+
+
+def _euler_to_matrices(euler):
+    """Convert (n, 3) XYZ euler angles to (n, 3, 3) rotation matrices."""
+    cx, cy, cz = np.cos(euler).T
+    sx, sy, sz = np.sin(euler).T
+    rot = np.empty((len(euler), 3, 3))
+    rot[:, 0, 0] = cy * cz
+    rot[:, 0, 1] = sx * sy * cz - cx * sz
+    rot[:, 0, 2] = cx * sy * cz + sx * sz
+    rot[:, 1, 0] = cy * sz
+    rot[:, 1, 1] = sx * sy * sz + cx * cz
+    rot[:, 1, 2] = cx * sy * sz - sx * cz
+    rot[:, 2, 0] = -sy
+    rot[:, 2, 1] = sx * cy
+    rot[:, 2, 2] = cx * cy
+    return rot
+
+
+def _matrices_to_euler(rot):
+    """Convert (n, 3, 3) rotation matrices to (n, 3) XYZ euler angles."""
+    cy = np.hypot(rot[:, 0, 0], rot[:, 1, 0])
+    gimbal = cy < 1e-6
+    euler = np.empty((len(rot), 3))
+    euler[:, 0] = np.where(gimbal, np.arctan2(-rot[:, 1, 2], rot[:, 1, 1]), np.arctan2(rot[:, 2, 1], rot[:, 2, 2]))
+    euler[:, 1] = np.arctan2(-rot[:, 2, 0], cy)
+    euler[:, 2] = np.where(gimbal, 0.0, np.arctan2(rot[:, 1, 0], rot[:, 0, 0]))
+    return euler
+
+
+def compose_matrices(location, rotation_euler, scale):
+    """Build (n, 4, 4) transform matrices from location, XYZ euler and scale arrays."""
+    location = np.asarray(location, dtype=np.float64).reshape(-1, 3)
+    matrices = np.zeros((len(location), 4, 4))
+    matrices[:, :3, :3] = _euler_to_matrices(np.asarray(rotation_euler, dtype=np.float64).reshape(-1, 3))
+    matrices[:, :3, :3] *= np.asarray(scale, dtype=np.float64).reshape(-1, 1, 3)
+    matrices[:, :3, 3] = location
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def decompose_matrices(matrices):
+    """Split (n, 4, 4) transform matrices into location, XYZ euler and scale arrays.
+
+    Returns:
+        tuple: (location, rotation_euler, scale), each shaped (n, 3)
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    location = matrices[:, :3, 3].copy()
+    scale = np.linalg.norm(matrices[:, :3, :3], axis=1)
+    safe_scale = np.where(scale > 1e-12, scale, 1.0)
+    rotation = _matrices_to_euler(matrices[:, :3, :3] / safe_scale[:, None, :])
+    return location, rotation, scale
+
+
+def world_matrices(objects):
+    """Return the world matrices of objects as an (n, 4, 4) array."""
+    if not objects:
+        return np.zeros((0, 4, 4))
+    return np.array([obj.matrix_world for obj in objects], dtype=np.float64)
+
+
+def _read_vectors(collection, prop_name, size, dtype=np.float32):
+    """Read a vector property of every item in collection as an (n, size) array."""
+    values = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(prop_name, values)
+    return values.reshape(-1, size)
 
 
 class PoseManager:
     """Manages pose operations for molecules"""
+
+    # Mesh pointer -> (vertex count, local space alpha carbon centroid)
+    _alpha_carbon_cache = {}
     
     @staticmethod
     def calculate_alpha_carbon_center(molecule_object):
         """
         Calculate the center of mass of alpha carbons (CA atoms) in the molecule.
         
+        The local space centroid is cached per mesh, so repeated calls only
+        cost a matrix multiply.
+        
         Args:
             molecule_object: Blender object containing the molecule mesh
             
@@ -25,47 +102,56 @@ class PoseManager:
         if not molecule_object or not molecule_object.data:
             return Vector((0, 0, 0))
         
-        mesh = molecule_object.data
-        
-        # Check if required attributes exist
-        if "atom_name" not in mesh.attributes:
-            print(f"Warning: No atom_name attribute found in {molecule_object.name}")
+        centroid = PoseManager._alpha_carbon_centroid(molecule_object.data)
+        if centroid is None:
+            print(f"Warning: No alpha carbon data found in {molecule_object.name}")
             # Fallback to object center
             return molecule_object.location.copy()
         
-        # Get atom names and positions
-        atom_name_attr = mesh.attributes["atom_name"]
-        vertices = mesh.vertices
-        
-        # Find alpha carbons (CA atoms)
-        ca_positions = []
-        for i, atom_data in enumerate(atom_name_attr.data):
-            # The atom_name attribute stores integer values that map to atom names
-            # CA atoms typically have a specific integer value (need to check the mapping)
-            # For now, we'll use a simple heuristic or check the actual mapping
-            
-            # Try to get the actual atom name if there's a mapping
-            # This depends on how MolecularNodes stores atom names
-            if i < len(vertices):
-                vertex = vertices[i]
-                # Check if this is a CA atom (this logic may need adjustment based on actual data structure)
-                # For now, collect all vertices as a fallback
-                ca_positions.append(molecule_object.matrix_world @ vertex.co)
+        return molecule_object.matrix_world @ Vector(centroid)
+    
+    @staticmethod
+    def _alpha_carbon_centroid(mesh):
+        """Return the local space alpha carbon centroid of mesh, or None."""
+        if not hasattr(mesh, 'vertices') or not hasattr(mesh, 'attributes'):
+            return None
+        
+        count = len(mesh.vertices)
+        key = mesh.as_pointer()
+        cached = PoseManager._alpha_carbon_cache.get(key)
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        
+        if count == 0:
+            return None
+        
+        # Prefer the boolean attribute, fall back to the atom name mapping
+        if "is_alpha_carbon" in mesh.attributes:
+            mask = np.zeros(count, dtype=bool)
+            mesh.attributes["is_alpha_carbon"].data.foreach_get("value", mask)
+        elif "atom_name" in mesh.attributes:
+            atom_names = np.zeros(count, dtype=np.int32)
+            mesh.attributes["atom_name"].data.foreach_get("value", atom_names)
+            mask = atom_names == ALPHA_CARBON_ATOM_NAME
+        else:
+            return None
+        
+        positions = np.zeros(count * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+        positions = positions.reshape(-1, 3)
         
         # If no CA atoms found, use all vertices as fallback
-        if not ca_positions:
-            ca_positions = [molecule_object.matrix_world @ v.co for v in vertices]
-        
-        if not ca_positions:
-            return molecule_object.location.copy()
+        if mask.any():
+            positions = positions[mask]
         
-        # Calculate center of mass
-        center = Vector((0, 0, 0))
-        for pos in ca_positions:
-            center += pos
-        center /= len(ca_positions)
-        
-        return center
+        centroid = tuple(positions.mean(axis=0, dtype=np.float64))
+        PoseManager._alpha_carbon_cache[key] = (count, centroid)
+        return centroid
+    
+    @staticmethod
+    def clear_alpha_carbon_cache():
+        """Forget cached alpha carbon centroids (after load/undo or mesh edits)."""
+        PoseManager._alpha_carbon_cache.clear()
     
     @staticmethod
     def get_all_groups(context):
@@ -78,15 +164,11 @@ class PoseManager:
         Returns:
             dict: Dictionary of group_id -> list of member_ids for all groups
         """
-        groups = {}
-        
-        # Find all groups in the scene
-        for item in context.scene.outliner_items:
-            if item.item_type == 'PUPPET' and item.item_id != "puppets_separator":
-                # Get member IDs for this group
-                member_ids = item.puppet_memberships.split(',') if item.puppet_memberships else []
-                # Include the group even if it has no members (empty groups are still valid)
-                groups[item.item_id] = member_ids
+        # Include groups even if they have no members (empty groups are still valid)
+        groups = {
+            puppet.puppet_id: [member.member_id for member in puppet.members]
+            for puppet in PuppetRegistry.get_puppets(context.scene)
+        }
         
         return groups
     
@@ -117,48 +199,7 @@ class PoseManager:
         Returns:
             list: List of Blender objects in the group
         """
-        from ..utils.scene_manager import ProteinBlenderScene
-        
-        objects = []
-        scene_manager = ProteinBlenderScene.get_instance()
-        
-        # Find the group
-        group_item = None
-        for item in context.scene.outliner_items:
-            if item.item_id == group_id and item.item_type == 'PUPPET':
-                group_item = item
-                break
-        
-        if not group_item or not group_item.puppet_memberships:
-            return objects
-        
-        member_ids = group_item.puppet_memberships.split(',')
-        
-        for member_id in member_ids:
-            # Parse member ID to get molecule and component
-            if '_' in member_id:
-                parts = member_id.split('_')
-                mol_id = parts[0]
-                
-                molecule = scene_manager.molecules.get(mol_id)
-                if not molecule:
-                    continue
-                
-                # Check if it's a domain
-                if len(parts) >= 2:
-                    domain_id = '_'.join(parts[1:])
-                    if domain_id in molecule.domains:
-                        domain = molecule.domains[domain_id]
-                        if domain.object:
-                            objects.append(domain.object)
-                # Check if it's a chain (format: mol_id_chain_X)
-                elif member_id.startswith(f"{mol_id}_chain_"):
-                    # For chains, we need to get the chain's visual representation
-                    # This might be part of the main molecule object or a separate object
-                    if molecule.object:
-                        objects.append(molecule.object)
-        
-        return objects
+        return PuppetRegistry.get_objects(context.scene, group_id)
     
     @staticmethod
     def capture_group_transforms(context, pose, group_ids, alpha_carbon_center):
@@ -177,18 +218,27 @@ class PoseManager:
         # Store alpha carbon center
         pose.alpha_carbon_center = alpha_carbon_center
         
+        rows = []
         for group_id in group_ids:
-            objects = PoseManager.get_group_objects(context, group_id)
-            
-            for obj in objects:
+            for obj in PoseManager.get_group_objects(context, group_id):
                 transform = pose.group_transforms.add()
-                transform.group_id = f"{group_id}_{obj.name}"
-                
-                # Calculate relative position to alpha carbon center
-                relative_location = obj.location - alpha_carbon_center
-                transform.relative_location = relative_location
-                transform.relative_rotation = obj.rotation_euler.copy()
-                transform.relative_scale = obj.scale.copy()
+                transform.group_id = group_id
+                transform.object_name = obj.name
+                rows.append(obj)
+        
+        if not rows:
+            return
+        
+        # Write all vectors in one pass, relative to the alpha carbon center
+        locations = np.array([obj.location for obj in rows], dtype=np.float32)
+        locations -= np.array(alpha_carbon_center, dtype=np.float32)
+        rotations = np.array([obj.rotation_euler for obj in rows], dtype=np.float32)
+        scales = np.array([obj.scale for obj in rows], dtype=np.float32)
+        
+        transforms = pose.group_transforms
+        transforms.foreach_set("relative_location", locations.ravel())
+        transforms.foreach_set("relative_rotation", rotations.ravel())
+        transforms.foreach_set("relative_scale", scales.ravel())
     
     @staticmethod
     def apply_group_transforms(context, pose, molecule_object):
@@ -200,103 +250,242 @@ class PoseManager:
             pose: MoleculePose object containing transforms
             molecule_object: Current molecule object to calculate new alpha carbon center
         """
-        # Calculate current alpha carbon center
-        current_center = PoseManager.calculate_alpha_carbon_center(molecule_object)
+        transforms = pose.group_transforms
+        if not transforms:
+            return
         
-        # Apply transforms
-        for transform in pose.group_transforms:
-            # Parse the group_id_objectname format
-            parts = transform.group_id.rsplit('_', 1)
-            if len(parts) < 2:
-                continue
-                
-            group_id = parts[0]
-            obj_name = parts[1]
+        # Calculate current alpha carbon center
+        current_center = np.array(PoseManager.calculate_alpha_carbon_center(molecule_object))
+        
+        locations = _read_vectors(transforms, "relative_location", 3) + current_center
+        rotations = _read_vectors(transforms, "relative_rotation", 3)
+        scales = _read_vectors(transforms, "relative_scale", 3)
+        
+        group_ids = [group_id for group_id in pose.group_ids.split(',') if group_id]
+        
+        for i, transform in enumerate(transforms):
+            obj_name = transform.object_name
+            if not obj_name:
+                # Older poses stored "{group_id}_{object_name}" in group_id
+                obj_name = next(
+                    (transform.group_id[len(group_id) + 1:] for group_id in group_ids
+                     if transform.group_id.startswith(f"{group_id}_")),
+                    None
+                )
             
             # Find the object
-            obj = bpy.data.objects.get(obj_name)
+            obj = bpy.data.objects.get(obj_name) if obj_name else None
             if not obj:
                 continue
             
             # Apply relative transform
-            obj.location = current_center + Vector(transform.relative_location)
-            obj.rotation_euler = transform.relative_rotation
-            obj.scale = transform.relative_scale
+            obj.location = locations[i]
+            obj.rotation_euler = rotations[i]
+            obj.scale = scales[i]
     
     @staticmethod
-    def create_pose_screenshot(context, pose, groups, output_dir=None):
+    def capture_puppet_transforms(context, pose, puppet_ids, puppet_names=None):
         """
-        Create a screenshot of the pose showing only the groups.
+        Capture the transforms of all puppet objects into a scene pose.
+        
+        Every object is stored as a packed 4x4 matrix relative to its puppet
+        controller (or as its local matrix when the puppet has no controller).
+        The matrices are computed in one NumPy pass and written to the pose
+        collection with foreach_set.
         
         Args:
             context: Blender context
-            pose: MoleculePose object
-            groups: List of group IDs in the pose
-            output_dir: Directory to save screenshot (defaults to temp)
+            pose: ScenePose to store the transforms in
+            puppet_ids: List of puppet IDs to capture
+            puppet_names: Optional dict of puppet_id -> display name
             
         Returns:
-            str: Path to the saved screenshot
+            int: Number of object transforms captured
         """
-        import tempfile
+        from ..panels.visual_setup_panel import get_object_color
+        
+        scene = context.scene
+        puppet_names = puppet_names or {}
+        pose.transforms.clear()
         
-        if not output_dir:
-            output_dir = tempfile.gettempdir()
+        rows = []
+        matrices = []
+        for puppet_id in puppet_ids:
+            objects = PuppetRegistry.get_objects(scene, puppet_id)
+            if not objects:
+                continue
+            
+            puppet = PuppetRegistry.get_puppet(scene, puppet_id)
+            puppet_name = puppet_names.get(puppet_id) or (puppet.name if puppet else puppet_id)
+            
+            controller = PuppetRegistry.get_controller(scene, puppet_id)
+            if controller:
+                # Store transforms RELATIVE to the puppet controller
+                controller_inv = np.linalg.inv(np.array(controller.matrix_world, dtype=np.float64))
+                matrices.append(controller_inv @ world_matrices(objects))
+            else:
+                # Fallback to local transforms if no controller found
+                matrices.append(np.array([obj.matrix_basis for obj in objects], dtype=np.float64))
+            
+            rows.extend((puppet_id, puppet_name, obj) for obj in objects)
+        
+        if not rows:
+            return 0
+        
+        colors = np.empty((len(rows), 4), dtype=np.float32)
+        for i, (puppet_id, puppet_name, obj) in enumerate(rows):
+            transform = pose.transforms.add()
+            transform.puppet_id = puppet_id
+            transform.puppet_name = puppet_name
+            transform.object_name = obj.name
+            colors[i] = get_object_color(obj)
+        
+        matrices = np.concatenate(matrices)
+        location, rotation, scale = decompose_matrices(matrices)
+        
+        transforms = pose.transforms
+        transforms.foreach_set("matrix", matrices.astype(np.float32).ravel())
+        transforms.foreach_set("location", location.astype(np.float32).ravel())
+        transforms.foreach_set("rotation_euler", rotation.astype(np.float32).ravel())
+        transforms.foreach_set("scale", scale.astype(np.float32).ravel())
+        transforms.foreach_set("color", colors.ravel())
+        transforms.foreach_set("has_color", np.ones(len(rows), dtype=bool))
+        
+        return len(rows)
+    
+    @staticmethod
+    def read_puppet_matrices(pose):
+        """
+        Return the stored transforms of a scene pose as an (n, 4, 4) array.
         
-        # Generate unique filename
-        screenshot_name = f"pose_{uuid.uuid4().hex[:8]}.png"
-        screenshot_path = os.path.join(output_dir, screenshot_name)
+        Poses saved before matrices were stored are rebuilt from their
+        location, rotation and scale.
+        """
+        transforms = pose.transforms
+        matrices = _read_vectors(transforms, "matrix", 16).reshape(-1, 4, 4).astype(np.float64)
+        
+        # A valid transform always has 1 in the bottom right corner
+        legacy = matrices[:, 3, 3] == 0.0
+        if legacy.any():
+            rebuilt = compose_matrices(
+                _read_vectors(transforms, "location", 3),
+                _read_vectors(transforms, "rotation_euler", 3),
+                _read_vectors(transforms, "scale", 3),
+            )
+            matrices[legacy] = rebuilt[legacy]
+        return matrices
+    
+    @staticmethod
+    def puppet_basis_matrices(context, pose):
+        """
+        Return the local transforms (matrix_basis) a scene pose puts its objects in.
         
-        # Store current visibility states
-        visibility_states = {}
-        for obj in bpy.data.objects:
-            visibility_states[obj] = obj.hide_viewport
+        Controller-relative transforms are resolved against the current
+        controller and parent matrices, one matrix multiply per puppet.
         
-        try:
-            # Hide all objects first
-            for obj in bpy.data.objects:
-                obj.hide_viewport = True
-            
-            # Show only objects in the pose groups
-            for group_id in groups:
-                objects = PoseManager.get_group_objects(context, group_id)
-                for obj in objects:
-                    obj.hide_viewport = False
+        Args:
+            context: Blender context
+            pose: ScenePose to resolve
             
-            # Set up render settings for thumbnail
-            scene = context.scene
-            original_x = scene.render.resolution_x
-            original_y = scene.render.resolution_y
-            original_percentage = scene.render.resolution_percentage
+        Returns:
+            tuple: (list of object names, (n, 4, 4) array of local matrices)
+        """
+        scene = context.scene
+        transforms = pose.transforms
+        if not transforms:
+            return [], np.zeros((0, 4, 4))
+        
+        matrices = PoseManager.read_puppet_matrices(pose)
+        
+        object_names = []
+        puppet_rows = {}
+        for i, transform in enumerate(transforms):
+            object_names.append(transform.object_name)
+            puppet_rows.setdefault(transform.puppet_id, []).append(i)
+        
+        # Transforms of puppets without a controller are already local
+        for puppet_id, rows in puppet_rows.items():
+            controller = PuppetRegistry.get_controller(scene, puppet_id)
+            if not controller:
+                continue
             
-            # Set thumbnail size
-            scene.render.resolution_x = 256
-            scene.render.resolution_y = 256
-            scene.render.resolution_percentage = 100
+            matrices[rows] = np.array(controller.matrix_world, dtype=np.float64) @ matrices[rows]
+            for row in rows:
+                obj = bpy.data.objects.get(object_names[row])
+                if obj and obj.parent:
+                    parent_matrix = np.array(obj.parent.matrix_world, dtype=np.float64)
+                    parent_matrix = parent_matrix @ np.array(obj.matrix_parent_inverse, dtype=np.float64)
+                    matrices[row] = np.linalg.solve(parent_matrix, matrices[row])
+        
+        return object_names, matrices
+    
+    @staticmethod
+    def apply_puppet_transforms(context, pose):
+        """
+        Apply a scene pose to its puppet objects.
+        
+        Local matrices for all objects are computed in one NumPy pass before
+        anything is written.
+        
+        Args:
+            context: Blender context
+            pose: ScenePose to apply
             
-            # Frame the visible objects in the viewport
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    for region in area.regions:
-                        if region.type == 'WINDOW':
-                            override = {'area': area, 'region': region}
-                            bpy.ops.view3d.view_all(override)
-                            break
+        Returns:
+            tuple: (number of objects applied, list of missing object names)
+        """
+        from ..panels.visual_setup_panel import apply_color_to_object
+        
+        transforms = pose.transforms
+        if not transforms:
+            return 0, []
+        
+        object_names, matrices = PoseManager.puppet_basis_matrices(context, pose)
+        colors = _read_vectors(transforms, "color", 4)
+        has_color = np.zeros(len(transforms), dtype=bool)
+        transforms.foreach_get("has_color", has_color)
+        
+        applied = 0
+        missing = []
+        for i, obj_name in enumerate(object_names):
+            obj = bpy.data.objects.get(obj_name)
+            if not obj:
+                missing.append(obj_name)
+                continue
             
-            # Render to file
-            scene.render.filepath = screenshot_path
-            bpy.ops.render.render(write_still=True)
+            obj.matrix_basis = Matrix(matrices[i].tolist())
             
-            # Restore render settings
-            scene.render.resolution_x = original_x
-            scene.render.resolution_y = original_y
-            scene.render.resolution_percentage = original_percentage
+            if has_color[i]:
+                apply_color_to_object(obj, tuple(colors[i]))
+            applied += 1
+        
+        return applied, missing
+    
+    @staticmethod
+    def create_pose_screenshot(context, pose, groups):
+        """
+        Queue a thumbnail of the pose showing only the groups.
+        
+        The thumbnail is drawn later by the thumbnail queue, or reused from
+        the cache when the groups have not moved since it was last drawn.
+        
+        Args:
+            context: Blender context
+            pose: MoleculePose object
+            groups: List of group IDs in the pose
             
-        finally:
-            # Restore visibility states
-            for obj, hidden in visibility_states.items():
-                obj.hide_viewport = hidden
+        Returns:
+            str: Path the screenshot is stored at
+        """
+        from .pose_thumbnails import PoseThumbnails
+        
+        objects = []
+        for group_id in groups:
+            for obj in PoseManager.get_group_objects(context, group_id):
+                if obj not in objects:
+                    objects.append(obj)
         
-        return screenshot_path
+        return PoseThumbnails.request_for_objects(context.scene, objects)
     
     @staticmethod
     def create_default_pose(context, molecule_item, molecule):
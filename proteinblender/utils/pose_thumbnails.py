@@ -0,0 +1,342 @@
+"""Cached, deferred pose thumbnails for ProteinBlender.
+
+Thumbnails used to be made with a full ``bpy.ops.render.render`` per pose,
+after toggling ``hide_viewport`` on every object in the file. Instead:
+
+* Thumbnails are keyed by a hash of the pose transforms and stored as
+  ``pose_<hash>.png`` in the cache directory, so unchanged poses are never
+  rendered again, also not after reloading the file.
+* Stale thumbnails are queued and drawn one per timer tick with a
+  ``GPUOffScreen`` viewport capture. Only the pose's objects are visible in
+  a private view layer, so the user's visibility state is never touched.
+* PNG encoding and writing happen on a worker thread; the image is loaded
+  into Blender on a later tick.
+"""
+
+import bpy
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+THUMBNAIL_SIZE = 256
+
+# Seconds between queue ticks while there is work to do
+QUEUE_INTERVAL = 0.1
+
+# View layer used to draw only the objects of a pose
+THUMBNAIL_VIEW_LAYER = "ProteinBlender Thumbnails"
+
+
+def thumbnail_dir():
+    """Return the directory thumbnails are cached in, creating it if needed."""
+    path = os.path.join(tempfile.gettempdir(), "proteinblender_poses")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def thumbnail_path(digest):
+    """Return the cache file path for a thumbnail hash."""
+    return os.path.join(thumbnail_dir(), f"pose_{digest}.png")
+
+
+def image_name(path):
+    """Name of the Blender image holding the thumbnail at path."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def pose_digest(pose):
+    """Hash the stored transforms and colors of a scene pose.
+
+    Args:
+        pose: ScenePose from the scene pose library
+
+    Returns:
+        str: Hex digest identifying the thumbnail of the pose
+    """
+    transforms = pose.transforms
+    count = len(transforms)
+    matrices = np.empty(count * 16, dtype=np.float32)
+    colors = np.empty(count * 4, dtype=np.float32)
+    transforms.foreach_get("matrix", matrices)
+    transforms.foreach_get("color", colors)
+
+    digest = hashlib.sha1(str(THUMBNAIL_SIZE).encode())
+    digest.update("\0".join(transform.object_name for transform in transforms).encode())
+    # Round so float noise from re-capturing an unchanged pose keeps the hash
+    digest.update(np.round(matrices, 4).tobytes())
+    digest.update(np.round(colors, 3).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def objects_digest(objects):
+    """Hash the current world transforms of objects."""
+    digest = hashlib.sha1(str(THUMBNAIL_SIZE).encode())
+    digest.update("\0".join(obj.name for obj in objects).encode())
+    matrices = np.array([obj.matrix_world for obj in objects], dtype=np.float32)
+    digest.update(np.round(matrices, 4).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def write_png(path, pixels):
+    """Encode an (height, width, 4) uint8 RGBA array as a PNG file.
+
+    Pure Python so it can run on a worker thread without touching bpy.
+    Rows are flipped because GPU buffers start at the bottom.
+    """
+    height, width = pixels.shape[:2]
+    rows = np.ascontiguousarray(pixels[::-1])
+    raw = b"".join(b"\x00" + row.tobytes() for row in rows)
+
+    def chunk(tag, data):
+        return (
+            struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+        )
+
+    png = b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw, 6)),
+        chunk(b"IEND", b""),
+    ))
+
+    # Write next to the target and rename so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(png)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_thumbnail(path):
+    """Load a cached thumbnail into Blender and generate its UI preview."""
+    name = image_name(path)
+    image = bpy.data.images.get(name)
+    if image is None:
+        image = bpy.data.images.load(path, check_existing=True)
+        image.name = name
+    image.preview_ensure()
+    return image
+
+
+def _find_view3d():
+    """Return (area, region, space) of an open 3D viewport, or None."""
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            for region in area.regions:
+                if region.type == 'WINDOW':
+                    return area, region, area.spaces.active
+    return None
+
+
+def _frame_objects(objects, region_3d):
+    """View and orthographic projection matrices framing objects.
+
+    The view keeps the orientation of the user's viewport.
+    """
+    from mathutils import Matrix
+
+    corners = []
+    for obj in objects:
+        matrix = np.array(obj.matrix_world)
+        corners.append(np.array(obj.bound_box) @ matrix[:3, :3].T + matrix[:3, 3])
+    corners = np.concatenate(corners)
+    low, high = corners.min(axis=0), corners.max(axis=0)
+    center = (low + high) / 2.0
+    radius = max(float(np.linalg.norm(high - low)) / 2.0, 0.1)
+
+    rotation = region_3d.view_rotation.to_matrix().to_4x4()
+    camera = Matrix.Translation(center.tolist()) @ rotation @ Matrix.Translation((0.0, 0.0, 3.0 * radius))
+    view_matrix = camera.inverted()
+
+    near, far = radius, 5.0 * radius
+    projection_matrix = Matrix((
+        (1.0 / radius, 0.0, 0.0, 0.0),
+        (0.0, 1.0 / radius, 0.0, 0.0),
+        (0.0, 0.0, -2.0 / (far - near), -(far + near) / (far - near)),
+        (0.0, 0.0, 0.0, 1.0),
+    ))
+    return view_matrix, projection_matrix
+
+
+class PoseThumbnails:
+    """Queue of pose thumbnails waiting to be drawn"""
+
+    # (scene name, object names, cache path)
+    _queue = deque()
+    # (future, cache path) of thumbnails being written
+    _writes = []
+    _executor = None
+
+    @classmethod
+    def request(cls, scene, pose):
+        """Point pose.preview_path at its thumbnail, queueing it if stale.
+
+        Call this after the pose's objects were captured, since the
+        thumbnail is drawn from the current scene state.
+
+        Returns:
+            bool: True if a cached thumbnail was found
+        """
+        path = thumbnail_path(pose_digest(pose))
+        pose.preview_path = path
+        object_names = [transform.object_name for transform in pose.transforms]
+        return cls._request_path(scene, object_names, path)
+
+    @classmethod
+    def request_for_objects(cls, scene, objects):
+        """Queue a thumbnail of the given objects in their current state.
+
+        Returns:
+            str: Path the thumbnail is (or will be) stored at
+        """
+        path = thumbnail_path(objects_digest(objects))
+        cls._request_path(scene, [obj.name for obj in objects], path)
+        return path
+
+    @classmethod
+    def _request_path(cls, scene, object_names, path):
+        if os.path.exists(path):
+            try:
+                load_thumbnail(path)
+            except RuntimeError as e:
+                print(f"Warning: Could not load pose thumbnail: {e}")
+            return True
+
+        if not any(queued[2] == path for queued in cls._queue):
+            cls._queue.append((scene.name, object_names, path))
+        if not bpy.app.timers.is_registered(_process_queue):
+            bpy.app.timers.register(_process_queue, first_interval=QUEUE_INTERVAL)
+        return False
+
+    @classmethod
+    def refresh_library(cls, scene):
+        """Load the cached thumbnails of every pose in the scene pose library.
+
+        Nothing is rendered: after loading a file the scene is generally not
+        in the state of each pose, so missing thumbnails stay placeholders
+        until the pose is captured again.
+        """
+        for pose in getattr(scene, 'pose_library', []):
+            path = thumbnail_path(pose_digest(pose))
+            if os.path.exists(path):
+                pose.preview_path = path
+                try:
+                    load_thumbnail(path)
+                except RuntimeError as e:
+                    print(f"Warning: Could not load pose thumbnail: {e}")
+
+    @classmethod
+    def _process_queue(cls):
+        """Timer callback: draw one queued thumbnail and load finished ones."""
+        for future, path in list(cls._writes):
+            if not future.done():
+                continue
+            cls._writes.remove((future, path))
+            try:
+                future.result()
+                load_thumbnail(path)
+                cls._redraw()
+            except (OSError, RuntimeError) as e:
+                print(f"Warning: Could not write pose thumbnail: {e}")
+
+        if cls._queue:
+            scene_name, object_names, path = cls._queue.popleft()
+            scene = bpy.data.scenes.get(scene_name)
+            if scene is not None and not os.path.exists(path):
+                try:
+                    pixels = cls._draw(scene, object_names)
+                except Exception as e:
+                    print(f"Warning: Could not draw pose thumbnail: {e}")
+                    pixels = None
+                if pixels is not None:
+                    if cls._executor is None:
+                        cls._executor = ThreadPoolExecutor(max_workers=1)
+                    cls._writes.append((cls._executor.submit(write_png, path, pixels), path))
+
+        if cls._queue or cls._writes:
+            return QUEUE_INTERVAL
+
+        cls._remove_view_layer()
+        return None
+
+    @classmethod
+    def _draw(cls, scene, object_names):
+        """Draw the named objects offscreen and return RGBA pixels, or None."""
+        import gpu
+
+        objects = [bpy.data.objects[name] for name in object_names if name in bpy.data.objects]
+        view = _find_view3d()
+        if not objects or view is None:
+            return None
+        area, region, space = view
+
+        view_layer = scene.view_layers.get(THUMBNAIL_VIEW_LAYER)
+        if view_layer is None:
+            view_layer = scene.view_layers.new(THUMBNAIL_VIEW_LAYER)
+            # Never render this layer with the scene
+            view_layer.use = False
+
+        visible = set(object_names)
+        for obj in view_layer.objects:
+            obj.hide_set(obj.name not in visible, view_layer=view_layer)
+        view_layer.update()
+
+        view_matrix, projection_matrix = _frame_objects(objects, space.region_3d)
+        offscreen = gpu.types.GPUOffScreen(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        try:
+            with offscreen.bind():
+                framebuffer = gpu.state.active_framebuffer_get()
+                framebuffer.clear(color=(0.0, 0.0, 0.0, 0.0))
+                offscreen.draw_view3d(
+                    scene, view_layer, space, region,
+                    view_matrix, projection_matrix,
+                    do_color_management=True,
+                )
+                buffer = framebuffer.read_color(0, 0, THUMBNAIL_SIZE, THUMBNAIL_SIZE, 4, 0, 'UBYTE')
+        finally:
+            offscreen.free()
+
+        buffer.dimensions = THUMBNAIL_SIZE * THUMBNAIL_SIZE * 4
+        return np.array(buffer, dtype=np.uint8).reshape(THUMBNAIL_SIZE, THUMBNAIL_SIZE, 4)
+
+    @staticmethod
+    def _redraw():
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'PROPERTIES':
+                    area.tag_redraw()
+
+    @staticmethod
+    def _remove_view_layer():
+        for scene in bpy.data.scenes:
+            view_layer = scene.view_layers.get(THUMBNAIL_VIEW_LAYER)
+            if view_layer is not None and len(scene.view_layers) > 1:
+                scene.view_layers.remove(view_layer)
+
+    @classmethod
+    def shutdown(cls):
+        """Drop queued work and stop the timer and worker thread."""
+        cls._queue.clear()
+        if bpy.app.timers.is_registered(_process_queue):
+            bpy.app.timers.unregister(_process_queue)
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+        cls._writes.clear()
+        cls._remove_view_layer()
+
+
+def _process_queue():
+    # Timers are identified by the function object, and every access to
+    # PoseThumbnails._process_queue creates a new bound method, so the timer
+    # is this single module-level function
+    return PoseThumbnails._process_queue()
@@ -42,6 +42,9 @@ class ProteinBlenderScene:
     def _capture_molecule_state(self, molecule_id):
         """Store complete state before destructive operations"""
         if molecule_id in self.molecules:
+            # Inside MoleculeWrapper.batch() only the state before the first edit is kept
+            if not self.molecules[molecule_id].claim_state_capture():
+                return
             try:
                 # Refresh domain object references to avoid stale references after undo/redo
                 self._refresh_domain_object_references(self.molecules[molecule_id])
@@ -129,7 +132,7 @@ class ProteinBlenderScene:
                 created_domain_ids_for_molecule.append(created_domain_ids)
                 processed_label_asym_ids.add(label_asym_id_key)
 
-    def _finalize_imported_molecule(self, molecule):
+    def _finalize_imported_molecule(self, molecule, instance_assembly=False):
         """Finalize the import of a molecule: create domains, update UI, set active, refresh."""
         # Set protein pivot to center of mass and move to world origin
         print("Setting protein pivot to center of mass...")
@@ -137,6 +140,10 @@ class ProteinBlenderScene:
 
         # Create domains for each chain
         self._create_domains_for_each_chain(molecule.identifier)
+
+        # Instance the biological assembly from the chains of the asymmetric unit
+        if instance_assembly and not molecule.enable_assembly_instancing():
+            print(f"No biological assembly found for {molecule.identifier}, showing the asymmetric unit")
         # Add to UI list
         scene = bpy.context.scene
         item = scene.molecule_list_items.add()
@@ -158,7 +165,8 @@ class ProteinBlenderScene:
         # Force UI refresh
         self._refresh_ui()
 
-    def create_molecule_from_id(self, identifier: str, import_method: str = 'PDB', remote_format: str = 'pdb') -> bool:
+    def create_molecule_from_id(self, identifier: str, import_method: str = 'PDB', remote_format: str = 'pdb',
+                                instance_assembly: bool = False) -> bool:
         """Create a new molecule from an identifier (PDB ID or UniProt ID)"""
         try:
             # Ensure MNSession is initialized
@@ -189,7 +197,7 @@ class ProteinBlenderScene:
             self.molecules[base_identifier] = molecule
             molecule.identifier = base_identifier  # Update the molecule's identifier
             # Finalize import (domains, UI, etc.)
-            self._finalize_imported_molecule(molecule)
+            self._finalize_imported_molecule(molecule, instance_assembly)
             return True
         except Exception:
             return False
@@ -265,7 +273,7 @@ class ProteinBlenderScene:
         scene.display_settings = data['display_settings']
         return scene 
 
-    def import_molecule_from_file(self, filepath: str, identifier: str) -> bool:
+    def import_molecule_from_file(self, filepath: str, identifier: str, instance_assembly: bool = False) -> bool:
         """Import a molecule from a local file"""
         try:
             # Import the molecule using MoleculeManager
@@ -273,7 +281,7 @@ class ProteinBlenderScene:
             if not molecule:
                 return False
             # Finalize import (domains, UI, etc.)
-            self._finalize_imported_molecule(molecule)
+            self._finalize_imported_molecule(molecule, instance_assembly)
             return True
         except Exception:
             import traceback
@@ -1385,6 +1393,10 @@ def build_outliner_hierarchy(context=None):
                     # Add non-domain, non-protein items (chains) directly
                     add_reference_with_children(member_id, group_id)
     
+    # Memberships were rebuilt, so the cached puppet index is stale
+    from ..core.puppet_registry import PuppetRegistry
+    PuppetRegistry.invalidate()
+
     # Update outliner display
     # Re-enable selection sync
     selection_sync._selection_update_depth = old_depth
@@ -1493,10 +1505,6 @@ def update_outliner_visibility(item_id, visible):
                 controller_obj.hide_render = not visible
 
         # Update all items that are members of this group
-        member_ids = item.puppet_memberships.split(',') if item.puppet_memberships else []
-        for member_id in member_ids:
-            # Find the actual member item
-            for member_item in scene.outliner_items:
-                if member_item.item_id == member_id:
-                    update_outliner_visibility(member_id, visible)
-                    break
\ No newline at end of file
+        from ..core.puppet_registry import PuppetRegistry
+        for member_id in PuppetRegistry.get_member_ids(scene, item_id):
+            update_outliner_visibility(member_id, visible)
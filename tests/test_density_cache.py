@@ -0,0 +1,56 @@
+"""The density conversion cache must not reuse grids of a map that changed.
+
+The cache module only needs the standard library and the MolecularNodes
+download module, so it is loaded on its own: the packages above it import
+Blender when they initialise.
+"""
+
+import importlib
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MAP_BYTES = 6 * 2**20
+
+
+@pytest.fixture
+def cache_module(monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT))
+    parts = ["proteinblender", "utils", "molecularnodes", "entities", "density"]
+    for i in range(1, len(parts) + 1):
+        name = ".".join(parts[:i])
+        package = types.ModuleType(name)
+        package.__path__ = [str(ROOT.joinpath(*parts[:i]))]
+        monkeypatch.setitem(sys.modules, name, package)
+    return importlib.import_module("proteinblender.utils.molecularnodes.entities.density.cache")
+
+
+def _write_map(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_interior_edit_misses_cache(cache_module, tmp_path):
+    source = tmp_path / "emd_test.map"
+    data = bytearray(os.urandom(MAP_BYTES))
+    _write_map(source, data)
+
+    cache = cache_module.VDBCache(tmp_path / "cache")
+    grid = cache.new_path(source, invert=False)
+    Path(grid).write_bytes(b"grid")
+    cache.add(source, grid, 0.5, invert=False)
+    assert cache.lookup(source, invert=False) is not None
+
+    # Same size, only bytes outside the hashed start and end change
+    data[3 * 2**20 : 3 * 2**20 + 1000] = bytes(1000)
+    _write_map(source, data)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.lookup(source, invert=False) is None
+    assert cache_module.VDBCache(tmp_path / "cache").lookup(source, invert=False) is None
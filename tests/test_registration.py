@@ -0,0 +1,136 @@
+"""Registering the addon must not load the heavy scientific dependencies.
+
+Blender is not required: `bpy` and the other modules Blender provides are
+replaced by permissive stubs, which is enough to import the addon and run
+its `register()`. The check runs in a fresh interpreter so modules imported
+by pytest or other tests cannot hide or cause a failure.
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Only needed once a structure, trajectory or ensemble is loaded
+HEAVY_MODULES = (
+    "biotite",
+    "MDAnalysis",
+    "pandas",
+    "starfile",
+    "mrcfile",
+    "scipy",
+    "PIL",
+    "proteinblender.utils.molecularnodes.data",
+)
+
+REGISTER_SCRIPT = textwrap.dedent(
+    """
+    import importlib.abc
+    import importlib.machinery
+    import json
+    import sys
+    import types
+
+    ROOT = {root!r}
+
+    # Modules that only exist inside Blender
+    BLENDER_MODULES = {{
+        "addon_utils", "bl_operators", "bl_ui", "bmesh", "bpy", "bpy_extras",
+        "bpy_types", "databpy", "gpu", "gpu_extras", "idprop", "mathutils",
+        "rna_prop_ui",
+    }}
+
+
+    class Anything:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __call__(self, *args, **kwargs):
+            return Anything()
+
+        def __getattr__(self, name):
+            if name.startswith("__"):
+                raise AttributeError(name)
+            return Anything()
+
+        def __iter__(self):
+            return iter(())
+
+        def __or__(self, other):
+            return self
+
+        def __mro_entries__(self, bases):
+            return (object,)
+
+
+    class StubModule(types.ModuleType):
+        __path__ = []
+
+        def __getattr__(self, name):
+            if name.startswith("__"):
+                raise AttributeError(name)
+            # Classes such as bpy.types.Operator must be subclassable
+            if name[:1].isupper() and not name.endswith("Property"):
+                value = type(name, (), {{}})
+            else:
+                value = Anything()
+            setattr(self, name, value)
+            return value
+
+
+    class BlenderStubs(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+        def find_spec(self, name, path, target=None):
+            if name.split(".")[0] in BLENDER_MODULES:
+                return importlib.machinery.ModuleSpec(name, self, is_package=True)
+            return None
+
+        def create_module(self, spec):
+            return StubModule(spec.name)
+
+        def exec_module(self, module):
+            pass
+
+
+    sys.meta_path.insert(0, BlenderStubs())
+    sys.path.insert(0, ROOT)
+
+    # proteinblender/__init__.py verifies the dependencies by importing them,
+    # which is not part of registration, so load the addon module directly
+    package = types.ModuleType("proteinblender")
+    package.__path__ = [ROOT + "/proteinblender"]
+    sys.modules["proteinblender"] = package
+
+    from proteinblender import addon
+
+    addon.register()
+    print(json.dumps(sorted(sys.modules)))
+    """
+)
+
+
+def _modules_after_register():
+    script = REGISTER_SCRIPT.format(root=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_register_does_not_import_heavy_modules():
+    modules = _modules_after_register()
+
+    assert "proteinblender.addon" in modules
+    loaded = sorted(
+        name
+        for name in modules
+        if any(name == heavy or name.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+    )
+    assert loaded == []